@@ -21,6 +21,9 @@ except ImportError:
     PYDUB_AVAILABLE = False
     print("⚠️ pydub 未安装，部分检测功能将被禁用")
 
+from scripts.utils.mp3_info import MP3Info, scan_mp3, scan_mp3_files
+from scripts.audio.pcm_store import load_samples, STORE_SAMPLE_RATE
+
 @dataclass
 class AudioFileInfo:
     """音频文件信息"""
@@ -39,8 +42,10 @@ class AudioFileInfo:
 class AudioIntegrityChecker:
     """音频文件完整性检测器"""
 
-    def __init__(self, audio_dir: str = "public/audio/tts"):
+    def __init__(self, audio_dir: str = "public/audio/tts", decode: bool = False):
         self.audio_dir = Path(audio_dir)
+        # 是否额外用pydub完整解码（可检测静音，但速度慢得多）
+        self.decode = decode
         self.stats = {
             "total_files": 0,
             "valid_files": 0,
@@ -103,8 +108,65 @@ class AudioIntegrityChecker:
         except Exception as e:
             return False, f"检查文件大小失败: {e}"
 
+    def analyze_audio_headers(self, filepath: Path,
+                              mp3_info: Optional[MP3Info] = None) -> Tuple[bool, Optional[Dict], Optional[str]]:
+        """解析MP3帧头获取音频信息（不解码）"""
+        mp3_info = mp3_info or scan_mp3(filepath)
+
+        info = {
+            "duration": mp3_info.duration,
+            "sample_rate": mp3_info.sample_rate,
+            "channels": mp3_info.channels,
+            "channel_mode": mp3_info.channel_mode,
+            "bitrate": mp3_info.bitrate,
+            "frame_count": mp3_info.frame_count,
+            "vbr_header": mp3_info.vbr_header
+        }
+
+        if not mp3_info.is_valid:
+            return False, info, mp3_info.error_message
+        elif info["duration"] < 0.1:  # 小于0.1秒
+            return False, info, "音频时长过短"
+
+        return True, info, None
+
+    def analyze_stored_samples(self, filepath: Path) -> Optional[Tuple[bool, Optional[Dict], Optional[str]]]:
+        """使用PCM特征库中已解码的采样分析音频（不在库中时返回None）"""
+        try:
+            samples = load_samples(filepath)
+        except ImportError:
+            return None
+        if samples is None:
+            return None
+
+        import numpy as np
+
+        peak = float(np.max(np.abs(samples))) if len(samples) else 0.0
+        rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float64)))) if len(samples) else 0.0
+        info = {
+            "duration": len(samples) / STORE_SAMPLE_RATE,
+            "sample_rate": STORE_SAMPLE_RATE,
+            "channels": 1,
+            "frame_count": len(samples),
+            "max_dBFS": 20 * np.log10(peak) if peak > 0 else -float('inf'),
+            "dBFS": 20 * np.log10(rms) if rms > 0 else -float('inf')
+        }
+
+        if info["duration"] <= 0:
+            return False, info, "音频时长为0"
+        elif info["duration"] < 0.1:  # 小于0.1秒
+            return False, info, "音频时长过短"
+        elif info["max_dBFS"] == -float('inf'):
+            return False, info, "音频无声音（静音）"
+
+        return True, info, None
+
     def analyze_audio_with_pydub(self, filepath: Path) -> Tuple[bool, Optional[Dict], Optional[str]]:
-        """使用pydub分析音频文件"""
+        """使用pydub分析音频文件（已入PCM特征库的文件直接读取采样）"""
+        stored = self.analyze_stored_samples(filepath)
+        if stored is not None:
+            return stored
+
         if not PYDUB_AVAILABLE:
             return False, None, "pydub未安装"
 
@@ -134,7 +196,7 @@ class AudioIntegrityChecker:
         except Exception as e:
             return False, None, f"音频分析失败: {e}"
 
-    def check_single_file(self, filepath: Path) -> AudioFileInfo:
+    def check_single_file(self, filepath: Path, mp3_info: Optional[MP3Info] = None) -> AudioFileInfo:
         """检查单个音频文件"""
         filename = filepath.name
 
@@ -178,24 +240,29 @@ class AudioIntegrityChecker:
             self.stats["format_errors"] += 1
             return file_info
 
-        # 使用pydub进行深度分析
-        if PYDUB_AVAILABLE:
+        # 解析帧结构（时长、码率、截断/损坏）
+        audio_valid, audio_info, audio_error = self.analyze_audio_headers(filepath, mp3_info)
+        if audio_valid and audio_info:
+            file_info.duration = audio_info["duration"]
+            file_info.sample_rate = audio_info["sample_rate"]
+            file_info.channels = audio_info["channels"]
+            file_info.format = "MP3"
+            file_info.bitrate = audio_info["bitrate"]
+            file_info.is_valid = True
+        else:
+            file_info.error_message = audio_error
+            file_info.corruption_type = "audio_error"
+            self.stats["corrupted_files"] += 1
+            return file_info
+
+        # 可选：使用pydub进行深度分析
+        if self.decode and PYDUB_AVAILABLE:
             audio_valid, audio_info, audio_error = self.analyze_audio_with_pydub(filepath)
-            if audio_valid and audio_info:
-                file_info.duration = audio_info["duration"]
-                file_info.sample_rate = audio_info["sample_rate"]
-                file_info.channels = audio_info["channels"]
-                file_info.format = "MP3"
-                file_info.bitrate = int((size * 8) / (audio_info["duration"] * 1000)) if audio_info["duration"] > 0 else None
-                file_info.is_valid = True
-            else:
+            if not audio_valid:
+                file_info.is_valid = False
                 file_info.error_message = audio_error
                 file_info.corruption_type = "audio_error"
                 self.stats["corrupted_files"] += 1
-        else:
-            # 如果没有pydub，只做基本检查
-            file_info.is_valid = header_valid and size_valid
-            file_info.format = "MP3"
 
         return file_info
 
@@ -216,10 +283,13 @@ class AudioIntegrityChecker:
         results = []
         start_time = time.time()
 
+        # 并行解析全部文件的帧结构
+        mp3_infos = scan_mp3_files(mp3_files)
+
         for i, filepath in enumerate(mp3_files):
             print(f"[{i+1:3d}/{len(mp3_files)}] 检测: {filepath.name}")
 
-            file_info = self.check_single_file(filepath)
+            file_info = self.check_single_file(filepath, mp3_infos.get(filepath))
             results.append(file_info)
 
             # 更新统计
@@ -396,11 +466,12 @@ def main():
     parser.add_argument("--audio-dir", default="public/audio/tts", help="音频文件目录")
     parser.add_argument("--output", help="报告输出文件名")
     parser.add_argument("--quiet", action="store_true", help="静默模式，只输出摘要")
+    parser.add_argument("--decode", action="store_true", help="额外用pydub完整解码检测（较慢）")
 
     args = parser.parse_args()
 
     # 创建检测器
-    checker = AudioIntegrityChecker(args.audio_dir)
+    checker = AudioIntegrityChecker(args.audio_dir, decode=args.decode)
 
     # 运行检测
     checker.run()
@@ -3,11 +3,12 @@
 检查所有年级JSON文件的标点符号处理问题
 """
 
-import json
 import os
 import re
 from pathlib import Path
 
+from scripts.utils.content_index import read_module
+
 def has_punctuation_issues(scrambled_list, correct_list):
     """检查是否有标点符号处理问题"""
     if not scrambled_list or not correct_list:
@@ -32,8 +33,7 @@ def has_punctuation_issues(scrambled_list, correct_list):
 def check_module_file(file_path):
     """检查单个模块文件"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = json.load(f)
+        content = read_module(file_path)
     except Exception as e:
         return None, f"Error reading file: {e}"
 
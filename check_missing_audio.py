@@ -8,6 +8,12 @@ import json
 from pathlib import Path
 from typing import List, Dict, Set
 
+from scripts.utils.content_index import read_module
+from scripts.utils.audio_refs import extract_audio_references, conflicting_filenames
+
+# 音频引用类别 -> 报告中的类型
+REFERENCE_TYPES = {'word': 'word', 'phrase': 'phrase', 'step': 'quest'}
+
 def check_missing_audio_files():
     """检查所有缺失的音频文件"""
     content_dir = Path("src/content")
@@ -27,61 +33,49 @@ def check_missing_audio_files():
     print(f"📁 现有音频文件数量: {len(existing_files)}")
 
     # 检查所有内容文件中的音频引用
-    referenced_files = set()
-    missing_files = set()
+    references = []
 
     json_files = list(content_dir.glob("*.json"))
     print(f"📖 找到 {len(json_files)} 个内容文件")
 
     for json_file in json_files:
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            # 检查单词
-            for word in data.get('words', []):
-                if 'audio' in word:
-                    audio_path = Path(word['audio'])
-                    filename = audio_path.name
-                    referenced_files.add(filename)
-                    if filename not in existing_files:
-                        missing_files.add((filename, word.get('en', ''), json_file.name, 'word'))
-
-            # 检查短语
-            for phrase in data.get('phrases', []):
-                if 'audio' in phrase:
-                    audio_path = Path(phrase['audio'])
-                    filename = audio_path.name
-                    referenced_files.add(filename)
-                    if filename not in existing_files:
-                        missing_files.add((filename, phrase.get('en', ''), json_file.name, 'phrase'))
-
-            # 检查任务步骤
-            for quest in data.get('quests', []):
-                for step in quest.get('steps', []):
-                    if 'audio' in step:
-                        audio_path = Path(step['audio'])
-                        filename = audio_path.name
-                        referenced_files.add(filename)
-                        if filename not in existing_files:
-                            # 获取步骤文本
-                            text = ""
-                            if step.get('type') == 'fillblank' and 'answer' in step:
-                                if isinstance(step['answer'], list) and step['answer']:
-                                    text = step['answer'][0]
-                                elif isinstance(step['answer'], str):
-                                    text = step['answer']
-                            elif 'text' in step:
-                                text = step['text']
-                            missing_files.add((filename, text, json_file.name, 'quest'))
+            data = read_module(json_file)
+
+            # 检查单词、短语和任务步骤的 audio 字段
+            references.extend(
+                ref for ref in extract_audio_references(data, json_file.name)
+                if ref.explicit and ref.kind in REFERENCE_TYPES
+            )
 
         except Exception as e:
             print(f"❌ 处理文件失败 {json_file}: {e}")
 
+    referenced_files = {ref.filename for ref in references}
+
+    # 文件名与文本对不上（如共用的指令音频）的文件不能按文本合成，单独列出
+    conflicts = conflicting_filenames(references)
+    missing_files = set()
+    conflicted_missing = set()
+    seen = set()
+    for ref in references:
+        if ref.filename in existing_files or ref.filename in seen:
+            continue
+        seen.add(ref.filename)
+        if ref.filename in conflicts:
+            conflicted_missing.add(ref.filename)
+        else:
+            missing_files.add((ref.filename, ref.text, ref.file, REFERENCE_TYPES[ref.kind]))
+
     print(f"\n📊 统计信息:")
     print(f"   引用的音频文件: {len(referenced_files)}")
     print(f"   现有的音频文件: {len(existing_files)}")
-    print(f"   缺失的音频文件: {len(missing_files)}")
+    print(f"   缺失的音频文件: {len(missing_files) + len(conflicted_missing)}")
+
+    if conflicted_missing:
+        print(f"\n⚠️ 缺失但无法按文本合成的音频文件（与引用文本不对应或被不同文本共用）:")
+        for filename in sorted(conflicted_missing):
+            print(f"   {filename}")
 
     if missing_files:
         print(f"\n❌ 缺失的音频文件 (前20个):")
@@ -24,6 +24,8 @@ import logging
 import argparse
 from datetime import datetime
 
+from scripts.utils.content_index import read_module
+
 # 设置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -280,8 +282,7 @@ class PatternCoverageChecker:
     def check_file_coverage(self, file_path: Path) -> Dict:
         """检查单个文件的patterns覆盖情况"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = read_module(file_path)
 
             file_name = file_path.name
             patterns = data.get('patterns', [])
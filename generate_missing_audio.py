@@ -7,22 +7,34 @@
 import os
 import json
 import sys
-import subprocess
 import tempfile
 import time
 from pathlib import Path
 from typing import List, Dict
 from pydub import AudioSegment
 
+from scripts.audio.tts_server import TTSServerClient
+from scripts.audio.tts_cache import TTSCache, STANDALONE_COQUI_MODEL, synthesis_key, accepted_keys
+from scripts.audio.job_journal import JobJournal, partial_path, commit_output
+from scripts.audio.loudness import normalize_segment
+from scripts.utils.config import config
+
 class CoquiAudioGenerator:
-    def __init__(self):
+    def __init__(self, resume: bool = False):
         self.project_root = Path(".")
         self.output_dir = Path("public/audio/tts")
         self.temp_dir = Path("temp_coqui_generation")
         self.temp_dir.mkdir(exist_ok=True)
 
-        # Coqui TTS路径
-        self.tts_path = "/Users/shens/miniconda3/bin/tts"
+        # 常驻Coqui TTS服务（模型只加载一次）
+        self.tts_client = TTSServerClient(STANDALONE_COQUI_MODEL)
+
+        # 内容寻址缓存：相同文本和参数只合成一次
+        self.cache = TTSCache()
+
+        # 任务日志：中断后以 --resume 重新运行时跳过已提交的文件
+        self.resume = resume
+        self.journal = None
 
         # 统计信息
         self.stats = {
@@ -50,38 +62,53 @@ class CoquiAudioGenerator:
             print(f"❌ 加载缺失文件列表失败: {e}")
             return []
 
-    def generate_coqui_tts(self, filename: str, text: str) -> bool:
-        """使用Coqui TTS生成单个音频文件"""
+    def generate_coqui_tts(self, filename: str, text: str, force: bool = False) -> bool:
+        """
+        使用Coqui TTS生成单个音频文件
+
+        Args:
+            filename: 目标文件名
+            text: 合成文本
+            force: 强制重新合成（忽略已存在的文件和缓存）
+        """
         output_path = self.output_dir / filename
         temp_wav = self.temp_dir / f"temp_{output_path.stem}.wav"
 
-        # 检查是否已存在
-        if output_path.exists():
+        cache_key = synthesis_key(text, "coqui", model=STANDALONE_COQUI_MODEL, post_processed=True)
+
+        # 检查是否已由任一生成路径按当前参数生成（无缓存记录的历史文件视为有效）
+        if not force and self.cache.status(output_path, accepted_keys(text).values()) in ("current", "untracked"):
             print(f"⏭️ 跳过已存在: {filename}")
             self.stats["skipped"] += 1
             return True
 
+        # 其他模块已合成过相同文本
+        if not force and self.cache.materialize(cache_key, output_path):
+            self.cache.record(filename, cache_key)
+            print(f"♻️ 缓存命中: {filename}")
+            self.stats["generated"] += 1
+            return True
+
         try:
-            # 构建Coqui TTS命令
-            cmd = [
-                self.tts_path,
-                "--model_name", "tts_models/en/ljspeech/vits",
-                "--text", f'"{text}"',
-                "--out_path", str(temp_wav)
-            ]
-
-            # 执行TTS命令
-            result = subprocess.run(" ".join(cmd), shell=True, check=True,
-                                  capture_output=True, text=True, timeout=30)
-
-            if temp_wav.exists():
-                # 音频后处理
-                self._post_process_audio(temp_wav, output_path)
+            # 通过常驻服务合成
+            if self.tts_client.synthesize(text, temp_wav) and temp_wav.exists():
+                # 音频后处理（先写临时文件，完成后原子替换，中断时不会留下半写的MP3）
+                temp_mp3 = partial_path(output_path)
+                self._post_process_audio(temp_wav, temp_mp3)
 
                 # 清理临时文件
                 if temp_wav.exists():
                     temp_wav.unlink()
 
+                if not temp_mp3.exists():
+                    print(f"❌ 生成失败: {filename} - 后处理未输出文件")
+                    self.stats["failed"] += 1
+                    return False
+
+                commit_output(temp_mp3, output_path)
+                self.cache.put(cache_key, output_path)
+                self.cache.record(filename, cache_key)
+
                 print(f"✅ 生成成功: {filename}")
                 self.stats["generated"] += 1
                 return True
@@ -90,14 +117,6 @@ class CoquiAudioGenerator:
                 self.stats["failed"] += 1
                 return False
 
-        except subprocess.TimeoutExpired:
-            print(f"❌ 生成超时: {filename}")
-            self.stats["failed"] += 1
-            return False
-        except subprocess.CalledProcessError as e:
-            print(f"❌ 生成失败 {filename}: {e}")
-            self.stats["failed"] += 1
-            return False
         except Exception as e:
             print(f"❌ 生成异常 {filename}: {e}")
             self.stats["failed"] += 1
@@ -108,17 +127,15 @@ class CoquiAudioGenerator:
         try:
             audio = AudioSegment.from_file(str(input_path))
 
-            # 标准化音量
-            audio = audio.normalize()
-
             # 添加淡入淡出
-            audio = audio.fade_in(100).fade_out(100)
+            audio = audio.fade_in(config.tts.fade_ms).fade_out(config.tts.fade_ms)
 
-            # 适合小学生的音量调整
-            audio = audio - 2  # 降低2dB
+            # 按EBU R128调整到全库统一的目标响度（受真峰值上限约束）
+            if config.tts.normalize_audio:
+                audio = normalize_segment(audio)
 
             # 导出为MP3
-            audio.export(str(output_path), format="mp3", bitrate="128k")
+            audio.export(str(output_path), format="mp3", bitrate=config.tts.mp3_bitrate)
 
         except Exception as e:
             print(f"⚠️ 音频后处理失败: {e}")
@@ -126,7 +143,7 @@ class CoquiAudioGenerator:
             import shutil
             try:
                 audio = AudioSegment.from_file(str(input_path))
-                audio.export(str(output_path), format="mp3", bitrate="128k")
+                audio.export(str(output_path), format="mp3", bitrate=config.tts.mp3_bitrate)
             except:
                 shutil.copy2(input_path, output_path.with_suffix('.wav'))
                 output_path = output_path.with_suffix('.wav')
@@ -150,6 +167,9 @@ class CoquiAudioGenerator:
         # 生成顺序：单词 -> 短语 -> 任务
         all_files = words + phrases + quests
 
+        self.journal = JobJournal("generate-missing-audio", resume=self.resume)
+        self.journal.plan(item['filename'] for item in all_files)
+
         for i, item in enumerate(all_files):
             filename = item['filename']
             text = item['text']
@@ -159,6 +179,12 @@ class CoquiAudioGenerator:
             print(f"[{i+1}/{len(all_files)}] {filename}")
             print(f"   类型: {type_} | 文本: '{text}' | 来源: {source}")
 
+            if self.journal.is_committed(filename) and (self.output_dir / filename).exists():
+                print(f"⏭️ 上次运行已完成: {filename}")
+                self.stats["skipped"] += 1
+                print()
+                continue
+
             # 过滤中文文本，只生成英文音频
             if self._is_chinese_text(text):
                 print(f"⏭️ 跳过中文文本: {filename}")
@@ -167,12 +193,13 @@ class CoquiAudioGenerator:
                 continue
 
             # 生成音频
+            self.journal.start([filename])
             if self.generate_coqui_tts(filename, text):
-                # 成功
-                pass
+                self.journal.commit(filename)
             else:
                 error_msg = f"生成失败: {filename} - {text}"
                 self.stats["errors"].append(error_msg)
+                self.journal.fail(filename, error_msg)
 
             print()
 
@@ -205,6 +232,11 @@ class CoquiAudioGenerator:
 
     def cleanup(self):
         """清理临时文件"""
+        self.tts_client.close()
+        self.cache.save()
+        if self.journal:
+            self.journal.close()
+
         try:
             if self.temp_dir.exists():
                 import shutil
@@ -242,7 +274,13 @@ class CoquiAudioGenerator:
 
 def main():
     """主函数"""
-    generator = CoquiAudioGenerator()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="批量生成缺失的音频文件")
+    parser.add_argument("--resume", action="store_true", help="按任务日志续跑上次中断的生成")
+    args = parser.parse_args()
+
+    generator = CoquiAudioGenerator(resume=args.resume)
     generator.run()
 
 if __name__ == "__main__":
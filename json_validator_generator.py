@@ -8,11 +8,15 @@ import json
 import os
 import sys
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-import re
+from typing import Dict, Any, Optional
+
+# 添加项目根目录到Python路径
+sys.path.append(str(Path(__file__).parent))
+
+from scripts.utils.module_schema import validate_file, run_validation, watch_validation
 
 class JSONValidator:
-    """JSON文件验证器"""
+    """JSON文件验证器（规则见 scripts/utils/module_schema.py 中的 MODULE_SCHEMA）"""
 
     def __init__(self):
         self.errors = []
@@ -20,238 +24,14 @@ class JSONValidator:
 
     def validate_module_file(self, file_path: str) -> bool:
         """验证模块JSON文件"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except json.JSONDecodeError as e:
-            self.errors.append(f"JSON格式错误: {e}")
-            return False
-        except Exception as e:
-            self.errors.append(f"文件读取错误: {e}")
-            return False
-
-        # 验证必要字段
-        required_fields = [
-            'moduleId', 'title', 'durationMinutes',
-            'words', 'phrases', 'patterns', 'quests', 'practice', 'funFacts'
-        ]
-
-        for field in required_fields:
-            if field not in data:
-                self.errors.append(f"缺少必要字段: {field}")
-
-        # 验证moduleId格式
-        if 'moduleId' in data:
-            if not re.match(r'grade6-lower-mod-\d{2}', data['moduleId']):
-                self.errors.append(f"moduleId格式错误: {data['moduleId']}")
-
-        # 验证words
-        if 'words' in data:
-            self._validate_words(data['words'])
-
-        # 验证phrases
-        if 'phrases' in data:
-            self._validate_phrases(data['phrases'])
-
-        # 验证patterns
-        if 'patterns' in data:
-            self._validate_patterns(data['patterns'])
-
-        # 验证quests - 最重要
-        if 'quests' in data:
-            self._validate_quests(data['quests'])
-
-        # 验证practice
-        if 'practice' in data:
-            self._validate_practice(data['practice'])
-
-        # 验证funFacts
-        if 'funFacts' in data:
-            self._validate_fun_facts(data['funFacts'])
-
-        return len(self.errors) == 0
-
-    def _validate_words(self, words: List[Dict]) -> None:
-        """验证单词列表"""
-        if not isinstance(words, list):
-            self.errors.append("words必须是数组")
-            return
-
-        if len(words) < 6 or len(words) > 12:
-            self.warnings.append(f"words数量应在6-12之间，当前为{len(words)}个")
-
-        required_fields = ['id', 'en', 'zh', 'audio']
-
-        for i, word in enumerate(words):
-            for field in required_fields:
-                if field not in word:
-                    self.errors.append(f"word[{i}]缺少字段: {field}")
-
-            # 验证音频路径格式
-            if 'audio' in word and not (word['audio'].startswith('/audio/tts/') and word['audio'].endswith('.mp3')):
-                self.warnings.append(f"word[{i}]音频路径格式可能不正确: {word['audio']}")
-
-    def _validate_phrases(self, phrases: List[Dict]) -> None:
-        """验证短语列表"""
-        if not isinstance(phrases, list):
-            self.errors.append("phrases必须是数组")
-            return
-
-        if len(phrases) < 4 or len(phrases) > 8:
-            self.warnings.append(f"phrases数量应在4-8之间，当前为{len(phrases)}个")
-
-        required_fields = ['id', 'en', 'zh', 'audio']
-
-        for i, phrase in enumerate(phrases):
-            for field in required_fields:
-                if field not in phrase:
-                    self.errors.append(f"phrase[{i}]缺少字段: {field}")
-
-            # 验证音频路径格式
-            if 'audio' in phrase and not (phrase['audio'].startswith('/audio/tts/') and phrase['audio'].endswith('.mp3')):
-                self.warnings.append(f"phrase[{i}]音频路径格式可能不正确: {phrase['audio']}")
-
-    def _validate_patterns(self, patterns: List[Dict]) -> None:
-        """验证句型模板"""
-        if not isinstance(patterns, list):
-            self.errors.append("patterns必须是数组")
-            return
-
-        if len(patterns) < 2 or len(patterns) > 4:
-            self.warnings.append(f"patterns数量应在2-4之间，当前为{len(patterns)}个")
-
-        for i, pattern in enumerate(patterns):
-            if 'q' not in pattern:
-                self.errors.append(f"pattern[{i}]缺少问题字段")
-            if 'a' not in pattern:
-                self.errors.append(f"pattern[{i}]缺少答案字段")
-
-    def _validate_quests(self, quests: List[Dict]) -> None:
-        """验证练习任务 - 最重要"""
-        if not isinstance(quests, list):
-            self.errors.append("quests必须是数组")
-            return
-
-        # 检查是否包含4种必要类型
-        quest_types = [quest.get('id', '') for quest in quests]
-        required_types = ['vocabulary-matching', 'sentence-sorting', 'zh-to-en', 'en-to-zh']
-
-        for req_type in required_types:
-            if not any(req_type in qtype for qtype in quest_types):
-                self.errors.append(f"缺少必要的练习类型: {req_type}")
-
-        for i, quest in enumerate(quests):
-            if 'id' not in quest:
-                self.errors.append(f"quest[{i}]缺少id字段")
-            if 'title' not in quest:
-                self.errors.append(f"quest[{i}]缺少title字段")
-            if 'steps' not in quest:
-                self.errors.append(f"quest[{i}]缺少steps字段")
-
-            if 'steps' in quest:
-                self._validate_quest_steps(quest['steps'], quest.get('id', f'quest[{i}]'))
-
-            if 'reward' in quest:
-                self._validate_quest_reward(quest['reward'], quest.get('id', f'quest[{i}]'))
-
-    def _validate_quest_steps(self, steps: List[Dict], quest_id: str) -> None:
-        """验证练习步骤"""
-        if not isinstance(steps, list):
-            self.errors.append(f"{quest_id}: steps必须是数组")
-            return
-
-        for i, step in enumerate(steps):
-            if 'type' not in step:
-                self.errors.append(f"{quest_id}: step[{i}]缺少type字段")
-
-            step_type = step.get('type', '')
-
-            if step_type == 'wordmatching':
-                self._validate_wordmatching_step(step, f"{quest_id}: step[{i}]")
-            elif step_type == 'sentencesorting':
-                self._validate_sentencesorting_step(step, f"{quest_id}: step[{i}]")
-            elif step_type == 'fillblank':
-                self._validate_fillblank_step(step, f"{quest_id}: step[{i}]")
-            elif step_type == 'multiplechoice':
-                self._validate_multiplechoice_step(step, f"{quest_id}: step[{i}]")
-            elif step_type == 'zhtoen':
-                self._validate_zhtoen_step(step, f"{quest_id}: step[{i}]")
-            elif step_type == 'entozh':
-                self._validate_entozh_step(step, f"{quest_id}: step[{i}]")
+        for issue in validate_file(file_path)["issues"]:
+            message = f"#{issue['pointer']}: {issue['message']}" if issue['pointer'] else issue['message']
+            if issue['level'] == "error":
+                self.errors.append(message)
             else:
-                self.warnings.append(f"{quest_id}: step[{i}]未知类型: {step_type}")
-
-    def _validate_wordmatching_step(self, step: Dict, path: str) -> None:
-        """验证词汇匹配步骤"""
-        if 'pairs' not in step:
-            self.errors.append(f"{path}: 缺少pairs字段")
-        if 'options' not in step:
-            self.errors.append(f"{path}: 缺少options字段")
-
-    def _validate_sentencesorting_step(self, step: Dict, path: str) -> None:
-        """验证句子排序步骤"""
-        if 'scrambled' not in step:
-            self.errors.append(f"{path}: 缺少scrambled字段")
-        if 'correct' not in step:
-            self.errors.append(f"{path}: 缺少correct字段")
-
-    def _validate_fillblank_step(self, step: Dict, path: str) -> None:
-        """验证填空步骤"""
-        if 'answer' not in step:
-            self.errors.append(f"{path}: 缺少answer字段")
+                self.warnings.append(message)
 
-    def _validate_multiplechoice_step(self, step: Dict, path: str) -> None:
-        """验证多选步骤"""
-        if 'options' not in step:
-            self.errors.append(f"{path}: 缺少options字段")
-        if 'correct' not in step:
-            self.errors.append(f"{path}: 缺少correct字段")
-
-    def _validate_zhtoen_step(self, step: Dict, path: str) -> None:
-        """验证中翻英步骤"""
-        if 'chinese' not in step:
-            self.errors.append(f"{path}: 缺少chinese字段")
-        if 'scrambledEnglish' not in step:
-            self.errors.append(f"{path}: 缺少scrambledEnglish字段")
-        if 'correctEnglish' not in step:
-            self.errors.append(f"{path}: 缺少correctEnglish字段")
-
-    def _validate_entozh_step(self, step: Dict, path: str) -> None:
-        """验证英翻中步骤"""
-        if 'english' not in step:
-            self.errors.append(f"{path}: 缺少english字段")
-        if 'scrambledChinese' not in step:
-            self.errors.append(f"{path}: 缺少scrambledChinese字段")
-        if 'correctChinese' not in step:
-            self.errors.append(f"{path}: 缺少correctChinese字段")
-
-    def _validate_quest_reward(self, reward: Dict, quest_id: str) -> None:
-        """验证任务奖励"""
-        if 'xp' not in reward:
-            self.warnings.append(f"{quest_id}: 缺少xp奖励字段")
-
-    def _validate_practice(self, practice: List[Dict]) -> None:
-        """验证额外练习"""
-        if not isinstance(practice, list):
-            self.errors.append("practice必须是数组")
-            return
-
-        for i, item in enumerate(practice):
-            if 'type' not in item:
-                self.errors.append(f"practice[{i}]缺少type字段")
-
-    def _validate_fun_facts(self, fun_facts: List[str]) -> None:
-        """验证趣味知识"""
-        if not isinstance(fun_facts, list):
-            self.errors.append("funFacts必须是数组")
-            return
-
-        if len(fun_facts) < 2:
-            self.warnings.append("funFacts数量至少应为2个")
-
-        for i, fact in enumerate(fun_facts):
-            if not isinstance(fact, str):
-                self.errors.append(f"funFacts[{i}]必须是字符串")
+        return len(self.errors) == 0
 
     def get_report(self) -> str:
         """获取验证报告"""
@@ -402,7 +182,10 @@ def main():
     import argparse
 
     parser = argparse.ArgumentParser(description='JSON文件验证工具')
-    parser.add_argument('file', help='要验证的JSON文件路径')
+    parser.add_argument('file', nargs='?', help='要验证的JSON文件路径（省略时验证 src/content 下全部模块）')
+    parser.add_argument('--workers', type=int, default=1, help='并行验证的进程数 (默认: 1)')
+    parser.add_argument('--changed', action='store_true', help='只重新验证上次验证后变化的文件')
+    parser.add_argument('--watch', action='store_true', help='持续监视内容目录，保存后立即重新验证')
     parser.add_argument('--template', help='生成模板文件', action='store_true')
     parser.add_argument('--module-id', help='模块ID (用于生成模板)')
     parser.add_argument('--title', help='模块标题 (用于生成模板)')
@@ -425,6 +208,16 @@ def main():
         print("请根据教材内容填充模板中的具体内容")
         return
 
+    # 验证全部模块
+    if not args.file:
+        try:
+            if args.watch:
+                watch_validation(workers=args.workers)
+            report = run_validation(workers=args.workers, incremental=args.changed)
+        except KeyboardInterrupt:
+            return
+        sys.exit(1 if report.count("error") else 0)
+
     # 验证JSON文件
     validator = JSONValidator()
 
@@ -12,42 +12,32 @@ import tempfile
 from pathlib import Path
 from typing import List, Dict, Any
 
+from scripts.audio.tts_server import TTSServerClient
+
 class CoquiAudioGenerator:
     def __init__(self):
         self.temp_dir = Path("temp_coqui_generation")
         self.temp_dir.mkdir(exist_ok=True)
 
+        # 常驻Coqui TTS服务（模型只加载一次）
+        self.tts_client = TTSServerClient("tts_models/en/ljspeech/vits")
+
     def generate_coqui_tts(self, text: str, output_path: str) -> bool:
         """使用Coqui TTS生成音频"""
         try:
             # 创建临时文件
             temp_file = self.temp_dir / f"temp_{os.path.basename(output_path)}.wav"
 
-            # 构建Coqui TTS命令
-            cmd = [
-                "/Users/shens/miniconda3/bin/tts",
-                "--model_name", "tts_models/en/ljspeech/vits",
-                "--text", text,
-                "--out_path", str(temp_file)
-            ]
-
             print(f"  🎙️  Coqui TTS生成: '{text}'")
 
-            # 执行Coqui TTS命令
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-
-            if result.returncode == 0 and temp_file.exists():
+            # 通过常驻服务合成
+            if self.tts_client.synthesize(text, temp_file) and temp_file.exists():
                 # 转换为MP3
                 self._convert_to_mp3(temp_file, output_path)
                 temp_file.unlink()  # 删除临时文件
                 return True
             else:
-                print(f"  ❌ Coqui TTS失败: {result.stderr}")
+                print(f"  ❌ Coqui TTS失败: {text}")
                 return False
 
         except Exception as e:
@@ -67,6 +57,10 @@ class CoquiAudioGenerator:
             import shutil
             shutil.copy2(wav_path, mp3_path)
 
+    def close(self):
+        """关闭TTS服务"""
+        self.tts_client.close()
+
 def collect_grade5_sentences() -> List[Dict[str, Any]]:
     """收集所有grade5模块的句子音频需求"""
     sentences = []
@@ -179,6 +173,8 @@ def regenerate_grade5_audio():
 
         print()
 
+    generator.close()
+
     print("=" * 60)
     print(f"🎉 音频生成完成！")
     print(f"   ✅ 成功: {success_count} 个")
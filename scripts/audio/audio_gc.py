@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+孤立音频回收（引用计数）
+遍历 src/content 下全部模块的音频引用（单词、短语、句型、任务步骤、配对词语、填空答案
+以及任何 audio 字段），再加上组件源码中直接写出的音频文件名，统计每个音频文件的引用数。
+没有任何引用的音频移入 .cache/audio_trash/<批次>/，附带清单，可以整批恢复
+"""
+
+import os
+import re
+import json
+import shutil
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from dataclasses import dataclass, field
+
+from ..utils.config import config
+from ..utils.content_index import ContentIndex, get_content_index
+from ..utils.audio_refs import AudioReference, extract_audio_references, pattern_card_filename
+
+# 组件源码中的字符串字面量（音频文件名或不带扩展名的 wordId）
+SOURCE_LITERAL = re.compile(r'[\'"`]([A-Za-z0-9_./-]+)[\'"`]')
+
+@dataclass
+class GCReport:
+    """
+    引用计数结果
+
+    references: 音频文件名 -> 模块中的引用
+    source:     音频文件名 -> 直接写出该文件名的源码文件
+    """
+    references: Dict[str, List[AudioReference]] = field(default_factory=dict)
+    source: Dict[str, List[str]] = field(default_factory=dict)
+    existing: Dict[str, int] = field(default_factory=dict)  # 现有音频文件名 -> 字节数
+    unparsed: List[str] = field(default_factory=list)  # 未能解析的模块文件
+
+    def modules(self, filename: str) -> Set[str]:
+        return {ref.file for ref in self.references.get(filename, [])}
+
+    @property
+    def live(self) -> List[str]:
+        return sorted(name for name in self.existing if name in self.references or name in self.source)
+
+    @property
+    def orphans(self) -> List[str]:
+        return sorted(name for name in self.existing if name not in self.references and name not in self.source)
+
+    @property
+    def shared(self) -> List[str]:
+        """被多个模块引用的现有音频"""
+        return [name for name in self.live if len(self.modules(name)) > 1]
+
+    @property
+    def missing(self) -> List[str]:
+        """模块中显式引用（audio 字段）但不存在的音频"""
+        return sorted(
+            name for name, refs in self.references.items()
+            if name not in self.existing and any(ref.explicit for ref in refs)
+        )
+
+    def size(self, names: List[str]) -> int:
+        return sum(self.existing.get(name, 0) for name in names)
+
+def count_references(content_index: ContentIndex) -> Dict[str, List[AudioReference]]:
+    """统计全部模块中每个音频文件名的引用"""
+    references: Dict[str, List[AudioReference]] = {}
+    for module in content_index.select():
+        for ref in extract_audio_references(module.content, module.file):
+            references.setdefault(ref.filename, []).append(ref)
+
+            # 句型卡片按自己的规则推导文件名，两种文件名都视为被引用
+            if ref.kind == "pattern" and not ref.explicit:
+                card_filename = pattern_card_filename(ref.text)
+                if card_filename and card_filename != ref.filename:
+                    references.setdefault(card_filename, []).append(AudioReference(
+                        file=ref.file, pointer=ref.pointer, kind="pattern", text=ref.text,
+                        filename=card_filename, explicit=False, id=ref.id, zh=ref.zh
+                    ))
+    return references
+
+def source_references(src_dir: Path, exclude: Optional[Path] = None) -> Dict[str, List[str]]:
+    """
+    组件源码中直接写出的音频文件名
+
+    如 ZhToEnStep 的 knownAudioFiles 列表中的 wordId，按 <wordId>.mp3 计入。
+    """
+    found: Dict[str, List[str]] = {}
+    for pattern in ("*.ts", "*.tsx"):
+        for source_file in src_dir.rglob(pattern):
+            if exclude and exclude in source_file.parents:
+                continue
+            try:
+                text = source_file.read_text(encoding='utf-8')
+            except (OSError, UnicodeDecodeError):
+                continue
+
+            relative = str(source_file.relative_to(src_dir))
+            for literal in set(SOURCE_LITERAL.findall(text)):
+                name = Path(literal).name
+                filename = name if name.endswith(".mp3") else f"{name}.mp3"
+                found.setdefault(filename, []).append(relative)
+    return found
+
+def analyze(audio_dir: Optional[Path] = None) -> GCReport:
+    """统计现有音频的引用情况"""
+    audio_dir = audio_dir or config.get_audio_dir()
+    content_index = get_content_index()
+
+    report = GCReport(
+        references=count_references(content_index),
+        existing={f.name: f.stat().st_size for f in audio_dir.glob("*.mp3")}
+    )
+
+    content_dir = config.get_content_dir()
+    report.source = {
+        name: files for name, files in source_references(content_dir.parent, content_dir).items()
+        if name in report.existing
+    }
+    report.unparsed = sorted(f.name for f in content_dir.glob("*.json") if f.name not in content_index.modules)
+    return report
+
+def get_trash_dir() -> Path:
+    return config.get_cache_dir() / "audio_trash"
+
+def quarantine(names: List[str], audio_dir: Optional[Path] = None) -> Optional[Path]:
+    """
+    把音频移入新的回收批次
+
+    Returns:
+        批次目录（没有文件需要移动时为 None）
+    """
+    if not names:
+        return None
+
+    audio_dir = audio_dir or config.get_audio_dir()
+    batch_dir = get_trash_dir() / datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    batch_dir.mkdir(parents=True)
+
+    moved = []
+    try:
+        for name in names:
+            source = audio_dir / name
+            size = source.stat().st_size
+            shutil.move(str(source), str(batch_dir / name))
+            moved.append({"name": name, "size": size})
+    finally:
+        # 中途失败时也记录已移动的文件，保证可以恢复
+        manifest = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "audio_dir": str(audio_dir),
+            "files": moved
+        }
+        temp_file = batch_dir / "manifest.json.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(temp_file, batch_dir / "manifest.json")
+
+    return batch_dir
+
+def list_batches() -> List[Path]:
+    """回收批次（按时间排序）"""
+    trash_dir = get_trash_dir()
+    if not trash_dir.exists():
+        return []
+    return sorted(d for d in trash_dir.iterdir() if (d / "manifest.json").exists())
+
+def restore(batch: Optional[str] = None) -> Dict[str, int]:
+    """
+    恢复一个回收批次（默认最近一批）
+
+    目标位置已有同名文件时保留该文件，批次中的副本留在回收区。
+
+    Returns:
+        统计 {"restored": 恢复数, "conflicts": 冲突数}
+    """
+    batches = list_batches()
+    if batch:
+        batches = [d for d in batches if d.name == batch]
+    if not batches:
+        raise FileNotFoundError(f"没有可恢复的回收批次{f': {batch}' if batch else ''}")
+
+    batch_dir = batches[-1]
+    with open(batch_dir / "manifest.json", 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    audio_dir = Path(manifest["audio_dir"])
+    stats = {"restored": 0, "conflicts": 0}
+    remaining = []
+
+    for entry in manifest["files"]:
+        source, target = batch_dir / entry["name"], audio_dir / entry["name"]
+        if not source.exists():
+            continue
+        if target.exists():
+            stats["conflicts"] += 1
+            remaining.append(entry)
+            continue
+        shutil.move(str(source), str(target))
+        stats["restored"] += 1
+
+    if remaining:
+        manifest["files"] = remaining
+        with open(batch_dir / "manifest.json", 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+    else:
+        shutil.rmtree(batch_dir)
+
+    print(f"♻️  批次 {batch_dir.name}: 恢复 {stats['restored']} 个文件")
+    if stats["conflicts"]:
+        print(f"⚠️ {stats['conflicts']} 个文件因同名文件已存在而保留在回收区")
+    return stats
+
+def _mb(size: int) -> str:
+    return f"{size / 1024 / 1024:.1f} MB"
+
+def print_gc_report(report: GCReport, limit: int = 20):
+    """打印引用计数结果"""
+    live, orphans, shared = report.live, report.orphans, report.shared
+    source_only = [name for name in live if name not in report.references]
+
+    print(f"\n📊 音频引用统计 ({len(report.existing)} 个文件, {_mb(report.size(list(report.existing)))}):")
+    print(f"   被引用: {len(live)} ({_mb(report.size(live))})，其中仅由组件源码引用: {len(source_only)}")
+    print(f"   多个模块共用: {len(shared)}")
+    print(f"   未被引用: {len(orphans)} ({_mb(report.size(orphans))})")
+
+    most_shared = sorted(shared, key=lambda name: len(report.modules(name)), reverse=True)
+    for name in most_shared[:5]:
+        print(f"     🔗 {name}: {len(report.modules(name))} 个模块，{len(report.references[name])} 处引用")
+
+    for name in orphans[:limit]:
+        print(f"     🗑️  {name} ({report.existing[name] / 1024:.0f} KB)")
+    if len(orphans) > limit:
+        print(f"     ... 以及其他 {len(orphans) - limit} 个文件")
+
+    missing = report.missing
+    if missing:
+        print(f"   ❌ 引用但不存在: {len(missing)}")
+        for name in missing[:10]:
+            print(f"     {name} ({report.references[name][0].location()})")
+
+def run_gc(dry_run: bool = False) -> GCReport:
+    """
+    统计引用并把未被引用的音频移入回收区
+
+    有模块文件无法解析时只报告不移动（其中的引用无法统计）。
+    """
+    audio_dir = config.get_audio_dir()
+    print(f"📁 音频目录: {audio_dir}")
+
+    report = analyze(audio_dir)
+    print_gc_report(report)
+
+    if report.unparsed:
+        print(f"\n⚠️ {len(report.unparsed)} 个模块文件无法解析，不移动任何音频: {', '.join(report.unparsed[:5])}")
+        return report
+
+    orphans = report.orphans
+    if dry_run or not orphans:
+        return report
+
+    batch_dir = quarantine(orphans, audio_dir)
+    print(f"\n🗑️  已移入回收区 {batch_dir}: {len(orphans)} 个文件，回收 {_mb(report.size(orphans))}")
+    print(f"   恢复: python scripts/manage.py gc --restore {batch_dir.name}")
+    return report
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="回收未被引用的音频文件")
+    parser.add_argument("--dry-run", action="store_true", help="只统计并报告，不移动文件")
+    parser.add_argument("--restore", nargs="?", const="", metavar="BATCH",
+                        help="恢复回收批次（默认最近一批）")
+
+    args = parser.parse_args()
+    if args.restore is not None:
+        restore(args.restore or None)
+    else:
+        run_gc(args.dry_run)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+增量音频构建清单
+记录每个模块JSON的 mtime、哈希及其引用的音频，
+重新构建时只重新解析发生变化的模块，并一次性报告过期、缺失和孤立的音频
+（孤立音频只在全量扫描时按 audio_gc 的引用计数判断）
+"""
+
+import os
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+
+from ..utils.common import extract_text_from_json, get_item_audio_filename
+from ..utils.config import config
+from .tts_cache import TTSCache, accepted_keys
+from .audio_gc import analyze as analyze_audio_references
+
+# 清单格式版本，记录内容变化时递增
+MANIFEST_VERSION = 2
+
+def file_sha256(filepath: Path) -> str:
+    """计算文件内容哈希"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+@dataclass
+class BuildReport:
+    """增量构建结果"""
+    changed_modules: List[str] = field(default_factory=list)
+    unchanged_modules: List[str] = field(default_factory=list)
+    removed_modules: List[str] = field(default_factory=list)
+    missing: List[Dict] = field(default_factory=list)
+    stale: List[Dict] = field(default_factory=list)
+    orphaned: Optional[List[str]] = None  # 未做孤立检查时为 None（非全量扫描）
+
+    @property
+    def pending_items(self) -> List[Dict]:
+        """需要（重新）生成的文本项"""
+        return self.missing + self.stale
+
+class BuildManifest:
+    """
+    模块内容清单
+
+    清单文件结构:
+        {"version": 2, "modules": {文件名: {"mtime", "sha256", "items"}}}
+    items 为 extract_text_from_json 的结果。
+    """
+
+    def __init__(self, manifest_file: Optional[Path] = None):
+        self.manifest_file = manifest_file or config.get_cache_dir() / "build_manifest.json"
+        self.content_dir = config.get_content_dir()
+        self.audio_dir = config.get_audio_dir()
+        self.modules: Dict[str, Dict] = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        """加载清单"""
+        if not self.manifest_file.exists():
+            return {}
+
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != MANIFEST_VERSION:
+                return {}
+            return data.get("modules", {})
+        except Exception as e:
+            print(f"⚠️ 读取构建清单失败: {e}")
+            return {}
+
+    def save(self):
+        """保存清单"""
+        self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.manifest_file.with_suffix(".tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({"version": MANIFEST_VERSION, "modules": self.modules}, f, ensure_ascii=False)
+        os.replace(temp_file, self.manifest_file)
+
+    def _refresh_module(self, json_file: Path) -> bool:
+        """
+        刷新单个模块的清单记录
+
+        Returns:
+            模块内容是否发生变化
+        """
+        stat = json_file.stat()
+        entry = self.modules.get(json_file.name)
+
+        # mtime 未变时直接复用记录
+        if entry and entry["mtime"] == stat.st_mtime:
+            return False
+
+        sha256 = file_sha256(json_file)
+        if entry and entry["sha256"] == sha256:
+            entry["mtime"] = stat.st_mtime
+            return False
+
+        with open(json_file, 'r', encoding='utf-8') as f:
+            content = json.load(f)
+        content['_filename'] = json_file.name
+
+        items = []
+        if content.get('moduleId') and content.get('title'):
+            items = extract_text_from_json(content)
+            for item in items:
+                item['filename'] = get_item_audio_filename(item)
+
+        self.modules[json_file.name] = {
+            "mtime": stat.st_mtime,
+            "sha256": sha256,
+            "items": items
+        }
+        return True
+
+    def scan(self, pattern: str = "*.json") -> BuildReport:
+        """
+        扫描内容目录并更新清单
+
+        Args:
+            pattern: 模块文件匹配模式
+
+        Returns:
+            构建报告
+        """
+        report = BuildReport()
+        json_files = sorted(self.content_dir.glob(pattern))
+        seen = set()
+
+        for json_file in json_files:
+            seen.add(json_file.name)
+            try:
+                if self._refresh_module(json_file):
+                    report.changed_modules.append(json_file.name)
+                else:
+                    report.unchanged_modules.append(json_file.name)
+            except Exception as e:
+                print(f"❌ 读取文件失败 {json_file.name}: {e}")
+
+        # 只有全量扫描时才能判断模块被删除
+        if pattern == "*.json":
+            for name in list(self.modules):
+                if name not in seen:
+                    report.removed_modules.append(name)
+                    del self.modules[name]
+
+        self._check_audio(report, seen)
+        if pattern == "*.json":
+            self._check_orphans(report)
+        return report
+
+    def _check_audio(self, report: BuildReport, modules: set):
+        """检查缺失和过期的音频（接受任一生成路径按当前参数生成的变体）"""
+        cache = TTSCache()
+
+        for name in sorted(modules):
+            entry = self.modules.get(name)
+            if not entry:
+                continue
+
+            for item in entry["items"]:
+                filepath = self.audio_dir / item['filename']
+                status = cache.status(filepath, accepted_keys(item['text']).values())
+                if status == "missing":
+                    report.missing.append(item)
+                elif status == "stale":
+                    report.stale.append(item)
+
+    def _check_orphans(self, report: BuildReport):
+        """
+        检查孤立的音频
+
+        与 manage.py gc 使用同一套引用计数（含句型卡片文件名和组件源码中的文件名）；
+        有模块无法解析时不报告孤立文件。
+        """
+        gc_report = analyze_audio_references(self.audio_dir)
+        if gc_report.unparsed:
+            print(f"⚠️ {len(gc_report.unparsed)} 个模块文件无法解析，跳过孤立音频检查")
+            return
+        report.orphaned = gc_report.orphans
+
+def print_build_report(report: BuildReport):
+    """打印构建报告"""
+    print("📋 增量构建报告:")
+    print(f"   变化模块: {len(report.changed_modules)}")
+    print(f"   未变模块: {len(report.unchanged_modules)}")
+    if report.removed_modules:
+        print(f"   已删除模块: {len(report.removed_modules)}")
+    print(f"   缺失音频: {len(report.missing)}")
+    print(f"   过期音频: {len(report.stale)}")
+    if report.orphaned is not None:
+        print(f"   孤立音频: {len(report.orphaned)}")
+
+    for item in report.missing[:20]:
+        print(f"   ❌ 缺失: {item['filename']} ({item['file']})")
+    for item in report.stale[:20]:
+        print(f"   🔄 过期: {item['filename']} ({item['file']})")
+    for filename in (report.orphaned or [])[:20]:
+        print(f"   🗑️  孤立: {filename}")
@@ -4,19 +4,34 @@
 使用Whisper ASR检查音频质量，支持多种检查模式
 """
 
+import os
+import re
 import json
 import time
+import heapq
 import argparse
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, asdict, fields
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 
 from ..utils.common import (
-    load_json_files, extract_text_from_json, get_audio_filename_from_path,
-    calculate_similarity, print_progress, generate_timestamp, get_audio_file_info,
-    load_whisper_model, format_duration, format_file_size
+    get_audio_filename_from_path, print_progress, generate_timestamp,
+    get_audio_file_info, load_whisper_model, format_duration, format_file_size, item_key
 )
 from ..utils.config import config
+from ..utils.transcript_cache import TranscriptCache
+from ..utils.result_sink import JsonlSink
+from ..utils.scoring import TranscriptScore, score_transcripts
+from .triage import triage_audio
+from .pcm_store import get_pcm_store, load_samples
+from .selectors import (
+    Selector, load_catalog_items, select_items, add_selector_arguments, selectors_from_args
+)
+
+# 报告中列出的问题项和高质量示例数量
+REPORT_PROBLEM_LIMIT = 30
+REPORT_EXAMPLE_LIMIT = 10
 
 @dataclass
 class CheckResult:
@@ -32,9 +47,14 @@ class CheckResult:
     status: str  # missing, failed, checked
     transcribed_text: str = ""
     similarity: float = 0.0
+    wer: float = 0.0  # 词错误率
+    cer: float = 0.0  # 字符错误率
     quality: str = ""  # high, medium, low
     issues: List[str] = None
     audio_info: Optional[Dict] = None
+    triage: Optional[Dict] = None  # 信号分诊指标，verdict 为 pass/fail 时未经转录
+    whisper_model: str = ""  # 给出最终转录结果的模型
+    escalations: int = 0  # 级联模式下升级模型的次数
 
     def __post_init__(self):
         if self.issues is None:
@@ -43,10 +63,20 @@ class CheckResult:
 class AudioQualityChecker:
     """音频质量检查器"""
 
-    def __init__(self):
+    def __init__(self, triage_accepts: bool = True):
+        """
+        Args:
+            triage_accepts: 分诊判定合格时是否直接通过（为 False 时只有分诊判定损坏的文件跳过转录）
+        """
+        self.triage_accepts = triage_accepts
         self.audio_dir = config.get_audio_dir()
         self.reports_dir = config.get_reports_dir()
-        self.whisper_model = None
+        # 已加载的Whisper模型常驻内存：模型名 -> 模型
+        self.whisper_models: Dict[str, object] = {}
+        self._failed_models = set()
+
+        # 转录结果缓存：音频未变化时不重新转录
+        self.transcript_cache = TranscriptCache()
 
         # 统计信息
         self.stats = {
@@ -58,32 +88,203 @@ class AudioQualityChecker:
             "missing_files": 0,
             "transcription_failed": 0,
             "invalid_files": 0,
+            "triaged_items": 0,
+            "escalated_items": 0,
             "check_duration": 0
         }
 
-    def load_whisper_model(self):
-        """加载Whisper模型"""
-        self.whisper_model = load_whisper_model()
-        return self.whisper_model is not None
+    def load_whisper_model(self, model_name: Optional[str] = None):
+        """加载Whisper模型（默认取 config.asr.whisper_model）"""
+        model_name = model_name or config.asr.whisper_model
+        model = load_whisper_model(model_name)
+        if model is None:
+            self._failed_models.add(model_name)
+            return False
+
+        self.whisper_models[model_name] = model
+        return True
+
+    def _ensure_whisper_model(self, model_name: Optional[str] = None):
+        """
+        获取已加载的模型，首次需要转录时才加载（全部命中缓存时无需加载）
+
+        Returns:
+            模型；加载失败时返回None
+        """
+        model_name = model_name or config.asr.whisper_model
+        if model_name not in self.whisper_models and model_name not in self._failed_models:
+            self.load_whisper_model(model_name)
+        return self.whisper_models.get(model_name)
 
-    def transcribe_audio(self, audio_path: Path) -> str:
+    def transcribe_audio(self, audio_path: Path, model_name: Optional[str] = None) -> str:
         """使用Whisper转录音频"""
-        if not self.whisper_model:
+        model_name = model_name or config.asr.whisper_model
+        cached = self.transcript_cache.get(audio_path, model_name)
+        if cached is not None:
+            return cached
+
+        model = self._ensure_whisper_model(model_name)
+        if model is None:
             return ""
 
         try:
-            result = self.whisper_model.transcribe(
-                str(audio_path),
+            # 已入PCM特征库的文件直接传入采样，不再启动ffmpeg解码
+            samples = load_samples(audio_path)
+            if samples is not None:
+                import numpy as np
+                samples = np.array(samples)
+
+            result = model.transcribe(
+                samples if samples is not None else str(audio_path),
                 fp16=False,
                 language='en'  # 指定为英语
             )
-            return result['text'].strip()
+            text = result['text'].strip()
         except Exception as e:
             print(f"❌ 转录失败 {audio_path.name}: {e}")
             return ""
 
+        self.transcript_cache.put(audio_path, model_name, text)
+        return text
+
+    def transcribe_batch(self, audio_paths: List[Path], model_name: Optional[str] = None) -> List[str]:
+        """
+        批量转录短音频（优先使用缓存）
+
+        Returns:
+            与 audio_paths 顺序一致的转录文本（失败为空字符串）
+        """
+        model_name = model_name or config.asr.whisper_model
+        texts = [self.transcript_cache.get(path, model_name) for path in audio_paths]
+        misses = [index for index, text in enumerate(texts) if text is None]
+
+        if misses:
+            if len(misses) == 1:
+                decoded = [self.transcribe_audio(audio_paths[misses[0]], model_name)]
+            elif self._ensure_whisper_model(model_name) is not None:
+                decoded = self._decode_batch([audio_paths[index] for index in misses], model_name)
+            else:
+                decoded = [""] * len(misses)
+
+            for index, text in zip(misses, decoded):
+                texts[index] = text
+                self.transcript_cache.put(audio_paths[index], model_name, text)
+
+        return texts
+
+    def _decode_batch(self, audio_paths: List[Path], model_name: str) -> List[str]:
+        """
+        批量解码短音频
+
+        把每个片段填充到Whisper的30秒窗口，堆叠为一个梅尔频谱批次，
+        一次前向解码全部片段。超过30秒的片段单独转录。
+        PCM特征库中已有的频谱或采样直接读取，不再解码。
+        """
+        try:
+            import numpy as np
+            import torch
+            import whisper
+        except ImportError:
+            return [self.transcribe_audio(path, model_name) for path in audio_paths]
+
+        model = self.whisper_models[model_name]
+        store = get_pcm_store()
+        texts = [""] * len(audio_paths)
+        mels = []
+        long_clips = []
+
+        for index, path in enumerate(audio_paths):
+            stored_mel = store.whisper_mel(path, model.dims.n_mels) if store else None
+            if stored_mel is not None:
+                mels.append((index, torch.from_numpy(stored_mel)))
+                continue
+
+            try:
+                samples = store.samples(path) if store else None
+                audio = np.array(samples) if samples is not None else whisper.load_audio(str(path))
+            except Exception as e:
+                print(f"❌ 读取音频失败 {path.name}: {e}")
+                continue
+
+            if len(audio) > whisper.audio.N_SAMPLES:
+                long_clips.append(index)
+                continue
+
+            mel = whisper.log_mel_spectrogram(
+                whisper.pad_or_trim(audio),
+                n_mels=model.dims.n_mels
+            )
+            mels.append((index, mel))
+
+        if mels:
+            try:
+                batch = torch.stack([mel for _, mel in mels]).to(model.device)
+                options = whisper.DecodingOptions(language='en', fp16=False, without_timestamps=True)
+                decoded = whisper.decode(model, batch, options)
+                for (index, _), result in zip(mels, decoded):
+                    texts[index] = result.text.strip()
+            except Exception as e:
+                print(f"⚠️ 批量转录失败，改为逐个转录: {e}")
+                for index, _ in mels:
+                    texts[index] = self.transcribe_audio(audio_paths[index], model_name)
+
+        for index in long_clips:
+            texts[index] = self.transcribe_audio(audio_paths[index], model_name)
+
+        return texts
+
     def check_audio_file(self, item: Dict) -> CheckResult:
         """检查单个音频文件"""
+        return self.check_batch([item])[0]
+
+    def check_batch(self, items: List[Dict]) -> List[CheckResult]:
+        """
+        检查一批音频文件
+
+        先逐项检查文件存在性和有效性，再做信号分诊，
+        分诊无法确定的文件一次性批量转录。启用级联模型时先用最小的模型转录，
+        相似度低于高质量阈值的再交给下一级模型重新转录。
+
+        Returns:
+            与 items 顺序一致的检查结果
+        """
+        prepared = [self._prepare_check(item) for item in items]
+
+        ready = [
+            (result, path) for result, path in prepared
+            if path is not None and not (config.asr.triage and self._apply_triage(result, path))
+        ]
+        ladder = config.asr.model_ladder()
+        for level, model_name in enumerate(ladder):
+            if not ready:
+                break
+
+            transcripts = self.transcribe_batch([path for _, path in ready], model_name)
+            scores = score_transcripts([(result.text, text) for (result, _), text in zip(ready, transcripts)])
+            is_last = level == len(ladder) - 1
+
+            escalate = []
+            for (result, path), transcribed, score in zip(ready, transcripts, scores):
+                # 空转录（小模型没听出内容）同样交给下一级模型
+                if not is_last and score.similarity < config.asr.similarity_threshold_high:
+                    escalate.append((result, path))
+                    continue
+
+                result.whisper_model = model_name
+                result.escalations = level
+                self._score_transcription(result, transcribed, score)
+
+            ready = escalate
+
+        return [result for result, _ in prepared]
+
+    def _prepare_check(self, item: Dict) -> Tuple[CheckResult, Optional[Path]]:
+        """
+        检查文件存在性和有效性
+
+        Returns:
+            (检查结果, 待转录的音频路径)；文件缺失或无效时路径为None
+        """
         # 提取文件名
         filename = get_audio_filename_from_path(item['audio_path'])
         full_audio_path = self.audio_dir / filename
@@ -103,8 +304,7 @@ class AudioQualityChecker:
         # 检查文件是否存在
         if not full_audio_path.exists():
             result.issues.append('音频文件不存在')
-            self.stats["missing_files"] += 1
-            return result
+            return result, None
 
         # 获取音频文件信息
         audio_info = get_audio_file_info(full_audio_path)
@@ -118,32 +318,54 @@ class AudioQualityChecker:
         if not audio_info.is_valid:
             result.status = 'invalid'
             result.issues.append(audio_info.error_message or '文件无效')
-            self.stats["invalid_files"] += 1
-            return result
+            return result, None
+
+        return result, full_audio_path
 
-        # 转录音频
-        transcribed = self.transcribe_audio(full_audio_path)
+    def _apply_triage(self, result: CheckResult, audio_path: Path) -> bool:
+        """
+        信号级分诊
+
+        Returns:
+            是否已得出结论（True 时无需再转录）
+        """
+        triage = triage_audio(audio_path, result.text)
+        if triage is None:
+            return False
+
+        result.triage = triage.to_dict()
+        if triage.verdict == "ambiguous" or (triage.verdict == "pass" and not self.triage_accepts):
+            return False
+
+        if triage.verdict == "pass":
+            result.quality = "high"
+        else:
+            result.quality = "low"
+            result.issues.extend(triage.issues)
+
+        result.status = 'checked'
+        return True
+
+    def _score_transcription(self, result: CheckResult, transcribed: str, score: TranscriptScore):
+        """根据转录文本的评分评估质量"""
         if not transcribed:
             result.status = 'failed'
             result.issues.append('Whisper转录失败')
-            self.stats["transcription_failed"] += 1
-            return result
+            return
 
-        # 计算相似度
-        similarity = calculate_similarity(item['text'], transcribed)
+        similarity = score.similarity
         result.transcribed_text = transcribed
         result.similarity = round(similarity, 3)
+        result.wer = round(score.wer, 3)
+        result.cer = round(score.cer, 3)
 
         # 评估质量
         if similarity >= config.asr.similarity_threshold_high:
             result.quality = "high"
-            self.stats["high_quality"] += 1
         elif similarity >= config.asr.similarity_threshold_medium:
             result.quality = "medium"
-            self.stats["medium_quality"] += 1
         else:
             result.quality = "low"
-            self.stats["low_quality"] += 1
 
         # 识别问题
         if similarity < 0.5:
@@ -151,73 +373,252 @@ class AudioQualityChecker:
         elif similarity < config.asr.similarity_threshold_medium:
             result.issues.append("识别准确率较低")
 
-        if audio_info.duration:
-            if audio_info.duration < 0.5:
+        duration = result.audio_info.get('duration') if result.audio_info else None
+        if duration:
+            if duration < 0.5:
                 result.issues.append("音频时长过短")
-            elif audio_info.duration > len(item['text']) * 0.3 + 2:
+            elif duration > len(result.text) * 0.3 + 2:
                 result.issues.append("音频时长可能过长")
 
         result.status = 'checked'
-        self.stats["checked_items"] += 1
 
-        return result
-
-    def check_pattern(self, pattern: str) -> List[CheckResult]:
+    def _record_stats(self, result: CheckResult):
+        """根据检查结果更新统计信息"""
+        if result.status == 'missing':
+            self.stats["missing_files"] += 1
+        elif result.status == 'invalid':
+            self.stats["invalid_files"] += 1
+        elif result.status == 'failed':
+            self.stats["transcription_failed"] += 1
+        elif result.status == 'checked':
+            self.stats["checked_items"] += 1
+            self.stats[f"{result.quality}_quality"] += 1
+            if not result.transcribed_text and result.triage:
+                self.stats["triaged_items"] += 1
+            if result.escalations:
+                self.stats["escalated_items"] += 1
+
+    def check_pattern(self, pattern: str, workers: Optional[int] = None,
+                      batch_size: Optional[int] = None) -> List[CheckResult]:
         """
         根据模式检查音频质量
 
         Args:
             pattern: 文件匹配模式，如 "grade6-*.json", "module-01-*.json"
+            workers: 并行转录的工作进程数（默认取 config.asr.workers）
+            batch_size: 每次批量解码的片段数（默认取 config.asr.batch_size）
 
         Returns:
             检查结果列表
         """
         print(f"🔍 正在搜索匹配模式: {pattern}")
+        return self.check_items(self.collect_items(pattern), workers, batch_size)
 
-        # 加载匹配的JSON文件
-        contents = load_json_files(pattern)
-        if not contents:
-            print(f"❌ 未找到匹配 '{pattern}' 的文件")
+    def collect_items(self, pattern: str = "*.json",
+                      selectors: Sequence[Selector] = ()) -> List[Dict]:
+        """
+        加载一次内容并按选择器筛选需要检查的文本项
+
+        Args:
+            pattern: 模块文件匹配模式
+            selectors: 附加的选择器（全部满足才选中）
+
+        Returns:
+            文本项列表
+        """
+        items = load_catalog_items(pattern)
+        if not items:
+            print(f"❌ 未找到匹配 '{pattern}' 的内容")
             return []
 
-        print(f"📚 找到 {len(contents)} 个文件")
+        modules = {item['file'] for item in items}
+        print(f"📚 找到 {len(modules)} 个文件")
 
-        # 提取所有需要检查的文本项
-        items = []
-        for content in contents:
-            if not content.get('moduleId') or not content.get('title'):
-                print(f"⚠️ 跳过无效文件: {content.get('_filename', 'unknown')}")
-                continue
+        if selectors:
+            items = select_items(items, selectors)
+            print(f"🎯 选择器筛选后剩余 {len(items)} 个音频项")
 
-            content_items = extract_text_from_json(content)
-            items.extend(content_items)
+        return items
 
+    def check_items(self, items: List[Dict], workers: Optional[int] = None,
+                    batch_size: Optional[int] = None) -> List[CheckResult]:
+        """
+        检查给定的文本项
+
+        Returns:
+            与 items 顺序一致的检查结果
+        """
+        results: List[Optional[CheckResult]] = [None] * len(items)
+        for index, result in self.stream_checks(items, workers, batch_size):
+            results[index] = result
+        return results
+
+    def stream_checks(self, items: List[Dict], workers: Optional[int] = None,
+                      batch_size: Optional[int] = None) -> Iterator[Tuple[int, CheckResult]]:
+        """
+        逐个产出检查结果，同时更新统计信息和进度
+
+        Yields:
+            (项目序号, 检查结果)，按完成顺序
+        """
         if not items:
             print("❌ 未找到需要检查的音频内容")
-            return []
+            return
 
         print(f"📊 总计需要检查: {len(items)} 个音频项")
-
         self.stats["total_items"] = len(items)
-
-        # 检查音频质量
-        results = []
         start_time = time.time()
 
-        for i, item in enumerate(items):
+        workers = workers or config.asr.workers
+        batch_size = batch_size or config.asr.batch_size
+        for i, (index, result) in enumerate(self._iter_checks(items, workers, batch_size)):
+            item = items[index]
             print_progress(i + 1, len(items), "检查进度", f"{item['module_id']} - {item['type']}")
-            result = self.check_audio_file(item)
-            results.append(result)
+            self._record_stats(result)
+            self.stats["check_duration"] = time.time() - start_time
+            yield index, result
 
-            # 避免系统过载
-            time.sleep(0.1)
+    def _iter_checks(self, items: List[Dict], workers: int,
+                     batch_size: int = 1) -> Iterator[Tuple[int, CheckResult]]:
+        """
+        逐批检查音频
 
-        self.stats["check_duration"] = time.time() - start_time
+        items 按 batch_size 分批，每批一次批量解码；
+        workers > 1 时使用进程池，每个工作进程持有自己的Whisper模型，
+        同时在途的批次数限制为 workers * 2，避免一次性提交全部任务。
 
-        return results
+        Yields:
+            (项目序号, 检查结果)，按完成顺序
+        """
+        batch_size = max(1, batch_size)
+        batches = [
+            list(range(start, min(start + batch_size, len(items))))
+            for start in range(0, len(items), batch_size)
+        ]
+
+        if workers <= 1 or len(batches) <= 1:
+            for batch in batches:
+                results = self.check_batch([items[index] for index in batch])
+                yield from zip(batch, results)
+            return
+
+        workers = min(workers, len(batches))
+        print(f"🚀 使用 {workers} 个工作进程并行转录")
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(asdict(config.asr), workers)
+        ) as executor:
+            queue = iter(batches)
+            in_flight = {}
+
+            def submit_next() -> bool:
+                batch = next(queue, None)
+                if batch is None:
+                    return False
+                future = executor.submit(_check_in_worker, [items[index] for index in batch])
+                in_flight[future] = batch
+                return True
+
+            for _ in range(workers * 2):
+                if not submit_next():
+                    break
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch = in_flight.pop(future)
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        results = [
+                            self._failed_result(items[index], f"工作进程异常: {e}")
+                            for index in batch
+                        ]
+                    yield from zip(batch, results)
+                    submit_next()
+
+    def _failed_result(self, item: Dict, message: str) -> CheckResult:
+        """构造检查失败的结果"""
+        return CheckResult(
+            module_id=item['module_id'],
+            module_title=item['module_title'],
+            item_type=item['type'],
+            item_id=item['id'],
+            text=item['text'],
+            zh=item['zh'],
+            audio_path=item['audio_path'],
+            filename=get_audio_filename_from_path(item['audio_path']),
+            status='failed',
+            issues=[message]
+        )
+
+    def summarize(self, results: Iterable[CheckResult]) -> Dict:
+        """
+        一次遍历汇总检查结果
+
+        重新计算 self.stats 中的计数；问题列表只保留相似度最低的若干项，
+        高质量示例只保留前若干项，内存占用与结果数量无关。
+
+        Returns:
+            {'total', 'modules', 'problems', 'high_examples'}
+        """
+        for key in self.stats:
+            if key != "check_duration":
+                self.stats[key] = 0
+
+        module_stats = {}
+        problems = []  # 最小堆 (-相似度, -序号, 结果)，堆顶为当前最"好"的问题项
+        high_examples = []
+        total = 0
+
+        for seq, result in enumerate(results):
+            total += 1
+            self._record_stats(result)
+
+            stats = module_stats.setdefault(result.module_id, {
+                'title': result.module_title,
+                'total': 0,
+                'high': 0,
+                'medium': 0,
+                'low': 0,
+                'missing': 0,
+                'failed': 0,
+                'invalid': 0
+            })
+            stats['total'] += 1
+            if result.quality in ('high', 'medium', 'low'):
+                stats[result.quality] += 1
+            elif result.status in ('missing', 'failed', 'invalid'):
+                stats[result.status] += 1
+
+            if result.quality == 'low' or result.status in ('missing', 'failed', 'invalid'):
+                heapq.heappush(problems, (-result.similarity, -seq, result))
+                if len(problems) > REPORT_PROBLEM_LIMIT:
+                    heapq.heappop(problems)
+            elif result.quality == 'high' and len(high_examples) < REPORT_EXAMPLE_LIMIT:
+                high_examples.append(result)
+
+        self.stats["total_items"] = total
+
+        return {
+            'total': total,
+            'modules': module_stats,
+            # 按相似度升序，相同时保持原顺序
+            'problems': [result for _, _, result in sorted(problems, reverse=True)],
+            'high_examples': high_examples
+        }
+
+    def generate_report(self, results: Iterable[CheckResult], pattern: str) -> str:
+        """
+        生成检查报告
+
+        results 只遍历一次，可以直接传入从结果流读取的生成器。
+        """
+        summary = self.summarize(results)
+        module_stats = summary['modules']
 
-    def generate_report(self, results: List[CheckResult], pattern: str) -> str:
-        """生成检查报告"""
         report_lines = []
         report_lines.append("=" * 80)
         report_lines.append("🎵 音频质量检查报告")
@@ -225,17 +626,20 @@ class AudioQualityChecker:
         report_lines.append("=" * 80)
         report_lines.append(f"📅 检查时间: {time.strftime('%Y-%m-%d %H:%M:%S')}")
         report_lines.append(f"🎯 检查模式: {pattern}")
-        report_lines.append(f"🤖 Whisper模型: {config.asr.whisper_model}")
+        report_lines.append(f"🤖 Whisper模型: {' → '.join(config.asr.model_ladder())}")
         report_lines.append(f"⏱️  检查耗时: {format_duration(self.stats['check_duration'])}")
         report_lines.append("")
 
         # 总体统计
-        total = len(results)
+        total = summary['total']
         success_rate = (self.stats["high_quality"] + self.stats["medium_quality"]) / total * 100 if total > 0 else 0
 
         report_lines.append("📊 总体统计:")
         report_lines.append(f"   总项目数: {total}")
         report_lines.append(f"   检查完成: {self.stats['checked_items']}")
+        report_lines.append(f"   信号分诊直接判定: {self.stats['triaged_items']}")
+        if len(config.asr.model_ladder()) > 1:
+            report_lines.append(f"   升级模型复核: {self.stats['escalated_items']}")
         report_lines.append(f"   高质量 (≥{config.asr.similarity_threshold_high*100:.0f}%): {self.stats['high_quality']} ({self.stats['high_quality']/total*100:.1f}%)")
         report_lines.append(f"   中等质量 ({config.asr.similarity_threshold_medium*100:.0f}%-{config.asr.similarity_threshold_high*100:.0f}%): {self.stats['medium_quality']} ({self.stats['medium_quality']/total*100:.1f}%)")
         report_lines.append(f"   低质量 (<{config.asr.similarity_threshold_medium*100:.0f}%): {self.stats['low_quality']} ({self.stats['low_quality']/total*100:.1f}%)")
@@ -246,35 +650,6 @@ class AudioQualityChecker:
         report_lines.append("")
 
         # 按模块统计
-        module_stats = {}
-        for result in results:
-            module_id = result.module_id
-            if module_id not in module_stats:
-                module_stats[module_id] = {
-                    'title': result.module_title,
-                    'total': 0,
-                    'high': 0,
-                    'medium': 0,
-                    'low': 0,
-                    'missing': 0,
-                    'failed': 0,
-                    'invalid': 0
-                }
-
-            module_stats[module_id]['total'] += 1
-            if result.quality == 'high':
-                module_stats[module_id]['high'] += 1
-            elif result.quality == 'medium':
-                module_stats[module_id]['medium'] += 1
-            elif result.quality == 'low':
-                module_stats[module_id]['low'] += 1
-            elif result.status == 'missing':
-                module_stats[module_id]['missing'] += 1
-            elif result.status == 'failed':
-                module_stats[module_id]['failed'] += 1
-            elif result.status == 'invalid':
-                module_stats[module_id]['invalid'] += 1
-
         report_lines.append("📈 按模块统计:")
         report_lines.append("-" * 80)
         for module_id, stats in module_stats.items():
@@ -287,16 +662,14 @@ class AudioQualityChecker:
             report_lines.append("")
 
         # 问题文件列表
-        problem_results = [r for r in results if r.quality in ['low'] or r.status in ['missing', 'failed', 'invalid']]
+        problem_results = summary['problems']
 
         if problem_results:
             report_lines.append("⚠️ 需要关注的音频文件:")
             report_lines.append("-" * 80)
 
-            # 按相似度排序
-            problem_results.sort(key=lambda x: x.similarity)
-
-            for result in problem_results[:30]:  # 只显示前30个问题
+            # 已按相似度排序，只保留前30个问题
+            for result in problem_results:
                 status_icon = {
                     "low": "🔴",
                     "missing": "❌",
@@ -311,7 +684,7 @@ class AudioQualityChecker:
                 report_lines.append(f"   🔊 识别: '{transcribed_text}'")
 
                 if result.similarity > 0:
-                    report_lines.append(f"   📊 相似度: {result.similarity:.1%}")
+                    report_lines.append(f"   📊 相似度: {result.similarity:.1%} (WER {result.wer:.1%}, CER {result.cer:.1%})")
 
                 if result.audio_info and result.audio_info.get('duration'):
                     report_lines.append(f"   ⏱️  时长: {format_duration(result.audio_info['duration'])}")
@@ -322,16 +695,19 @@ class AudioQualityChecker:
                 report_lines.append("")
 
         # 高质量示例
-        high_quality_results = [r for r in results if r.quality == 'high']
+        high_quality_results = summary['high_examples']
         if high_quality_results:
             report_lines.append("✅ 高质量音频示例:")
             report_lines.append("-" * 80)
 
-            for result in high_quality_results[:10]:  # 显示前10个高质量示例
+            for result in high_quality_results:  # 显示前10个高质量示例
                 report_lines.append(f"📁 {result.module_id} ({result.item_type})")
                 report_lines.append(f"   📝 原文: '{result.text}'")
-                report_lines.append(f"   🔊 识别: '{result.transcribed_text}'")
-                report_lines.append(f"   📊 相似度: {result.similarity:.1%}")
+                if result.transcribed_text:
+                    report_lines.append(f"   🔊 识别: '{result.transcribed_text}'")
+                    report_lines.append(f"   📊 相似度: {result.similarity:.1%}")
+                else:
+                    report_lines.append("   📶 信号分诊通过（未转录）")
                 if result.audio_info and result.audio_info.get('duration'):
                     report_lines.append(f"   ⏱️  时长: {format_duration(result.audio_info['duration'])}")
                 report_lines.append("")
@@ -364,10 +740,14 @@ class AudioQualityChecker:
 
         return "\n".join(report_lines)
 
-    def save_report(self, report: str, results: List[CheckResult], pattern: str):
+    def stream_path(self, pattern: str) -> Path:
+        """检查范围对应的结果流文件（同一范围续跑时复用）"""
+        return self.reports_dir / f"audio_quality_stream_{scope_filename(pattern)}.jsonl"
+
+    def save_report(self, report: str, results: Iterable[CheckResult], pattern: str):
         """保存报告到文件"""
         timestamp = generate_timestamp()
-        pattern_safe = pattern.replace('*', 'all').replace('?', 'any')
+        pattern_safe = scope_filename(pattern)
         report_filename = f"audio_quality_report_{pattern_safe}_{timestamp}.txt"
         json_filename = f"audio_quality_data_{pattern_safe}_{timestamp}.json"
 
@@ -384,42 +764,186 @@ class AudioQualityChecker:
             'pattern': pattern,
             'config': {
                 'whisper_model': config.asr.whisper_model,
+                'cascade_models': config.asr.model_ladder(),
                 'high_threshold': config.asr.similarity_threshold_high,
-                'medium_threshold': config.asr.similarity_threshold_medium
+                'medium_threshold': config.asr.similarity_threshold_medium,
+                'triage': config.asr.triage
             },
-            'stats': self.stats,
-            'results': [
-                {
-                    'module_id': r.module_id,
-                    'module_title': r.module_title,
-                    'item_type': r.item_type,
-                    'item_id': r.item_id,
-                    'text': r.text,
-                    'zh': r.zh,
-                    'audio_path': r.audio_path,
-                    'filename': r.filename,
-                    'status': r.status,
-                    'transcribed_text': r.transcribed_text,
-                    'similarity': r.similarity,
-                    'quality': r.quality,
-                    'issues': r.issues,
-                    'audio_info': r.audio_info
-                } for r in results
-            ]
+            'stats': self.stats
         }
 
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, indent=2, ensure_ascii=False)
+        dump_results_json(json_file, json_data, (result_to_dict(r) for r in results))
         print(f"📊 JSON数据已保存到: {json_file}")
 
+    def read_results(self, pattern: str) -> Iterator[CheckResult]:
+        """逐条读取检查范围的结果流"""
+        stream_file = self.stream_path(pattern)
+        if not stream_file.exists():
+            return
+        with open(stream_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield result_from_dict(json.loads(line))
+
+    def export_results(self, results: Iterable[CheckResult], json_file: Path):
+        """
+        按旧版分年级检查脚本的格式导出结果
+
+        每项额外带有 en/type 字段，供 fix_grade6_audio_issues.py 等修复脚本读取。
+        """
+        data = {
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'stats': self.stats
+        }
+        records = (dict(result_to_dict(r), en=r.text, type=r.item_type) for r in results)
+        dump_results_json(json_file, data, records)
+        print(f"📊 JSON数据已保存到: {json_file}")
+
+def dump_results_json(json_file: Path, data: Dict, records: Iterable[Dict]):
+    """
+    写入 {**data, "results": [...]} 形式的JSON
+
+    results 逐条写入（每条一行），不在内存中构建完整列表。
+    """
+    head = json.dumps(data, indent=2, ensure_ascii=False)
+    with open(json_file, 'w', encoding='utf-8') as f:
+        f.write(head[:-2] + ',\n  "results": [')
+        separator = "\n    "
+        for record in records:
+            f.write(separator + json.dumps(record, ensure_ascii=False))
+            separator = ",\n    "
+        f.write("\n  ]\n}\n")
+
+def scope_filename(pattern: str) -> str:
+    """把检查范围描述转换为可用于文件名的字符串"""
+    pattern_safe = pattern.replace('*', 'all').replace('?', 'any')
+    return re.sub(r'[^\w.+-]', '_', pattern_safe)
+
+def result_from_dict(data: Dict) -> CheckResult:
+    """从序列化的字典恢复检查结果"""
+    return CheckResult(**{f.name: data[f.name] for f in fields(CheckResult) if f.name in data})
+
+def result_to_dict(result: CheckResult) -> Dict:
+    """转换检查结果为可序列化的字典"""
+    return {
+        'module_id': result.module_id,
+        'module_title': result.module_title,
+        'item_type': result.item_type,
+        'item_id': result.item_id,
+        'text': result.text,
+        'zh': result.zh,
+        'audio_path': result.audio_path,
+        'filename': result.filename,
+        'status': result.status,
+        'transcribed_text': result.transcribed_text,
+        'whisper_model': result.whisper_model,
+        'escalations': result.escalations,
+        'similarity': result.similarity,
+        'wer': result.wer,
+        'cer': result.cer,
+        'quality': result.quality,
+        'issues': result.issues,
+        'audio_info': result.audio_info,
+        'triage': result.triage
+    }
+
+def run_check(pattern: str = "*.json", selectors: Sequence[Selector] = (),
+              scope: Optional[str] = None, quiet: bool = False, resume: bool = False
+              ) -> Tuple[AudioQualityChecker, int]:
+    """
+    加载一次内容，按选择器检查并生成、保存报告
+
+    每项结果完成后立即追加到 reports/ 下的JSONL结果流，报告由结果流汇总生成；
+    中断后以 resume=True 重新运行同一范围，会跳过结果流中已有的项。
+    结果不保存在内存中，需要逐项处理时用 checker.read_results(scope) 读取结果流。
+
+    Args:
+        pattern: 模块文件匹配模式
+        selectors: 附加的选择器
+        scope: 报告中的检查范围描述（默认为 pattern）
+        quiet: 不打印完整报告
+        resume: 续跑上次中断的检查
+
+    Returns:
+        (检查器, 检查项数)；没有可检查的内容时为0
+    """
+    scope = scope or pattern
+
+    # 创建检查器（Whisper模型在首次需要转录时加载，命中缓存的音频无需模型）
+    checker = AudioQualityChecker()
+    items = checker.collect_items(pattern, selectors)
+    if not items:
+        print("❌ 没有找到需要检查的内容")
+        return checker, 0
+
+    with JsonlSink(checker.stream_path(scope), resume=resume) as sink:
+        print(f"📝 结果流: {sink.path}")
+
+        if resume:
+            completed = sink.completed_keys()
+            remaining = [item for item in items if item_key(item) not in completed]
+            print(f"⏩ 跳过上次已完成的 {len(items) - len(remaining)} 项")
+            items = remaining
+
+        if items:
+            for index, result in checker.stream_checks(items):
+                sink.write(dict(result_to_dict(result), key=item_key(items[index])))
+        else:
+            print("✅ 所有项目已在上次运行中完成")
+
+        # 生成报告
+        print(f"\n📊 生成检查报告...")
+        report = checker.generate_report(map(result_from_dict, sink.read()), scope)
+
+        # 打印报告摘要
+        if not quiet:
+            print("\n" + report)
+
+        # 保存报告
+        checker.save_report(report, map(result_from_dict, sink.read()), scope)
+
+    total = checker.stats['total_items']
+    print(f"✅ 检查完成！共检查了 {total} 个音频项")
+    return checker, total
+
+# 进程池工作进程内的检查器实例（每个进程一个Whisper模型）
+_worker_checker: Optional[AudioQualityChecker] = None
+
+def _init_worker(asr_settings: Dict, workers: int, triage_accepts: bool = True):
+    """初始化工作进程：同步ASR配置（Whisper模型在首次缓存未命中时加载）"""
+    global _worker_checker
+
+    for key, value in asr_settings.items():
+        setattr(config.asr, key, value)
+
+    # 平分CPU线程，避免多个进程互相抢占
+    try:
+        import torch
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+    except ImportError:
+        pass
+
+    _worker_checker = AudioQualityChecker(triage_accepts)
+
+def _check_in_worker(items: List[Dict]) -> List[CheckResult]:
+    """在工作进程中检查一批音频"""
+    return _worker_checker.check_batch(items)
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description="音频质量检查工具")
-    parser.add_argument("pattern", help="文件匹配模式，如 'grade6-*.json', 'module-01-*.json'")
+    parser.add_argument("pattern", nargs="?", default="*.json",
+                        help="文件匹配模式，如 'grade6-*.json', 'module-01-*.json' (默认: *.json)")
     parser.add_argument("--config", help="配置文件路径")
     parser.add_argument("--model", default=None, help="Whisper模型 (tiny, base, small, medium, large)")
     parser.add_argument("--quiet", action="store_true", help="静默模式，只输出摘要")
     parser.add_argument("--device", help="设备 (cpu, cuda, auto)")
+    parser.add_argument("--workers", type=int, help="并行转录的工作进程数 (默认: 1)")
+    parser.add_argument("--batch-size", type=int, help="每次批量解码的片段数 (默认: 1)")
+    parser.add_argument("--cascade", help="级联模型，如 'tiny,base,small'（先用小模型，低于高质量阈值再升级）")
+    add_selector_arguments(parser)
+    parser.add_argument("--resume", action="store_true", help="续跑上次中断的检查（跳过结果流中已完成的项）")
+    parser.add_argument("--no-triage", action="store_true", help="跳过信号分诊，全部音频都用Whisper转录")
 
     args = parser.parse_args()
 
@@ -432,6 +956,14 @@ def main():
         config.asr.whisper_model = args.model
     if args.device:
         config.asr.device = args.device
+    if args.workers:
+        config.asr.workers = args.workers
+    if args.batch_size:
+        config.asr.batch_size = args.batch_size
+    if args.no_triage:
+        config.asr.triage = False
+    if args.cascade:
+        config.asr.cascade_models = args.cascade
 
     print("🎵 音频质量检查器启动")
     print(f"📁 项目目录: {config.project_root}")
@@ -439,37 +971,16 @@ def main():
     print(f"📄 报告目录: {config.get_reports_dir()}")
     print("=" * 60)
 
-    # 创建检查器
-    checker = AudioQualityChecker()
-
-    # 加载Whisper模型
-    if not checker.load_whisper_model():
-        print("❌ 无法加载Whisper模型，程序退出")
+    try:
+        selectors, scope = selectors_from_args(args)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"❌ {e}")
         return
 
     try:
-        # 执行检查
-        results = checker.check_pattern(args.pattern)
-
-        if not results:
-            print("❌ 没有找到需要检查的内容")
-            return
-
-        # 生成报告
-        print(f"\n📊 生成检查报告...")
-        report = checker.generate_report(results, args.pattern)
-
-        # 打印报告摘要
-        if not args.quiet:
-            print("\n" + report)
-
-        # 保存报告
-        checker.save_report(report, results, args.pattern)
-
-        print(f"✅ 检查完成！共检查了 {len(results)} 个音频项")
-
+        run_check(args.pattern, selectors, scope, args.quiet, args.resume)
     except KeyboardInterrupt:
-        print("\n⚠️ 检查被用户中断")
+        print("\n⚠️ 检查被用户中断，已完成的结果保存在结果流中，可用 --resume 续跑")
     except Exception as e:
         print(f"❌ 检查过程中发生错误: {e}")
         raise
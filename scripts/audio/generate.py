@@ -9,18 +9,103 @@ import sys
 import time
 import argparse
 import subprocess
+from array import array
 from pathlib import Path
-from typing import Dict, List, Optional, Union
-from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from dataclasses import dataclass, asdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # 添加项目根目录到Python路径
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from scripts.utils.common import (
-    load_json_files, extract_text_from_json, text_to_filename,
-    print_progress, generate_timestamp, ensure_directory
+    load_json_files, extract_text_from_json, text_to_filename, get_item_audio_filename,
+    build_audio_work_list, print_progress, generate_timestamp, ensure_directory
 )
 from scripts.utils.config import config
+from scripts.audio.tts_cache import (
+    TTSCache, SYNTHESIS_VARIANTS, synthesis_key, accepted_keys, atomic_copy
+)
+from scripts.audio.job_journal import JobJournal, partial_path, commit_output
+from scripts.audio.triage import predict_duration
+
+# 批量合成的短文本最大词数
+SHORT_TEXT_MAX_WORDS = 3
+
+# 批量合成切分参数（毫秒）
+BATCH_MIN_SILENCE_MS = 250
+BATCH_PADDING_MS = 60
+
+# 批量切分出的片段时长与预测时长之比超出此范围时整批回退（切分错位的迹象）
+BATCH_DURATION_RATIO = (0.4, 2.5)
+
+# Coqui TTS模型缓存（按模型名称，进程内共享）
+_coqui_models: Dict[str, object] = {}
+
+def get_coqui_tts(model_name: str):
+    """
+    获取指定模型的Coqui TTS实例
+
+    模型在首次使用时加载并预热，之后同一进程内的所有调用
+    （包括 generate_audio 和 generate_missing_audio）都复用同一个实例。
+
+    Args:
+        model_name: Coqui模型名称
+
+    Returns:
+        TTS.api.TTS 实例
+    """
+    tts = _coqui_models.get(model_name)
+    if tts is not None:
+        return tts
+
+    from TTS.api import TTS
+
+    print(f"📦 加载Coqui模型: {model_name}")
+    load_start = time.time()
+    tts = TTS(model_name=model_name, progress_bar=False)
+    load_time = time.time() - load_start
+
+    # 预热一次推理，避免首个音频项承担额外开销
+    warmup_start = time.time()
+    tts.tts(text="Hello.", **_coqui_tts_kwargs(tts))
+    warmup_time = time.time() - warmup_start
+
+    print(f"🔥 Coqui模型就绪 (加载: {load_time:.1f}s, 预热: {warmup_time:.1f}s)")
+
+    _coqui_models[model_name] = tts
+    return tts
+
+def is_short_text(text: str) -> bool:
+    """是否为可批量合成的短文本（单词或短语）"""
+    return len(text.split()) <= SHORT_TEXT_MAX_WORDS
+
+def _as_sentence(text: str) -> str:
+    """确保文本以句末标点结尾"""
+    text = text.strip()
+    return text if text[-1:] in ".!?" else text + "."
+
+def _merge_ranges(ranges: List[List[int]], count: int) -> List[List[int]]:
+    """
+    合并非静音区间直到数量不超过 count
+
+    单个短语内部的短暂停顿会产生多余的区间，每次合并间隔最小的相邻区间。
+    """
+    ranges = [list(r) for r in ranges]
+    while len(ranges) > count:
+        gaps = [ranges[i + 1][0] - ranges[i][1] for i in range(len(ranges) - 1)]
+        i = gaps.index(min(gaps))
+        ranges[i:i + 2] = [[ranges[i][0], ranges[i + 1][1]]]
+    return ranges
+
+def _coqui_tts_kwargs(tts) -> Dict:
+    """多说话人/多语言模型需要的额外参数"""
+    kwargs = {}
+    if getattr(tts, "is_multi_speaker", False) and tts.speakers:
+        kwargs["speaker"] = tts.speakers[0]
+    if getattr(tts, "is_multi_lingual", False):
+        kwargs["language"] = "en"
+    return kwargs
 
 @dataclass
 class TTSResult:
@@ -32,6 +117,7 @@ class TTSResult:
     engine: str
     duration: Optional[float] = None
     error_message: Optional[str] = None
+    cache_key: Optional[str] = None
 
 class TTSGenerator:
     """TTS音频生成器"""
@@ -40,6 +126,8 @@ class TTSGenerator:
         self.audio_dir = config.get_audio_dir()
         ensure_directory(self.audio_dir)
 
+        self.cache = TTSCache()
+
         self.engines = []
         self._initialize_engines()
 
@@ -108,22 +196,14 @@ class TTSGenerator:
     def generate_with_coqui(self, text: str, filepath: Path) -> TTSResult:
         """使用Coqui TTS生成音频"""
         try:
-            import TTS
-            from TTS.utils.synthesizer import Synthesizer
-
             print(f"🎤 使用Coqui TTS生成: {text[:30]}...")
 
-            # 初始化合成器
-            synthesizer = Synthesizer(
-                tts_model_path=None,  # 使用默认模型
-                vocoder_path=None,
-                encoder_config=None,
-                use_cuda=False
-            )
+            # 复用进程内已加载的模型
+            tts = get_coqui_tts(config.tts.coqui_model)
 
             # 生成音频
-            wav = synthesizer.tts(text)
-            synthesizer.save_wav(wav, str(filepath))
+            wav = tts.tts(text=text, **_coqui_tts_kwargs(tts))
+            tts.synthesizer.save_wav(wav, str(filepath))
 
             return TTSResult(
                 text=text,
@@ -263,13 +343,45 @@ class TTSGenerator:
                 error_message=str(e)
             )
 
-    def generate_audio(self, text: str, filename: str = None) -> TTSResult:
+    def cache_keys(self, text: str) -> Dict[str, str]:
+        """
+        计算文本在每个可用引擎下可能得到的缓存键（按优先级）
+
+        包含修复时使用的变体和独立批量脚本的产出，这些文件不会被视为参数已变化。
+        """
+        return accepted_keys(text, self.engines)
+
+    def _from_cache(self, text: str, filepath: Path) -> Optional[TTSResult]:
+        """按引擎优先级查找缓存，命中时复制到目标文件"""
+        for engine, key in self.cache_keys(text).items():
+            if self.cache.materialize(key, filepath):
+                return TTSResult(
+                    text=text,
+                    filename=filepath.name,
+                    filepath=filepath,
+                    success=True,
+                    engine="cache",
+                    cache_key=key
+                )
+        return None
+
+    def _store_in_cache(self, result: TTSResult, batched: bool = False):
+        """把生成结果存入缓存（批量合成切分的结果使用单独的键）"""
+        try:
+            key = synthesis_key(result.text, result.engine, batched=batched)
+            self.cache.put(key, result.filepath)
+            result.cache_key = key
+        except Exception as e:
+            print(f"⚠️ 写入TTS缓存失败: {e}")
+
+    def generate_audio(self, text: str, filename: str = None, use_cache: bool = True) -> TTSResult:
         """
         生成音频文件
 
         Args:
             text: 要转换的文本
             filename: 目标文件名（可选）
+            use_cache: 是否优先使用缓存中已合成的音频
 
         Returns:
             生成结果
@@ -279,28 +391,34 @@ class TTSGenerator:
 
         filepath = self.audio_dir / filename
 
-        # 按优先级尝试不同的引擎
-        for engine in self.engines:
-            try:
-                if engine == "coqui":
-                    result = self.generate_with_coqui(text, filepath)
-                elif engine == "say":
-                    result = self.generate_with_say(text, filepath)
-                elif engine == "gtts":
-                    result = self.generate_with_gtts(text, filepath)
-                else:
-                    continue
+        if use_cache:
+            cached = self._from_cache(text, filepath)
+            if cached:
+                print(f"♻️  缓存命中: {filename}")
+                return cached
 
-                if result.success:
-                    print(f"✅ 成功生成: {filename} (引擎: {engine})")
-                    return result
-                else:
-                    print(f"❌ {engine}引擎失败: {result.error_message}")
+        # 引擎先写入临时文件，成功后再原子替换目标文件
+        temp_path = partial_path(filepath)
+        try:
+            # 按优先级尝试不同的引擎
+            for engine in self.engines:
+                try:
+                    result = self._synthesize(engine, text, temp_path)
+                    if result.success:
+                        self._commit_result(result, filepath)
+                        print(f"✅ 成功生成: {filename} (引擎: {engine})")
+                        self._store_in_cache(result)
+                        return result
+                    else:
+                        print(f"❌ {engine}引擎失败: {result.error_message}")
+                        continue
+
+                except Exception as e:
+                    print(f"❌ {engine}引擎异常: {e}")
                     continue
-
-            except Exception as e:
-                print(f"❌ {engine}引擎异常: {e}")
-                continue
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
 
         return TTSResult(
             text=text,
@@ -311,13 +429,92 @@ class TTSGenerator:
             error_message="所有TTS引擎都失败了"
         )
 
-    def generate_from_pattern(self, pattern: str, force_regenerate: bool = False) -> List[TTSResult]:
+    def _synthesize(self, engine: str, text: str, filepath: Path) -> TTSResult:
+        """使用指定引擎合成到 filepath"""
+        synthesize = {
+            "coqui": self.generate_with_coqui,
+            "say": self.generate_with_say,
+            "gtts": self.generate_with_gtts
+        }.get(engine)
+
+        if synthesize is None:
+            return TTSResult(
+                text=text,
+                filename=filepath.name,
+                filepath=filepath,
+                success=False,
+                engine=engine,
+                error_message=f"未知引擎: {engine}"
+            )
+        return synthesize(text, filepath)
+
+    def generate_variant(self, text: str, filename: str, engine: str,
+                         variant: str = "plain") -> TTSResult:
+        """
+        使用指定引擎和合成变体重新合成（不查缓存）
+
+        闭环修复用：校验未通过的音频换引擎或变体重试，结果按变体参数存入缓存。
+
+        Args:
+            text: 要转换的文本
+            filename: 目标文件名
+            engine: TTS引擎 (coqui, say, gtts)
+            variant: 合成变体，见 SYNTHESIS_VARIANTS
+
+        Returns:
+            生成结果
+        """
+        filepath = self.audio_dir / filename
+        spoken = _as_sentence(text) if variant == "sentence" else text
+
+        temp_path = partial_path(filepath)
+        try:
+            result = self._synthesize(engine, spoken, temp_path)
+            if not result.success:
+                return result
+
+            self._commit_result(result, filepath)
+            result.text = text
+            print(f"✅ 成功生成: {filename} (引擎: {engine}, 变体: {variant})")
+
+            key = synthesis_key(text, engine, variant=variant)
+            try:
+                self.cache.put(key, filepath)
+                result.cache_key = key
+            except Exception as e:
+                print(f"⚠️ 写入TTS缓存失败: {e}")
+            return result
+        except Exception as e:
+            return TTSResult(
+                text=text,
+                filename=filename,
+                filepath=filepath,
+                success=False,
+                engine=engine,
+                error_message=str(e)
+            )
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+
+    def _commit_result(self, result: TTSResult, filepath: Path):
+        """把写入临时文件的生成结果原子替换到目标文件"""
+        commit_output(result.filepath, filepath)
+        result.filepath = filepath
+        result.filename = filepath.name
+
+    def generate_from_pattern(self, pattern: str, force_regenerate: bool = False,
+                              workers: int = 1, batch_size: int = 1,
+                              resume: bool = False) -> List[TTSResult]:
         """
         根据模式生成音频
 
         Args:
             pattern: 文件匹配模式
-            force_regenerate: 是否强制重新生成已存在的文件
+            force_regenerate: 是否强制重新合成（忽略已存在的文件和缓存）
+            workers: 并行工作进程数，1 表示在当前进程串行生成
+            batch_size: 短文本每批合成的项数，1 表示不批量合成
+            resume: 按任务日志续跑上次中断的生成（跳过已提交的文件）
 
         Returns:
             生成结果列表
@@ -348,40 +545,113 @@ class TTSGenerator:
 
         print(f"📊 总计需要生成: {len(items)} 个音频项")
 
-        # 生成音频
+        with JobJournal(f"generate-{pattern}", resume=resume) as journal:
+            return self.generate_for_items(items, force_regenerate, workers, batch_size, journal)
+
+    def generate_for_items(self, items: List[Dict], force_regenerate: bool = False,
+                           workers: int = 1, batch_size: int = 1,
+                           journal: Optional[JobJournal] = None) -> List[TTSResult]:
+        """
+        为已提取的文本项生成音频
+
+        Args:
+            items: extract_text_from_json 返回的文本项
+            force_regenerate: 是否强制重新合成（忽略已存在的文件和缓存）
+            workers: 并行工作进程数
+            batch_size: 短文本每批合成的项数
+            journal: 任务日志；日志中已提交的文件直接跳过（即使 force_regenerate）
+
+        Returns:
+            生成结果列表
+        """
+        # 全局去重：每个目标文件、每段文本只调度一次
+        work_list, conflicts = build_audio_work_list(items)
+        print(f"📦 {len(items)} 个文本项去重后为 {len(work_list)} 段唯一文本")
+
+        for conflict in conflicts:
+            print(f"⚠️ 文件名冲突: {conflict['filename']} 对应多个文本: "
+                  f"{' | '.join(conflict['texts'])}")
+
+        # 先处理已存在的文件，剩余的进入生成队列
         results = []
+        pending: List[Tuple[Dict, str]] = []
+        copies: Dict[str, List[str]] = {}
         start_time = time.time()
 
-        for i, item in enumerate(items):
-            print_progress(i + 1, len(items), "生成进度", f"{item['module_id']} - {item['type']}")
+        for entry in work_list:
+            keys = self.cache_keys(entry['text']).values()
+            needed = []
+
+            for filename in [entry['filename']] + entry['aliases']:
+                filepath = self.audio_dir / filename
+
+                # 上次中断前已经提交的文件
+                if journal and journal.is_committed(filename) and filepath.exists():
+                    print(f"⏭️  上次运行已完成: {filename}")
+                    results.append(TTSResult(
+                        text=entry['text'],
+                        filename=filename,
+                        filepath=filepath,
+                        success=True,
+                        engine="journal"
+                    ))
+                    continue
 
-            # 确定文件名
-            if item['audio_path']:
-                filename = item['audio_path'].replace('/audio/tts/', '')
-            else:
-                filename = text_to_filename(item['text'])
+                # 检查文件是否由当前合成参数生成（无缓存记录的历史文件视为有效）
+                status = self.cache.status(filepath, keys)
+                if status in ("current", "untracked") and not force_regenerate:
+                    print(f"⏭️  跳过已存在: {filename}")
+                    results.append(TTSResult(
+                        text=entry['text'],
+                        filename=filename,
+                        filepath=filepath,
+                        success=True,
+                        engine="existing"
+                    ))
+                    continue
 
-            filepath = self.audio_dir / filename
+                if status == "stale":
+                    print(f"🔄 合成参数已变化: {filename}")
 
-            # 检查文件是否已存在
-            if filepath.exists() and not force_regenerate:
-                print(f"\n⏭️  跳过已存在: {filename}")
-                results.append(TTSResult(
-                    text=item['text'],
-                    filename=filename,
-                    filepath=filepath,
-                    success=True,
-                    engine="existing"
-                ))
-                continue
+                needed.append(filename)
 
-            # 生成音频
-            result = self.generate_audio(item['text'], filename)
+            if needed:
+                pending.append((entry, needed[0]))
+                copies[needed[0]] = needed[1:]
+
+        if journal:
+            journal.plan(name for _, filename in pending for name in [filename] + copies[filename])
+
+        # 生成音频（结果按完成顺序返回）
+        generated = self._generate_items(
+            pending, workers, batch_size, not force_regenerate,
+            on_start=journal.start if journal else None
+        )
+        for i, (item, filename, result) in enumerate(generated):
+            print_progress(i + 1, len(pending), "生成进度", f"{item['module_id']} - {item['type']}")
             results.append(result)
 
+            if result.success and result.cache_key:
+                self.cache.record(filename, result.cache_key)
+
+            # 相同文本的其他文件名直接复制
+            job_results = [result]
+            for alias in copies.get(filename, []):
+                job_results.append(self._copy_result(result, alias))
+            results.extend(job_results[1:])
+
+            if journal:
+                for job_result in job_results:
+                    if job_result.success:
+                        journal.commit(job_result.filename)
+                    else:
+                        journal.fail(job_result.filename, job_result.error_message)
+
             # 更新JSON文件中的音频路径
             if result.success and item.get('audio_path') and item['audio_path'] != f"/audio/tts/{filename}":
-                self._update_audio_path(content, item, filename)
+                self._update_audio_path(item, filename)
+
+        self.cache.save()
 
         generation_time = time.time() - start_time
         successful = sum(1 for r in results if r.success)
@@ -389,7 +659,257 @@ class TTSGenerator:
 
         return results
 
-    def _update_audio_path(self, content: Dict, item: Dict, filename: str):
+    def _copy_result(self, result: TTSResult, filename: str) -> TTSResult:
+        """把已生成的音频复制到另一个文件名"""
+        filepath = self.audio_dir / filename
+        if not result.success:
+            return TTSResult(
+                text=result.text,
+                filename=filename,
+                filepath=filepath,
+                success=False,
+                engine=result.engine,
+                error_message=result.error_message
+            )
+
+        try:
+            atomic_copy(result.filepath, filepath)
+        except Exception as e:
+            return TTSResult(
+                text=result.text,
+                filename=filename,
+                filepath=filepath,
+                success=False,
+                engine=result.engine,
+                error_message=f"复制失败: {e}"
+            )
+
+        if result.cache_key:
+            self.cache.record(filename, result.cache_key)
+
+        return TTSResult(
+            text=result.text,
+            filename=filename,
+            filepath=filepath,
+            success=True,
+            engine=result.engine,
+            duration=result.duration,
+            cache_key=result.cache_key
+        )
+
+    def _generate_items(self, pending: List[Tuple[Dict, str]], workers: int = 1,
+                        batch_size: int = 1, use_cache: bool = True,
+                        on_start: Optional[Callable[[List[str]], None]] = None):
+        """
+        生成待处理的音频项
+
+        batch_size > 1 且 Coqui 可用时，短文本（单词/短语）按批合成；
+        workers > 1 时把任务分发到进程池，每个工作进程持有一个独立的
+        TTSGenerator 实例，结果按完成顺序逐个产出。
+
+        Args:
+            on_start: 任务开始（或提交到进程池）时以该任务的文件名列表调用
+
+        Yields:
+            (item, filename, TTSResult)
+        """
+        jobs = self._plan_jobs(pending, batch_size)
+
+        def started(job):
+            if on_start:
+                on_start([filename for _, filename in job])
+            return job
+
+        if workers <= 1 or len(jobs) <= 1:
+            for job in jobs:
+                started(job)
+                results = self.generate_job(
+                    [(item['text'], filename) for item, filename in job], use_cache
+                )
+                for (item, filename), result in zip(job, results):
+                    yield item, filename, result
+            return
+
+        workers = min(workers, len(jobs))
+        print(f"🚀 使用 {workers} 个工作进程并行生成")
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(asdict(config.tts),)
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _generate_in_worker,
+                    [(item['text'], filename) for item, filename in job],
+                    use_cache
+                ): started(job)
+                for job in jobs
+            }
+
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    results = [
+                        TTSResult(
+                            text=item['text'],
+                            filename=filename,
+                            filepath=self.audio_dir / filename,
+                            success=False,
+                            engine="none",
+                            error_message=f"工作进程异常: {e}"
+                        )
+                        for item, filename in job
+                    ]
+                for (item, filename), result in zip(job, results):
+                    yield item, filename, result
+
+    def _plan_jobs(self, pending: List[Tuple[Dict, str]], batch_size: int) -> List[List[Tuple[Dict, str]]]:
+        """把待处理项划分为任务：短文本按批分组，其余每项一个任务"""
+        if batch_size <= 1 or "coqui" not in self.engines:
+            return [[entry] for entry in pending]
+
+        short = [entry for entry in pending if is_short_text(entry[0]['text'])]
+        others = [[entry] for entry in pending if not is_short_text(entry[0]['text'])]
+
+        batches = [short[i:i + batch_size] for i in range(0, len(short), batch_size)]
+        if batches:
+            print(f"📦 {len(short)} 个短文本分为 {len(batches)} 批合成")
+
+        return batches + others
+
+    def generate_job(self, job: List[Tuple[str, str]], use_cache: bool = True) -> List[TTSResult]:
+        """
+        生成一个任务中的全部音频
+
+        多项任务先查缓存，其余项尝试Coqui批量合成，失败的项逐个回退到 generate_audio。
+
+        Args:
+            job: (文本, 文件名) 列表
+            use_cache: 是否优先使用缓存中已合成的音频
+
+        Returns:
+            与 job 顺序一致的生成结果
+        """
+        if len(job) == 1:
+            text, filename = job[0]
+            return [self.generate_audio(text, filename, use_cache)]
+
+        results: Dict[int, TTSResult] = {}
+        to_batch = []
+        for index, (text, filename) in enumerate(job):
+            cached = self._from_cache(text, self.audio_dir / filename) if use_cache else None
+            if cached:
+                print(f"♻️  缓存命中: {filename}")
+                results[index] = cached
+            else:
+                to_batch.append(index)
+
+        # 批量合成同样先写入临时文件
+        batch_results = self.generate_batch_with_coqui(
+            [(job[index][0], partial_path(self.audio_dir / job[index][1])) for index in to_batch]
+        ) if to_batch else []
+
+        for index, result in zip(to_batch, batch_results):
+            text, filename = job[index]
+            if result.success:
+                self._commit_result(result, self.audio_dir / filename)
+                print(f"✅ 成功生成: {filename} (引擎: coqui-batch)")
+                self._store_in_cache(result, batched=True)
+                results[index] = result
+            else:
+                if result.filepath.exists():
+                    result.filepath.unlink()
+                results[index] = self.generate_audio(text, filename, use_cache=False)
+
+        return [results[index] for index in range(len(job))]
+
+    def generate_batch_with_coqui(self, batch: List[Tuple[str, Path]]) -> List[TTSResult]:
+        """
+        使用Coqui TTS批量生成短文本音频
+
+        把多段短文本拼接为一句话合成一次，再按静音切分回每一项。
+        切分出的片段数与文本数不一致，或任一片段时长与该项的预测时长相差过大
+        （某项内部的停顿使切分错位）时整批失败，由调用方逐项回退。
+
+        Args:
+            batch: (文本, 输出路径) 列表
+
+        Returns:
+            与 batch 顺序一致的生成结果
+        """
+        def failed(message: str) -> List[TTSResult]:
+            return [
+                TTSResult(
+                    text=text,
+                    filename=filepath.name,
+                    filepath=filepath,
+                    success=False,
+                    engine="coqui-batch",
+                    error_message=message
+                )
+                for text, filepath in batch
+            ]
+
+        try:
+            from pydub import AudioSegment
+            from pydub.silence import detect_nonsilent
+
+            print(f"🎤 使用Coqui TTS批量生成: {len(batch)} 项")
+
+            tts = get_coqui_tts(config.tts.coqui_model)
+
+            # 句号让模型在每项之间停顿，作为切分标记
+            utterance = " ".join(_as_sentence(text) for text, _ in batch)
+            wav = tts.tts(text=utterance, **_coqui_tts_kwargs(tts))
+
+            sample_rate = tts.synthesizer.output_sample_rate
+            pcm = array('h', (int(max(-1.0, min(1.0, x)) * 32767) for x in wav))
+            audio = AudioSegment(
+                data=pcm.tobytes(),
+                sample_width=2,
+                frame_rate=sample_rate,
+                channels=1
+            )
+
+            ranges = detect_nonsilent(
+                audio,
+                min_silence_len=BATCH_MIN_SILENCE_MS,
+                silence_thresh=audio.dBFS - 16
+            )
+            ranges = _merge_ranges(ranges, len(batch))
+            if len(ranges) != len(batch):
+                return failed(f"静音切分得到 {len(ranges)} 段，期望 {len(batch)} 段")
+
+            low, high = BATCH_DURATION_RATIO
+            for (text, _), (start, end) in zip(batch, ranges):
+                ratio = (end - start) / 1000.0 / predict_duration(text)
+                if not low <= ratio <= high:
+                    return failed(f"片段时长与 '{text}' 的预测时长不符 (比例 {ratio:.2f})")
+
+            results = []
+            for (text, filepath), (start, end) in zip(batch, ranges):
+                segment = audio[max(0, start - BATCH_PADDING_MS):end + BATCH_PADDING_MS]
+                segment = segment.set_frame_rate(config.tts.sample_rate)
+                segment.export(str(filepath), format="mp3", bitrate=config.tts.mp3_bitrate)
+
+                results.append(TTSResult(
+                    text=text,
+                    filename=filepath.name,
+                    filepath=filepath,
+                    success=True,
+                    engine="coqui",
+                    duration=len(segment) / 1000.0
+                ))
+
+            return results
+
+        except Exception as e:
+            return failed(str(e))
+
+    def _update_audio_path(self, item: Dict, filename: str):
         """更新JSON文件中的音频路径"""
         try:
             # 这里需要实现更新JSON文件的逻辑
@@ -425,7 +945,7 @@ class TTSGenerator:
         # 找出缺失的文件
         missing_items = []
         for item in items:
-            filename = item['audio_path'].replace('/audio/tts/', '') if item['audio_path'] else text_to_filename(item['text'])
+            filename = get_item_audio_filename(item)
             filepath = self.audio_dir / filename
 
             if not filepath.exists():
@@ -444,11 +964,37 @@ class TTSGenerator:
             result = self.generate_audio(item['text'], filename)
             results.append(result)
 
+            if result.success and result.cache_key:
+                self.cache.record(filename, result.cache_key)
+
+        self.cache.save()
+
         successful = sum(1 for r in results if r.success)
         print(f"\n✅ 缺失音频生成完成！成功: {successful}/{len(results)}")
 
         return results
 
+# 进程池工作进程内的生成器实例（每个进程一个）
+_worker_generator: Optional[TTSGenerator] = None
+
+def _init_worker(tts_settings: Dict):
+    """初始化工作进程：同步TTS配置并创建独立的生成器"""
+    global _worker_generator
+
+    for key, value in tts_settings.items():
+        setattr(config.tts, key, value)
+
+    _worker_generator = TTSGenerator()
+
+def _generate_in_worker(job: List[Tuple[str, str]], use_cache: bool = True) -> List[TTSResult]:
+    """在工作进程中生成一个任务"""
+    return _worker_generator.generate_job(job, use_cache)
+
+def _generate_variant_in_worker(text: str, filename: str, engine: str,
+                                variant: str = "plain") -> TTSResult:
+    """在工作进程中按指定引擎和变体重新合成"""
+    return _worker_generator.generate_variant(text, filename, engine, variant)
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description="TTS音频生成工具")
@@ -456,8 +1002,11 @@ def main():
     parser.add_argument("--config", help="配置文件路径")
     parser.add_argument("--engine", help="首选TTS引擎 (coqui, say, gtts)")
     parser.add_argument("--missing-only", action="store_true", help="只生成缺失的音频文件")
-    parser.add_argument("--force", action="store_true", help="强制重新生成已存在的文件")
+    parser.add_argument("--force", action="store_true", help="强制重新合成（忽略已存在的文件和缓存）")
     parser.add_argument("--voice", help="say语音（仅macOS say）")
+    parser.add_argument("--workers", type=int, default=1, help="并行工作进程数 (默认: 1)")
+    parser.add_argument("--batch-size", type=int, default=1, help="短文本批量合成的每批项数 (默认: 1，仅Coqui)")
+    parser.add_argument("--resume", action="store_true", help="按任务日志续跑上次中断的生成")
     parser.add_argument("--quiet", action="store_true", help="静默模式")
 
     args = parser.parse_args()
@@ -486,7 +1035,9 @@ def main():
             results = generator.generate_missing_audio(args.pattern)
         else:
             # 生成所有音频
-            results = generator.generate_from_pattern(args.pattern, args.force)
+            results = generator.generate_from_pattern(
+                args.pattern, args.force, args.workers, args.batch_size, args.resume
+            )
 
         if not results:
             print("❌ 没有找到需要生成的内容")
@@ -508,7 +1059,7 @@ def main():
                     print(f"   {result.filename}: {result.error_message}")
 
     except KeyboardInterrupt:
-        print("\n⚠️ 生成被用户中断")
+        print("\n⚠️ 生成被用户中断，可用 --resume 从中断处继续")
     except Exception as e:
         print(f"❌ 生成过程中发生错误: {e}")
         raise
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+音频生成任务日志
+逐项记录 planned / in_progress / committed / failed 状态并立即落盘，
+中断后以续跑模式重新运行时跳过已提交的项，从中断处继续
+"""
+
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+from ..utils.config import config
+from ..utils.result_sink import JsonlSink
+
+PLANNED = "planned"
+IN_PROGRESS = "in_progress"
+COMMITTED = "committed"
+FAILED = "failed"
+
+# 本进程已清理过的 .partial 目录
+_purged_dirs: Set[Path] = set()
+
+def _pid_alive(pid: int) -> bool:
+    """进程是否仍在运行"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+def purge_stale_partials(partial_dir: Path) -> int:
+    """
+    删除已退出进程留下的临时文件（<pid>-<文件名>）
+
+    Returns:
+        删除的文件数
+    """
+    removed = 0
+    for temp_file in partial_dir.glob("*-*"):
+        pid, _, _ = temp_file.name.partition("-")
+        if not pid.isdigit() or int(pid) == os.getpid() or _pid_alive(int(pid)):
+            continue
+        try:
+            temp_file.unlink()
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+def partial_path(target: Path) -> Path:
+    """
+    目标文件对应的临时输出路径
+
+    临时文件放在目标目录下的 .partial/ 中（与目标在同一文件系统，可原子重命名），
+    不会被 *.mp3 匹配到，中断时也不会留下半写的目标文件。
+    每个进程首次使用某个 .partial/ 目录时，清理其中已退出进程遗留的临时文件。
+    """
+    partial_dir = target.parent / ".partial"
+    partial_dir.mkdir(parents=True, exist_ok=True)
+    if partial_dir not in _purged_dirs:
+        _purged_dirs.add(partial_dir)
+        removed = purge_stale_partials(partial_dir)
+        if removed:
+            print(f"🧹 清理中断遗留的临时文件: {removed} 个 ({partial_dir})")
+    return partial_dir / f"{os.getpid()}-{target.name}"
+
+def commit_output(temp_path: Path, target: Path):
+    """把写完的临时文件原子替换为目标文件"""
+    os.replace(temp_path, target)
+
+class JobJournal:
+    """
+    生成任务日志
+
+    日志为 .cache/journals/<名称>.jsonl，每行一个状态变化事件
+    {"key": 目标文件名, "state": 状态, "time": 时间戳, "error": 错误信息}，
+    同一文件名以最后一个事件为准。
+    """
+
+    def __init__(self, name: str, resume: bool = False, journal_dir: Optional[Path] = None):
+        """
+        Args:
+            name: 任务名称（同名任务共用一个日志）
+            resume: 是否从已有日志续跑（否则清空日志重新开始）
+            journal_dir: 日志目录（默认为 .cache/journals）
+        """
+        journal_dir = journal_dir or config.get_cache_dir() / "journals"
+        safe_name = re.sub(r'[^\w.+-]', '_', name.replace('*', 'all'))
+        self.sink = JsonlSink(journal_dir / f"{safe_name}.jsonl", resume=resume)
+
+        self.states: Dict[str, str] = {}
+        for event in self.sink.read():
+            self.states[event['key']] = event['state']
+
+        if resume and self.states:
+            counts = self.summary()
+            print(f"📒 续跑任务日志 {self.sink.path.name}: 已提交 {counts[COMMITTED]}，"
+                  f"中断 {counts[IN_PROGRESS]}，失败 {counts[FAILED]}，待处理 {counts[PLANNED]}")
+
+    def _write(self, key: str, state: str, error: Optional[str] = None):
+        """记录状态变化"""
+        event = {"key": key, "state": state, "time": time.time()}
+        if error:
+            event["error"] = error
+        self.sink.write(event)
+        self.states[key] = state
+
+    def state(self, key: str) -> Optional[str]:
+        """获取文件的当前状态"""
+        return self.states.get(key)
+
+    def is_committed(self, key: str) -> bool:
+        """文件是否已在本任务中成功生成"""
+        return self.states.get(key) == COMMITTED
+
+    def plan(self, keys: Iterable[str]):
+        """登记计划生成的文件（已登记的文件保持原状态）"""
+        for key in keys:
+            if key not in self.states:
+                self._write(key, PLANNED)
+
+    def start(self, keys: Iterable[str]):
+        """标记文件开始生成"""
+        for key in keys:
+            self._write(key, IN_PROGRESS)
+
+    def commit(self, key: str):
+        """标记文件已生成并写入目标位置"""
+        self._write(key, COMMITTED)
+
+    def fail(self, key: str, error: Optional[str] = None):
+        """标记文件生成失败（续跑时会重试）"""
+        self._write(key, FAILED, error)
+
+    def summary(self) -> Dict[str, int]:
+        """各状态的文件数"""
+        counts = {PLANNED: 0, IN_PROGRESS: 0, COMMITTED: 0, FAILED: 0}
+        for state in self.states.values():
+            counts[state] += 1
+        return counts
+
+    def close(self):
+        """关闭日志"""
+        self.sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
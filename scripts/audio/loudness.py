@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+全库响度标准化（EBU R128 / ITU-R BS.1770）
+并行测量每个音频的积分响度和真峰值，按内容哈希缓存测量结果，
+只重新编码超出目标容差的音频。测量结果缓存后，每次构建运行的代价只是一次 stat
+"""
+
+import os
+import json
+import math
+import time
+import argparse
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ProcessPoolExecutor
+
+from ..utils.config import config
+from ..utils.transcript_cache import audio_sha256
+from .job_journal import partial_path, commit_output
+from .pcm_store import decode_pcm, load_samples, STORE_SAMPLE_RATE
+
+# 测量算法版本，算法变化时递增（旧测量结果作废）
+LOUDNESS_VERSION = 1
+
+# BS.1770 门限块：400ms 块长，75% 重叠
+BLOCK_SECONDS = 0.4
+BLOCK_STEP_SECONDS = 0.1
+
+# 绝对门限（LUFS）与相对门限（LU）
+ABSOLUTE_GATE = -70.0
+RELATIVE_GATE = -10.0
+
+# 真峰值测量的过采样目标采样率（48kHz 下即 4 倍过采样）
+TRUE_PEAK_RATE = 192000
+
+# K计权滤波器参数（由BS.1770给出的48kHz系数反推的模拟原型，可用于任意采样率）
+_SHELF_FREQ = 1681.974450955533
+_SHELF_GAIN_DB = 3.999843853973347
+_SHELF_Q = 0.7071752369554196
+_HIGHPASS_FREQ = 38.13547087602444
+_HIGHPASS_Q = 0.5003270373238773
+
+@dataclass
+class LoudnessMeasurement:
+    """单个音频的响度测量"""
+    integrated: float  # 积分响度 (LUFS)，静音为 -inf
+    true_peak: float  # 真峰值 (dBTP)
+    duration: float  # 时长（秒）
+
+def _k_weighting_coefficients(sample_rate: int) -> List[Tuple[List[float], List[float]]]:
+    """K计权的两级双二阶滤波器系数 [(b, a), ...]：高频搁架 + 高通"""
+    k = math.tan(math.pi * _SHELF_FREQ / sample_rate)
+    vh = 10 ** (_SHELF_GAIN_DB / 20)
+    vb = vh ** 0.4996667741545416
+    a0 = 1 + k / _SHELF_Q + k * k
+    shelf = (
+        [(vh + vb * k / _SHELF_Q + k * k) / a0, 2 * (k * k - vh) / a0, (vh - vb * k / _SHELF_Q + k * k) / a0],
+        [1.0, 2 * (k * k - 1) / a0, (1 - k / _SHELF_Q + k * k) / a0]
+    )
+
+    k = math.tan(math.pi * _HIGHPASS_FREQ / sample_rate)
+    a0 = 1 + k / _HIGHPASS_Q + k * k
+    highpass = (
+        [1.0, -2.0, 1.0],
+        [1.0, 2 * (k * k - 1) / a0, (1 - k / _HIGHPASS_Q + k * k) / a0]
+    )
+    return [shelf, highpass]
+
+def k_weight(samples: "np.ndarray", sample_rate: int) -> "np.ndarray":
+    """
+    K计权滤波
+
+    在频域乘以两级双二阶滤波器的频率响应（末尾补零半秒，滤波器的冲激响应
+    在此之前已衰减完毕），避免逐采样的递归循环。
+    """
+    import numpy as np
+
+    n = len(samples)
+    n_fft = 1 << (n + sample_rate // 2 - 1).bit_length()
+    z = np.exp(-1j * np.pi * np.arange(n_fft // 2 + 1) / (n_fft // 2))
+
+    response = np.ones_like(z)
+    for b, a in _k_weighting_coefficients(sample_rate):
+        response *= (b[0] + b[1] * z + b[2] * z * z) / (a[0] + a[1] * z + a[2] * z * z)
+
+    spectrum = np.fft.rfft(samples, n_fft) * response
+    return np.fft.irfft(spectrum, n_fft)[:n]
+
+def integrated_loudness(samples: "np.ndarray", sample_rate: int) -> float:
+    """
+    计算积分响度（LUFS，BS.1770-4 门限算法）
+
+    短于一个门限块的音频整体视为一个块。
+    """
+    import numpy as np
+
+    if len(samples) == 0:
+        return -math.inf
+
+    energy = np.square(k_weight(np.asarray(samples, dtype=np.float64), sample_rate))
+    block = int(round(BLOCK_SECONDS * sample_rate))
+    step = int(round(BLOCK_STEP_SECONDS * sample_rate))
+
+    if len(energy) < block:
+        powers = np.array([energy.mean()])
+    else:
+        cumulative = np.concatenate(([0.0], np.cumsum(energy)))
+        starts = np.arange(0, len(energy) - block + 1, step)
+        powers = (cumulative[starts + block] - cumulative[starts]) / block
+
+    with np.errstate(divide='ignore'):
+        levels = -0.691 + 10 * np.log10(powers)
+
+    gated = powers[levels > ABSOLUTE_GATE]
+    if len(gated) == 0:
+        return -math.inf
+
+    relative = -0.691 + 10 * math.log10(gated.mean()) + RELATIVE_GATE
+    gated = powers[(levels > ABSOLUTE_GATE) & (levels > relative)]
+    return -0.691 + 10 * math.log10(gated.mean())
+
+def true_peak(samples: "np.ndarray", sample_rate: int) -> float:
+    """
+    计算真峰值（dBTP）
+
+    用频域补零过采样到约 TRUE_PEAK_RATE 后取绝对值最大值。
+    """
+    import numpy as np
+
+    if len(samples) == 0:
+        return -math.inf
+
+    samples = np.asarray(samples, dtype=np.float64)
+    factor = max(1, math.ceil(TRUE_PEAK_RATE / sample_rate))
+    n = len(samples) + 64  # 末尾补零，避免频域插值在首尾之间绕回
+    spectrum = np.fft.rfft(samples, n)
+    upsampled = np.fft.irfft(spectrum, n * factor) * factor
+
+    peak = max(float(np.max(np.abs(upsampled))), float(np.max(np.abs(samples))))
+    return 20 * math.log10(peak) if peak > 0 else -math.inf
+
+def measure(samples: "np.ndarray", sample_rate: int) -> LoudnessMeasurement:
+    """测量单声道采样的响度和真峰值"""
+    return LoudnessMeasurement(
+        integrated=integrated_loudness(samples, sample_rate),
+        true_peak=true_peak(samples, sample_rate),
+        duration=len(samples) / sample_rate
+    )
+
+def loudness_gain(measurement: LoudnessMeasurement) -> float:
+    """
+    达到目标响度所需的增益（dB）
+
+    增益受真峰值上限约束：峰值很高的音频只提升到峰值触及上限为止。
+    静音音频返回0。
+    """
+    if measurement.integrated == -math.inf:
+        return 0.0
+
+    gain = config.tts.loudness_target - measurement.integrated
+    if measurement.true_peak + gain > config.tts.true_peak_limit:
+        gain = config.tts.true_peak_limit - measurement.true_peak
+    return gain
+
+def needs_adjustment(measurement: LoudnessMeasurement) -> bool:
+    """所需增益是否超出容差"""
+    return abs(loudness_gain(measurement)) > config.tts.loudness_tolerance
+
+def segment_samples(audio) -> Tuple["np.ndarray", int]:
+    """把pydub AudioSegment转换为单声道 float32 采样和采样率"""
+    import numpy as np
+
+    samples = np.array(audio.set_channels(1).get_array_of_samples(), dtype=np.float32)
+    samples /= float(1 << (8 * audio.sample_width - 1))
+    return samples, audio.frame_rate
+
+def normalize_segment(audio):
+    """把pydub AudioSegment调整到目标响度（受真峰值上限约束）"""
+    gain = loudness_gain(measure(*segment_samples(audio)))
+    return audio.apply_gain(gain) if gain else audio
+
+def _measure_file(filepath: str) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    在工作进程中测量一个文件（优先读取PCM特征库）
+
+    Returns:
+        (测量结果字典, 错误信息)
+    """
+    try:
+        samples = load_samples(Path(filepath))
+        if samples is None:
+            samples = decode_pcm(Path(filepath))
+        return asdict(measure(samples, STORE_SAMPLE_RATE)), None
+    except Exception as e:
+        return None, str(e)
+
+def reencode_with_gain(filepath: Path, gain: float):
+    """对音频施加增益并重新编码（写临时文件后原子替换）"""
+    from pydub import AudioSegment
+
+    audio = AudioSegment.from_file(str(filepath))
+    temp_path = partial_path(filepath)
+    audio.apply_gain(gain).export(str(temp_path), format="mp3", bitrate=config.tts.mp3_bitrate)
+    commit_output(temp_path, filepath)
+
+class LoudnessCache:
+    """
+    响度测量缓存
+
+    缓存文件结构（默认 .cache/loudness.json）:
+        {"version": 1,
+         "files": {文件名: {"hash", "size", "mtime"}},
+         "measurements": {内容哈希: {"integrated", "true_peak", "duration"}}}
+    测量只与音频内容有关，与目标响度无关，修改目标后无需重新测量。
+    """
+
+    def __init__(self, cache_file: Optional[Path] = None):
+        self.cache_file = cache_file or config.get_cache_dir() / "loudness.json"
+        data = self._load()
+        self.files: Dict[str, Dict] = data.get("files", {})
+        self.measurements: Dict[str, Dict] = data.get("measurements", {})
+
+    def _load(self) -> Dict:
+        """加载缓存"""
+        if not self.cache_file.exists():
+            return {}
+
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if data.get("version") == LOUDNESS_VERSION else {}
+        except Exception as e:
+            print(f"⚠️ 读取响度缓存失败: {e}")
+            return {}
+
+    def file_hash(self, filepath: Path) -> str:
+        """获取文件哈希（大小和mtime未变时直接复用记录）"""
+        stat = filepath.stat()
+        record = self.files.get(filepath.name)
+        if record and record["size"] == stat.st_size and record["mtime"] == stat.st_mtime:
+            return record["hash"]
+
+        file_hash = audio_sha256(filepath)
+        self.files[filepath.name] = {"hash": file_hash, "size": stat.st_size, "mtime": stat.st_mtime}
+        return file_hash
+
+    def get(self, file_hash: str) -> Optional[LoudnessMeasurement]:
+        """获取缓存的测量结果，未命中时返回None"""
+        data = self.measurements.get(file_hash)
+        return LoudnessMeasurement(**data) if data else None
+
+    def put(self, file_hash: str, measurement: LoudnessMeasurement):
+        """保存测量结果"""
+        self.measurements[file_hash] = asdict(measurement)
+
+    def prune(self, names: Iterable[str]):
+        """只保留仍存在的文件及其测量结果"""
+        names = set(names)
+        self.files = {name: record for name, record in self.files.items() if name in names}
+        referenced = {record["hash"] for record in self.files.values()}
+        self.measurements = {h: m for h, m in self.measurements.items() if h in referenced}
+
+    def save(self):
+        """原子保存缓存"""
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.cache_file.with_suffix(".tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({"version": LOUDNESS_VERSION, "files": self.files, "measurements": self.measurements},
+                      f, ensure_ascii=False)
+        os.replace(temp_file, self.cache_file)
+
+@dataclass
+class LoudnessReport:
+    """全库响度标准化结果"""
+    files: int = 0
+    measured: int = 0  # 本次新测量的文件数
+    cached: int = 0  # 命中测量缓存的文件数
+    adjusted: List[Tuple[str, float]] = field(default_factory=list)  # (文件名, 增益dB)
+    silent: List[str] = field(default_factory=list)
+    failed: List[Tuple[str, str]] = field(default_factory=list)  # (文件名, 错误)
+
+def normalize_catalog(files: List[Path], workers: int = 1, dry_run: bool = False,
+                      cache: Optional[LoudnessCache] = None) -> LoudnessReport:
+    """
+    全库响度标准化
+
+    Args:
+        files: 需要处理的音频文件
+        workers: 并行测量的进程数
+        dry_run: 只测量并报告，不修改音频
+        cache: 测量缓存（默认为 .cache/loudness.json）
+
+    Returns:
+        处理结果
+    """
+    cache = cache or LoudnessCache()
+    report = LoudnessReport(files=len(files))
+
+    # 未缓存的文件按内容去重后并行测量
+    hashes = {filepath: cache.file_hash(filepath) for filepath in files}
+    to_measure: Dict[str, Path] = {}
+    for filepath, file_hash in hashes.items():
+        if cache.get(file_hash) is None:
+            to_measure.setdefault(file_hash, filepath)
+    report.cached = len(files) - sum(1 for h in hashes.values() if h in to_measure)
+
+    errors: Dict[str, str] = {}
+    if to_measure:
+        print(f"📏 测量 {len(to_measure)} 个新增或变化的音频...")
+        paths = [str(path) for path in to_measure.values()]
+        if workers > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+                measured = list(executor.map(_measure_file, paths, chunksize=8))
+        else:
+            measured = [_measure_file(path) for path in paths]
+
+        for file_hash, (data, error) in zip(to_measure, measured):
+            if data is not None:
+                cache.put(file_hash, LoudnessMeasurement(**data))
+                report.measured += 1
+            else:
+                errors[file_hash] = error
+
+    for filepath, file_hash in hashes.items():
+        measurement = cache.get(file_hash)
+        if measurement is None:
+            report.failed.append((filepath.name, errors.get(file_hash, "测量失败")))
+            continue
+        if measurement.integrated == -math.inf:
+            report.silent.append(filepath.name)
+            continue
+        if not needs_adjustment(measurement):
+            continue
+
+        gain = loudness_gain(measurement)
+        report.adjusted.append((filepath.name, gain))
+        if dry_run:
+            continue
+
+        try:
+            reencode_with_gain(filepath, gain)
+        except Exception as e:
+            report.failed.append((filepath.name, str(e)))
+            continue
+
+        # 线性增益使响度和峰值平移相同的分贝数，直接记录新内容的测量结果，下次无需重新测量
+        cache.put(cache.file_hash(filepath), LoudnessMeasurement(
+            integrated=measurement.integrated + gain,
+            true_peak=measurement.true_peak + gain,
+            duration=measurement.duration
+        ))
+
+    cache.prune(filepath.name for filepath in files)
+    cache.save()
+    return report
+
+def print_loudness_report(report: LoudnessReport, dry_run: bool = False):
+    """打印响度标准化结果"""
+    print(f"\n📊 响度标准化 (目标 {config.tts.loudness_target} LUFS ±{config.tts.loudness_tolerance} LU, "
+          f"真峰值上限 {config.tts.true_peak_limit} dBTP):")
+    print(f"   文件: {report.files}，新测量: {report.measured}，缓存命中: {report.cached}")
+    print(f"   {'需要调整' if dry_run else '已调整'}: {len(report.adjusted)}")
+
+    for name, gain in report.adjusted[:20]:
+        print(f"     {name}: {gain:+.1f} dB")
+    if len(report.adjusted) > 20:
+        print(f"     ... 以及其他 {len(report.adjusted) - 20} 个文件")
+
+    if report.silent:
+        print(f"   🔇 静音: {len(report.silent)}")
+        for name in report.silent[:10]:
+            print(f"     {name}")
+
+    if report.failed:
+        print(f"   ❌ 失败: {len(report.failed)}")
+        for name, error in report.failed[:10]:
+            print(f"     {name}: {error}")
+
+def run_loudness(workers: int = 1, dry_run: bool = False) -> LoudnessReport:
+    """对音频目录中的全部MP3做响度标准化"""
+    audio_dir = config.get_audio_dir()
+    files = sorted(audio_dir.glob("*.mp3"))
+    print(f"📁 音频目录: {audio_dir} ({len(files)} 个文件)")
+
+    start_time = time.time()
+    report = normalize_catalog(files, workers, dry_run)
+    print_loudness_report(report, dry_run)
+    print(f"⏱️  耗时: {time.time() - start_time:.1f}s")
+    return report
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="全库响度标准化（EBU R128）")
+    parser.add_argument("--workers", type=int, default=1, help="并行测量的进程数 (默认: 1)")
+    parser.add_argument("--dry-run", action="store_true", help="只测量并报告，不修改音频")
+
+    args = parser.parse_args()
+    run_loudness(args.workers, args.dry_run)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+解码后的音频特征库
+把 public/audio/tts 中的每个音频只解码一次，写入单个内存映射的 float32 PCM 文件
+（可选再写入Whisper对数梅尔频谱），按文件内容哈希建立偏移索引。
+分诊、Whisper转录、完整性检查等分析直接切片零拷贝视图，不再为每个文件启动解码器；
+重新构建时只解码内容哈希变化的文件
+"""
+
+import os
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from concurrent.futures import ProcessPoolExecutor
+
+from ..utils.config import config
+from ..utils.transcript_cache import audio_sha256
+
+STORE_VERSION = 1
+
+# 统一的采样率（Whisper的输入采样率），单声道
+STORE_SAMPLE_RATE = 16000
+
+# Whisper对数梅尔频谱参数：帧移、30秒窗口的帧数
+MEL_HOP = 160
+MEL_N_FFT = 400
+MEL_WINDOW_FRAMES = 3000
+
+# 无效数据超过总量的这一比例时压缩PCM文件
+COMPACT_RATIO = 0.5
+
+def decode_pcm(filepath: Path) -> "np.ndarray":
+    """解码音频为 STORE_SAMPLE_RATE 单声道 float32 PCM（范围 -1~1）"""
+    import numpy as np
+    from pydub import AudioSegment
+
+    audio = AudioSegment.from_file(str(filepath)).set_channels(1).set_frame_rate(STORE_SAMPLE_RATE)
+    samples = np.array(audio.get_array_of_samples(), dtype=np.float32)
+    samples /= float(1 << (8 * audio.sample_width - 1))
+    return samples
+
+def mel_frame_count(sample_count: int) -> int:
+    """
+    需要保存的梅尔帧数
+
+    Whisper把片段补零到30秒后计算频谱；片段结束后 n_fft/2 个采样以外的帧能量为零，
+    归一化后是常数，读取时据此补齐，不必保存。
+    """
+    return min(MEL_WINDOW_FRAMES, (sample_count + MEL_N_FFT // 2) // MEL_HOP + 2)
+
+def whisper_log_mel(samples: "np.ndarray", n_mels: int) -> "np.ndarray":
+    """计算与 check_quality 批量解码一致的对数梅尔频谱（只保留有效帧）"""
+    import numpy as np
+    import torch
+    import whisper
+
+    audio = whisper.pad_or_trim(torch.from_numpy(np.ascontiguousarray(samples)))
+    mel = whisper.log_mel_spectrogram(audio, n_mels=n_mels).numpy()
+    return mel[:, :mel_frame_count(len(samples))].astype(np.float32)
+
+class PCMStore:
+    """
+    PCM特征库
+
+    目录结构（默认 .cache/pcm/）:
+        pcm.f32      所有片段首尾相接的 float32 采样
+        mel.f32      可选，所有片段的梅尔频谱（每段 n_mels x 帧数，按行展开）
+        index.json   {"segments": {内容哈希: 偏移/长度}, "files": {文件名: 哈希/大小/mtime},
+                      "generation": 数据文件代数}
+
+    数据只追加写入，索引在数据落盘后原子替换，中断不会让索引指向不完整的数据。
+    压缩时写入下一代数据文件（pcm.<代数>.f32），替换索引后才删除旧一代文件。
+    """
+
+    def __init__(self, store_dir: Optional[Path] = None):
+        self.store_dir = Path(store_dir or config.get_cache_dir() / "pcm")
+        self.index_file = self.store_dir / "index.json"
+
+        self.index = self._load_index()
+        self._pcm = None
+        self._mel = None
+
+    def _load_index(self) -> Dict:
+        """加载索引（版本或采样率不一致时视为空库）"""
+        empty = {"version": STORE_VERSION, "sample_rate": STORE_SAMPLE_RATE,
+                 "n_mels": 0, "segments": {}, "files": {}}
+        if not self.index_file.exists():
+            return empty
+
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ PCM特征库索引损坏，将重新构建: {e}")
+            return empty
+
+        if index.get("version") != STORE_VERSION or index.get("sample_rate") != STORE_SAMPLE_RATE:
+            return empty
+        return index
+
+    def _data_file(self, kind: str, generation: int) -> Path:
+        """某一代的数据文件（第0代为 pcm.f32 / mel.f32）"""
+        if generation == 0:
+            return self.store_dir / f"{kind}.f32"
+        return self.store_dir / f"{kind}.{generation}.f32"
+
+    @property
+    def pcm_file(self) -> Path:
+        return self._data_file("pcm", self.index.get("generation", 0))
+
+    @property
+    def mel_file(self) -> Path:
+        return self._data_file("mel", self.index.get("generation", 0))
+
+    @property
+    def exists(self) -> bool:
+        """特征库是否已构建"""
+        return bool(self.index["files"]) and self.pcm_file.exists()
+
+    def _pcm_map(self):
+        import numpy as np
+
+        if self._pcm is None:
+            self._pcm = np.memmap(self.pcm_file, dtype=np.float32, mode='r')
+        return self._pcm
+
+    def _mel_map(self):
+        import numpy as np
+
+        if self._mel is None:
+            self._mel = np.memmap(self.mel_file, dtype=np.float32, mode='r')
+        return self._mel
+
+    def _segment(self, filepath: Path) -> Optional[Dict]:
+        """文件对应的片段；文件不在库中或已变化（大小/mtime不一致）时返回None"""
+        record = self.index["files"].get(Path(filepath).name)
+        if record is None:
+            return None
+
+        try:
+            stat = Path(filepath).stat()
+        except OSError:
+            return None
+        if stat.st_size != record["size"] or stat.st_mtime != record["mtime"]:
+            return None
+
+        return self.index["segments"].get(record["hash"])
+
+    def samples(self, filepath: Path) -> Optional["np.ndarray"]:
+        """
+        获取文件的PCM采样（只读零拷贝视图，采样率为 STORE_SAMPLE_RATE）
+
+        Returns:
+            采样数组；不在库中时返回None（调用方应自行解码）
+        """
+        segment = self._segment(filepath)
+        if segment is None:
+            return None
+
+        try:
+            pcm = self._pcm_map()
+        except (OSError, ValueError, ImportError):
+            return None
+        return pcm[segment["offset"]:segment["offset"] + segment["length"]]
+
+    def whisper_mel(self, filepath: Path, n_mels: int) -> Optional["np.ndarray"]:
+        """
+        获取文件补齐到30秒窗口的对数梅尔频谱（n_mels x 3000）
+
+        Returns:
+            频谱数组；不在库中或梅尔维度不一致时返回None
+        """
+        segment = self._segment(filepath)
+        if (segment is None or "mel_offset" not in segment or self.index["n_mels"] != n_mels
+                or segment["length"] > MEL_WINDOW_FRAMES * MEL_HOP):
+            return None
+
+        try:
+            import numpy as np
+            mel = self._mel_map()
+        except (OSError, ValueError, ImportError):
+            return None
+
+        frames = segment["mel_frames"]
+        stored = mel[segment["mel_offset"]:segment["mel_offset"] + n_mels * frames].reshape(n_mels, frames)
+
+        # 补零部分的频谱被截断到 (最大值 - 8)，归一化后为 max - 2（下限为 log10(1e-10) 对应的 -1.5）
+        window = np.full((n_mels, MEL_WINDOW_FRAMES), max(float(stored.max()) - 2.0, -1.5), dtype=np.float32)
+        window[:, :frames] = stored
+        return window
+
+    def build(self, files: Iterable[Path], workers: int = 1, n_mels: int = 0) -> Dict:
+        """
+        增量构建特征库
+
+        Args:
+            files: 需要入库的音频文件（不在其中的旧记录会被移除）
+            workers: 并行解码的进程数
+            n_mels: 同时保存的梅尔维度（0 表示不保存频谱；与已有频谱维度不同时全部重新计算）
+
+        Returns:
+            构建统计
+        """
+        stats = {"files": 0, "unchanged": 0, "decoded": 0, "failed": 0, "compacted": False}
+        if n_mels:
+            try:
+                import torch
+                import whisper
+            except ImportError:
+                print("⚠️ 未安装Whisper，只保存PCM采样")
+                n_mels = 0
+
+        segments = self.index["segments"]
+        old_files = self.index["files"]
+        new_files: Dict[str, Dict] = {}
+
+        if n_mels and self.index.get("n_mels") != n_mels:
+            for segment in segments.values():
+                segment.pop("mel_offset", None)
+                segment.pop("mel_frames", None)
+            self.index["n_mels"] = n_mels
+
+        # 找出内容变化的文件（大小和mtime未变时不重新计算哈希）
+        to_decode: Dict[str, Path] = {}
+        for filepath in files:
+            stats["files"] += 1
+            stat = filepath.stat()
+            record = old_files.get(filepath.name)
+            if record and record["size"] == stat.st_size and record["mtime"] == stat.st_mtime:
+                file_hash = record["hash"]
+            else:
+                file_hash = audio_sha256(filepath)
+
+            new_files[filepath.name] = {"hash": file_hash, "size": stat.st_size, "mtime": stat.st_mtime}
+            segment = segments.get(file_hash)
+            if segment is not None and (not n_mels or "mel_offset" in segment):
+                stats["unchanged"] += 1
+            else:
+                to_decode.setdefault(file_hash, filepath)
+
+        if to_decode:
+            print(f"🎧 解码 {len(to_decode)} 个新增或变化的音频...")
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            self._append(to_decode, new_files, workers, n_mels, stats)
+
+        self.index["files"] = new_files
+        stats["compacted"] = self._compact_if_needed()
+        self._save_index()
+        self._remove_stale_data()
+        return stats
+
+    def _append(self, to_decode: Dict[str, Path], new_files: Dict[str, Dict],
+                workers: int, n_mels: int, stats: Dict):
+        """解码并追加写入PCM（和梅尔频谱）数据"""
+        import numpy as np
+
+        hashes = list(to_decode)
+        paths = [str(to_decode[file_hash]) for file_hash in hashes]
+
+        if workers > 1 and len(paths) > 1:
+            executor = ProcessPoolExecutor(max_workers=min(workers, len(paths)))
+            decoded = executor.map(_safe_decode, paths, [n_mels] * len(paths), chunksize=8)
+        else:
+            executor = None
+            decoded = (_safe_decode(path, n_mels) for path in paths)
+
+        try:
+            with open(self.pcm_file, 'ab') as pcm_out, open(self.mel_file, 'ab') as mel_out:
+                pcm_offset = pcm_out.tell() // 4
+                mel_offset = mel_out.tell() // 4
+
+                for i, (file_hash, (samples, mel, error)) in enumerate(zip(hashes, decoded)):
+                    if samples is None:
+                        print(f"❌ 解码失败 {Path(paths[i]).name}: {error}")
+                        stats["failed"] += 1
+                        for name, record in list(new_files.items()):
+                            if record["hash"] == file_hash:
+                                del new_files[name]
+                        continue
+
+                    segment = {"offset": pcm_offset, "length": int(len(samples))}
+                    pcm_out.write(samples.astype(np.float32).tobytes())
+                    pcm_offset += len(samples)
+
+                    if mel is not None:
+                        segment["mel_offset"] = mel_offset
+                        segment["mel_frames"] = int(mel.shape[1])
+                        mel_out.write(np.ascontiguousarray(mel, dtype=np.float32).tobytes())
+                        mel_offset += mel.size
+
+                    self.index["segments"][file_hash] = segment
+                    stats["decoded"] += 1
+
+                pcm_out.flush()
+                os.fsync(pcm_out.fileno())
+                mel_out.flush()
+                os.fsync(mel_out.fileno())
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        self._pcm = self._mel = None
+
+    def _compact_if_needed(self) -> bool:
+        """
+        移除不再被引用的片段；无效数据比例超过 COMPACT_RATIO 时把数据重写为下一代文件
+
+        只更新内存中的索引，调用方保存索引后新数据才生效。
+        """
+        import numpy as np
+
+        referenced = {record["hash"] for record in self.index["files"].values()}
+        segments = {h: s for h, s in self.index["segments"].items() if h in referenced}
+        self.index["segments"] = segments
+
+        if not self.pcm_file.exists():
+            return False
+        total = self.pcm_file.stat().st_size // 4
+        used = sum(segment["length"] for segment in segments.values())
+        if total == 0 or (total - used) <= total * COMPACT_RATIO:
+            return False
+
+        print(f"🗜️  压缩PCM特征库 ({used}/{total} 采样仍在使用)")
+        pcm = self._pcm_map()
+        mel = self._mel_map() if self.mel_file.exists() and self.mel_file.stat().st_size else None
+
+        generation = self.index.get("generation", 0) + 1
+        with open(self._data_file("pcm", generation), 'wb') as pcm_out, \
+                open(self._data_file("mel", generation), 'wb') as mel_out:
+            pcm_offset = mel_offset = 0
+            for segment in segments.values():
+                start, length = segment["offset"], segment["length"]
+                pcm_out.write(pcm[start:start + length].tobytes())
+                segment["offset"] = pcm_offset
+                pcm_offset += length
+
+                if mel is not None and "mel_offset" in segment:
+                    size = self.index["n_mels"] * segment["mel_frames"]
+                    mel_out.write(mel[segment["mel_offset"]:segment["mel_offset"] + size].tobytes())
+                    segment["mel_offset"] = mel_offset
+                    mel_offset += size
+                else:
+                    segment.pop("mel_offset", None)
+                    segment.pop("mel_frames", None)
+
+            pcm_out.flush()
+            os.fsync(pcm_out.fileno())
+            mel_out.flush()
+            os.fsync(mel_out.fileno())
+
+        self._pcm = self._mel = None
+        self.index["generation"] = generation
+        return True
+
+    def _remove_stale_data(self):
+        """删除索引不再指向的数据文件（压缩前的旧一代，或压缩中断留下的新一代）"""
+        current = {self.pcm_file, self.mel_file}
+        for pattern in ("pcm*.f32", "mel*.f32"):
+            for data_file in self.store_dir.glob(pattern):
+                if data_file not in current:
+                    try:
+                        data_file.unlink()
+                    except OSError:
+                        pass
+
+    def _save_index(self):
+        """原子保存索引"""
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        temp_file = self.index_file.with_suffix(".tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, ensure_ascii=False)
+        os.replace(temp_file, self.index_file)
+
+    def summary(self) -> Dict:
+        """特征库概况"""
+        segments = self.index["segments"].values()
+        samples = sum(segment["length"] for segment in segments)
+        return {
+            "files": len(self.index["files"]),
+            "segments": len(self.index["segments"]),
+            "seconds": samples / STORE_SAMPLE_RATE,
+            "pcm_bytes": self.pcm_file.stat().st_size if self.pcm_file.exists() else 0,
+            "mel_bytes": self.mel_file.stat().st_size if self.mel_file.exists() else 0,
+            "n_mels": self.index.get("n_mels", 0)
+        }
+
+def _safe_decode(filepath: str, n_mels: int):
+    """
+    在工作进程中解码一个文件（n_mels 为 0 时不计算频谱）
+
+    Returns:
+        (采样, 梅尔频谱, 错误信息)；缺少Whisper时频谱为None，解码失败时采样为None
+    """
+    try:
+        samples = decode_pcm(Path(filepath))
+    except Exception as e:
+        return None, None, str(e)
+
+    mel = None
+    if n_mels:
+        try:
+            mel = whisper_log_mel(samples, n_mels)
+        except ImportError:
+            pass
+    return samples, mel, None
+
+# 进程内共享的只读特征库（未构建时为None）
+_shared_store: Optional[PCMStore] = None
+_shared_loaded = False
+
+def get_pcm_store() -> Optional[PCMStore]:
+    """获取进程内共享的特征库；尚未构建时返回None"""
+    global _shared_store, _shared_loaded
+
+    if not _shared_loaded:
+        _shared_loaded = True
+        store = PCMStore()
+        _shared_store = store if store.exists else None
+    return _shared_store
+
+def load_samples(filepath: Path) -> Optional["np.ndarray"]:
+    """从共享特征库读取采样（STORE_SAMPLE_RATE），不在库中时返回None"""
+    store = get_pcm_store()
+    return store.samples(filepath) if store else None
+
+def build_store(workers: int = 1, n_mels: int = 0) -> Dict:
+    """为音频目录中的全部MP3构建（或增量更新）特征库"""
+    audio_dir = config.get_audio_dir()
+    files = sorted(audio_dir.glob("*.mp3"))
+    print(f"📁 音频目录: {audio_dir} ({len(files)} 个文件)")
+
+    start_time = time.time()
+    store = PCMStore()
+    stats = store.build(files, workers, n_mels)
+    summary = store.summary()
+
+    print(f"✅ PCM特征库已更新 ({time.time() - start_time:.1f}s)")
+    print(f"   文件: {stats['files']}，未变化: {stats['unchanged']}，"
+          f"新解码: {stats['decoded']}，失败: {stats['failed']}")
+    print(f"   片段: {summary['segments']}，总时长: {summary['seconds']:.0f}s，"
+          f"PCM: {summary['pcm_bytes'] / 1024 / 1024:.1f}MB"
+          + (f"，梅尔({summary['n_mels']}): {summary['mel_bytes'] / 1024 / 1024:.1f}MB"
+             if summary['mel_bytes'] else ""))
+    return stats
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="构建解码后的音频特征库")
+    parser.add_argument("--workers", type=int, default=1, help="并行解码的进程数 (默认: 1)")
+    parser.add_argument("--mel", type=int, nargs="?", const=80, default=0,
+                        help="同时保存Whisper对数梅尔频谱（默认80维，large-v3 为128）")
+
+    args = parser.parse_args()
+    build_store(args.workers, args.mel)
+
+if __name__ == "__main__":
+    main()
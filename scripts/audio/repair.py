@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+闭环音频修复
+合成和Whisper校验分别在两个进程池中流水线并发执行：校验未通过的音频自动换引擎
+或合成变体重新合成，直到通过或用完重试次数，最后输出一份通过/拒绝台账
+"""
+
+import json
+import time
+import argparse
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from ..utils.common import build_audio_work_list, generate_timestamp, print_progress
+from ..utils.config import config
+from .tts_cache import atomic_copy
+from .generate import (
+    TTSGenerator, TTSResult, SYNTHESIS_VARIANTS,
+    _init_worker as _init_tts_worker, _generate_variant_in_worker
+)
+from .check_quality import (
+    CheckResult, REPORT_PROBLEM_LIMIT, scope_filename,
+    _init_worker as _init_check_worker, _check_in_worker
+)
+from .selectors import (
+    Selector, load_catalog_items, select_items, add_selector_arguments, selectors_from_args
+)
+
+# 每个音频项默认最多重新合成的次数
+DEFAULT_MAX_ATTEMPTS = 3
+
+# 质量等级排序（用于比较各次尝试）
+QUALITY_RANK = {"low": 0, "medium": 1, "high": 2}
+
+@dataclass
+class RepairAttempt:
+    """一次合成+校验的记录"""
+    attempt: int  # 0 为修复前已有的文件
+    engine: str  # existing 表示已有文件
+    variant: str
+    status: str  # checked, missing, invalid, failed, synth_failed
+    quality: str = ""
+    similarity: float = 0.0
+    transcribed_text: str = ""
+    issues: List[str] = field(default_factory=list)
+    cache_key: Optional[str] = None
+
+@dataclass
+class RepairEntry:
+    """台账中的一个音频文件"""
+    filename: str
+    text: str
+    module_id: str
+    item_type: str
+    aliases: List[str]
+    occurrences: List[str]
+    outcome: str = ""  # accepted, rejected
+    kept_attempt: Optional[int] = None  # 最终保留的尝试，None 表示没有可用音频
+    attempts: List[RepairAttempt] = field(default_factory=list)
+
+class AudioRepairScheduler:
+    """
+    生成→校验→重新生成的闭环调度器
+
+    同时处理的音频项数量限制为两个进程池工作进程总数的两倍，
+    合成池和校验池始终都有任务可做。每项的合成变体按
+    (引擎优先级, SYNTHESIS_VARIANTS) 依次尝试。
+    """
+
+    def __init__(self, max_attempts: int = DEFAULT_MAX_ATTEMPTS, min_quality: str = "medium",
+                 tts_workers: int = 1, asr_workers: int = 1):
+        """
+        Args:
+            max_attempts: 每项最多重新合成的次数
+            min_quality: 通过校验的最低质量等级 (high, medium)
+            tts_workers: 合成进程数
+            asr_workers: 校验进程数
+        """
+        self.generator = TTSGenerator()
+        self.audio_dir = self.generator.audio_dir
+        # 拒绝后仍需保留的最佳候选音频
+        self.best_dir = self.audio_dir / ".repair"
+
+        self.max_attempts = max_attempts
+        self.min_quality = min_quality
+        self.tts_workers = max(1, tts_workers)
+        self.asr_workers = max(1, asr_workers)
+
+        self.variants: List[Tuple[str, str]] = [
+            (engine, variant) for engine in self.generator.engines for variant in SYNTHESIS_VARIANTS
+        ]
+
+        self._items: Dict[str, Dict] = {}
+        self._best: Dict[str, Tuple[Tuple[int, float], int]] = {}
+
+        self.stats = {
+            "total_items": 0,
+            "accepted": 0,
+            "rejected": 0,
+            "accepted_as_is": 0,
+            "repaired": 0,
+            "synthesized": 0,
+            "verified": 0,
+            "duration": 0
+        }
+
+    def is_accepted(self, result: CheckResult) -> bool:
+        """校验结果是否达到通过标准（必须经过Whisper转录）"""
+        return (result.status == 'checked' and bool(result.transcribed_text)
+                and QUALITY_RANK.get(result.quality, -1) >= QUALITY_RANK[self.min_quality])
+
+    def run(self, items: List[Dict]) -> List[RepairEntry]:
+        """
+        修复给定文本项对应的音频
+
+        Args:
+            items: extract_text_from_json 返回的文本项
+
+        Returns:
+            台账条目（按完成顺序）
+        """
+        work_list, conflicts = build_audio_work_list(items)
+        for conflict in conflicts:
+            print(f"⚠️ 文件名冲突: {conflict['filename']} 对应多个文本: "
+                  f"{' | '.join(conflict['texts'])}")
+
+        entries: Deque[RepairEntry] = deque()
+        for work in work_list:
+            self._items[work['filename']] = work
+            entries.append(RepairEntry(
+                filename=work['filename'],
+                text=work['text'],
+                module_id=work['module_id'],
+                item_type=work['type'],
+                aliases=work['aliases'],
+                occurrences=work['occurrences']
+            ))
+
+        total = len(entries)
+        self.stats["total_items"] = total
+        print(f"📊 {len(items)} 个文本项去重后需要校验 {total} 个音频文件")
+        print(f"🔁 每项最多重新合成 {min(self.max_attempts, len(self.variants))} 次，"
+              f"通过标准: {self.min_quality} 及以上")
+        print(f"🚀 合成进程: {self.tts_workers}，校验进程: {self.asr_workers}")
+
+        start_time = time.time()
+        ledger: List[RepairEntry] = []
+
+        with ProcessPoolExecutor(
+            max_workers=self.tts_workers,
+            initializer=_init_tts_worker,
+            initargs=(asdict(config.tts),)
+        ) as tts_pool, ProcessPoolExecutor(
+            max_workers=self.asr_workers,
+            initializer=_init_check_worker,
+            # 分诊只用于快速拒绝损坏的音频，通过必须有Whisper转录的相似度
+            initargs=(asdict(config.asr), self.asr_workers, False)
+        ) as asr_pool:
+            in_flight = {}
+
+            def synthesize(entry: RepairEntry):
+                """提交下一个合成变体；重试次数或变体用尽时结束该项"""
+                number = sum(1 for attempt in entry.attempts if attempt.attempt > 0)
+                if number >= min(self.max_attempts, len(self.variants)):
+                    finish(entry)
+                    return
+
+                engine, variant = self.variants[number]
+                future = tts_pool.submit(
+                    _generate_variant_in_worker, entry.text, entry.filename, engine, variant
+                )
+                in_flight[future] = ("synthesize", entry, (number + 1, engine, variant))
+
+            def verify(entry: RepairEntry, attempt: Tuple[int, str, str], cache_key: Optional[str]):
+                """提交校验"""
+                item = dict(self._items[entry.filename], audio_path=f"/audio/tts/{entry.filename}")
+                future = asr_pool.submit(_check_in_worker, [item])
+                in_flight[future] = ("verify", entry, attempt + (cache_key,))
+
+            def start(entry: RepairEntry):
+                """开始处理一项：已有文件先校验，缺失的直接合成"""
+                if (self.audio_dir / entry.filename).exists():
+                    verify(entry, (0, "existing", "-"), self.generator.cache.index.get(entry.filename))
+                else:
+                    synthesize(entry)
+
+            def finish(entry: RepairEntry):
+                self._finish(entry)
+                ledger.append(entry)
+                print_progress(len(ledger), total, "修复进度", f"{entry.filename} - {entry.outcome}")
+
+            limit = (self.tts_workers + self.asr_workers) * 2
+            while in_flight or entries:
+                # 补充新项，保持两个进程池都有任务
+                while entries and len(in_flight) < limit:
+                    start(entries.popleft())
+                if not in_flight:
+                    continue
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, entry, attempt = in_flight.pop(future)
+                    if kind == "synthesize":
+                        self._on_synthesized(entry, attempt, future, synthesize, verify)
+                    else:
+                        self._on_verified(entry, attempt, future, synthesize, finish)
+
+        self.generator.cache.save()
+        self.stats["duration"] = time.time() - start_time
+        return ledger
+
+    def _on_synthesized(self, entry: RepairEntry, attempt: Tuple[int, str, str], future,
+                        synthesize, verify):
+        """合成完成：成功则提交校验，失败则换下一个变体"""
+        number, engine, variant = attempt
+        try:
+            result: TTSResult = future.result()
+        except Exception as e:
+            result = TTSResult(
+                text=entry.text,
+                filename=entry.filename,
+                filepath=self.audio_dir / entry.filename,
+                success=False,
+                engine=engine,
+                error_message=f"工作进程异常: {e}"
+            )
+
+        self.stats["synthesized"] += 1
+        if result.success:
+            verify(entry, attempt, result.cache_key)
+            return
+
+        entry.attempts.append(RepairAttempt(
+            attempt=number,
+            engine=engine,
+            variant=variant,
+            status="synth_failed",
+            issues=[result.error_message or "合成失败"]
+        ))
+        synthesize(entry)
+
+    def _on_verified(self, entry: RepairEntry, attempt: Tuple, future, synthesize, finish):
+        """校验完成：通过则结束，否则记录最佳候选并重新合成"""
+        number, engine, variant, cache_key = attempt
+        try:
+            result: CheckResult = future.result()[0]
+        except Exception as e:
+            result = None
+            issues = [f"工作进程异常: {e}"]
+
+        self.stats["verified"] += 1
+        record = RepairAttempt(
+            attempt=number,
+            engine=engine,
+            variant=variant,
+            status=result.status if result else "failed",
+            quality=result.quality if result else "",
+            similarity=result.similarity if result else 0.0,
+            transcribed_text=result.transcribed_text if result else "",
+            issues=list(result.issues) if result else issues,
+            cache_key=cache_key
+        )
+        entry.attempts.append(record)
+
+        if result and self.is_accepted(result):
+            entry.outcome = "accepted"
+            entry.kept_attempt = number
+            finish(entry)
+            return
+
+        if record.status == 'checked':
+            self._keep_if_best(entry, record)
+        elif record.status == 'failed':
+            # 无法转录时再合成也无法判断好坏，直接结束
+            finish(entry)
+            return
+
+        synthesize(entry)
+
+    def _keep_if_best(self, entry: RepairEntry, record: RepairAttempt):
+        """未通过的尝试中质量最好的一次复制到 .repair/，最终被拒绝时恢复它"""
+        score = (QUALITY_RANK.get(record.quality, -1), record.similarity)
+        best = self._best.get(entry.filename)
+        if best is not None and best[0] >= score:
+            return
+
+        try:
+            atomic_copy(self.audio_dir / entry.filename, self.best_dir / entry.filename)
+            self._best[entry.filename] = (score, record.attempt)
+        except OSError as e:
+            print(f"⚠️ 保存候选音频失败 {entry.filename}: {e}")
+
+    def _finish(self, entry: RepairEntry):
+        """
+        结束一项：确定保留的音频，同步到同文本的其他文件名，
+        并从TTS缓存中移除未被保留的合成结果
+        """
+        target = self.audio_dir / entry.filename
+        best_path = self.best_dir / entry.filename
+        last = entry.attempts[-1] if entry.attempts else None
+
+        if entry.outcome != "accepted":
+            entry.outcome = "rejected"
+            best = self._best.get(entry.filename)
+            if best is not None:
+                entry.kept_attempt = best[1]
+                if last is None or last.attempt != best[1]:
+                    atomic_copy(best_path, target)
+            elif target.exists() and last is not None and last.status != "synth_failed":
+                entry.kept_attempt = last.attempt
+
+        self._best.pop(entry.filename, None)
+        if best_path.exists():
+            best_path.unlink()
+
+        kept = next((a for a in entry.attempts if a.attempt == entry.kept_attempt), None)
+        kept_key = kept.cache_key if kept else None
+
+        for attempt in entry.attempts:
+            if attempt is not kept and attempt.cache_key and attempt.cache_key != kept_key:
+                self.generator.cache.evict(attempt.cache_key)
+
+        if kept_key:
+            self.generator.cache.record(entry.filename, kept_key)
+
+        # 同文本的其他文件名：音频已更换或缺失时同步
+        if kept is not None:
+            for alias in entry.aliases:
+                alias_path = self.audio_dir / alias
+                if kept.attempt > 0 or not alias_path.exists():
+                    atomic_copy(target, alias_path)
+                    if kept_key:
+                        self.generator.cache.record(alias, kept_key)
+
+        if entry.outcome == "accepted":
+            self.stats["accepted"] += 1
+            self.stats["accepted_as_is" if entry.kept_attempt == 0 else "repaired"] += 1
+        else:
+            self.stats["rejected"] += 1
+
+    def print_summary(self, ledger: List[RepairEntry]):
+        """打印修复摘要"""
+        print("\n" + "=" * 60)
+        print("🔁 闭环修复完成")
+        print(f"   总计: {self.stats['total_items']}")
+        print(f"   通过: {self.stats['accepted']} "
+              f"(原有音频 {self.stats['accepted_as_is']}，重新合成 {self.stats['repaired']})")
+        print(f"   拒绝: {self.stats['rejected']}")
+        print(f"   合成次数: {self.stats['synthesized']}，校验次数: {self.stats['verified']}")
+        print(f"   耗时: {self.stats['duration']:.1f}s")
+
+        rejected = [entry for entry in ledger if entry.outcome == "rejected"]
+        if rejected:
+            print(f"\n❌ 未能修复的音频 (前{REPORT_PROBLEM_LIMIT}个):")
+            for entry in rejected[:REPORT_PROBLEM_LIMIT]:
+                last = entry.attempts[-1] if entry.attempts else None
+                if last is None:
+                    reason = "无可用音频"
+                elif last.issues:
+                    reason = "; ".join(last.issues)
+                else:
+                    reason = f"质量 {last.quality or last.status} (相似度 {last.similarity:.1%})"
+                print(f"   {entry.filename}: '{entry.text}' - {reason}")
+        print("=" * 60)
+
+    def save_ledger(self, ledger: List[RepairEntry], scope: str) -> Path:
+        """保存通过/拒绝台账"""
+        ledger_file = (config.get_reports_dir()
+                       / f"audio_repair_ledger_{scope_filename(scope)}_{generate_timestamp()}.json")
+        data = {
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'scope': scope,
+            'settings': {
+                'max_attempts': self.max_attempts,
+                'min_quality': self.min_quality,
+                'variants': [f"{engine}:{variant}" for engine, variant in self.variants]
+            },
+            'stats': self.stats,
+            'entries': [asdict(entry) for entry in ledger]
+        }
+        with open(ledger_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        print(f"📒 台账已保存到: {ledger_file}")
+        return ledger_file
+
+def run_repair(pattern: str = "*.json", selectors: Sequence[Selector] = (),
+               scope: Optional[str] = None, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+               min_quality: str = "medium", tts_workers: int = 1,
+               asr_workers: int = 1) -> List[RepairEntry]:
+    """
+    加载一次内容，按选择器闭环修复音频并保存台账
+
+    Returns:
+        台账条目；没有可处理的内容时为空列表
+    """
+    scope = scope or pattern
+
+    items = load_catalog_items(pattern)
+    if selectors:
+        items = select_items(items, selectors)
+    if not items:
+        print(f"❌ 未找到匹配 '{scope}' 的内容")
+        return []
+
+    scheduler = AudioRepairScheduler(max_attempts, min_quality, tts_workers, asr_workers)
+    ledger = scheduler.run(items)
+    scheduler.print_summary(ledger)
+    scheduler.save_ledger(ledger, scope)
+    return ledger
+
+def add_repair_arguments(parser: argparse.ArgumentParser):
+    """添加闭环修复的命令行参数"""
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                        help=f"每项最多重新合成的次数 (默认: {DEFAULT_MAX_ATTEMPTS})")
+    parser.add_argument("--min-quality", choices=["high", "medium"], default="medium",
+                        help="通过校验的最低质量等级 (默认: medium)")
+    parser.add_argument("--tts-workers", type=int, default=1, help="合成进程数 (默认: 1)")
+    parser.add_argument("--asr-workers", type=int, default=1, help="校验进程数 (默认: 1)")
+    parser.add_argument("--model", help="校验使用的Whisper模型")
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="闭环音频修复：生成→校验→重新生成")
+    parser.add_argument("pattern", nargs="?", default="*.json",
+                        help="文件匹配模式 (默认: *.json)")
+    parser.add_argument("--config", help="配置文件路径")
+    add_repair_arguments(parser)
+    add_selector_arguments(parser)
+
+    args = parser.parse_args()
+
+    if args.config:
+        config.load_from_file(args.config)
+    if args.model:
+        config.asr.whisper_model = args.model
+
+    print("🔁 闭环音频修复启动")
+    print(f"📁 项目目录: {config.project_root}")
+    print(f"🎵 音频目录: {config.get_audio_dir()}")
+    print("=" * 60)
+
+    try:
+        selectors, scope = selectors_from_args(args)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"❌ {e}")
+        return
+
+    try:
+        run_repair(args.pattern, selectors, scope, args.max_attempts, args.min_quality,
+                   args.tts_workers, args.asr_workers)
+    except KeyboardInterrupt:
+        print("\n⚠️ 修复被用户中断")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+音频检查项选择器
+内容只加载和解析一次，再用可组合的选择器筛选需要检查的文本项：
+按文件模式、年级、模块范围、音频文件列表、文本类型或上次检查的质量结果
+"""
+
+import re
+import json
+import fnmatch
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..utils.common import load_json_files, extract_text_from_json, get_audio_filename_from_path
+from ..utils.config import config
+
+# 选择器：文本项 -> 是否选中
+Selector = Callable[[Dict], bool]
+
+# 模块文件名中的模块编号，如 module-03-xxx.json、grade6-lower-mod-03-xxx.json
+_MODULE_NUMBER = re.compile(r"(?:^module-|-mod-)(\d+)")
+
+def load_catalog_items(pattern: str = "*.json") -> List[Dict]:
+    """
+    加载匹配模式的全部模块并提取文本项
+
+    Args:
+        pattern: 模块文件匹配模式
+
+    Returns:
+        文本项列表（按模块文件名排序）
+    """
+    items = []
+    contents = sorted(load_json_files(pattern), key=lambda content: content['_filename'])
+    for content in contents:
+        if not content.get('moduleId') or not content.get('title'):
+            print(f"⚠️ 跳过无效文件: {content.get('_filename', 'unknown')}")
+            continue
+        items.extend(extract_text_from_json(content))
+    return items
+
+def select_items(items: Iterable[Dict], selectors: Sequence[Selector]) -> List[Dict]:
+    """返回满足全部选择器的文本项"""
+    return [item for item in items if all(selector(item) for selector in selectors)]
+
+def by_patterns(patterns: Sequence[str]) -> Selector:
+    """模块文件名匹配任一模式"""
+    return lambda item: any(fnmatch.fnmatch(item['file'], pattern) for pattern in patterns)
+
+def by_grade(grade: int, term: Optional[str] = None) -> Selector:
+    """
+    按年级（及学期）选择
+
+    Args:
+        grade: 年级，如 6
+        term: 学期 (upper, lower)，为空时不限
+    """
+    prefix = f"grade{grade}-{term}-" if term else f"grade{grade}-"
+    return lambda item: item['file'].startswith(prefix)
+
+def module_number(filename: str) -> Optional[int]:
+    """从模块文件名中提取模块编号"""
+    match = _MODULE_NUMBER.search(filename)
+    return int(match.group(1)) if match else None
+
+def parse_module_range(value: str) -> Tuple[int, int]:
+    """
+    解析模块范围
+
+    Args:
+        value: "3" 或 "1-10"
+
+    Returns:
+        (起始编号, 结束编号)
+    """
+    start, _, end = value.partition("-")
+    start = int(start)
+    end = int(end) if end else start
+    if end < start:
+        raise ValueError(f"无效的模块范围: {value}")
+    return start, end
+
+def by_module_range(start: int, end: int) -> Selector:
+    """模块编号在 [start, end] 范围内"""
+    def selector(item: Dict) -> bool:
+        number = module_number(item['file'])
+        return number is not None and start <= number <= end
+    return selector
+
+def by_audio_files(filenames: Iterable[str]) -> Selector:
+    """音频文件名在列表中"""
+    names = {Path(name).name for name in filenames}
+    return lambda item: get_audio_filename_from_path(item['audio_path']) in names
+
+def by_types(types: Iterable[str]) -> Selector:
+    """文本类型 (word, phrase, pattern) 在列表中"""
+    types = set(types)
+    return lambda item: item['type'] in types
+
+def latest_check_data(reports_dir: Optional[Path] = None) -> Optional[Path]:
+    """查找最近一次检查保存的JSON数据"""
+    reports_dir = reports_dir or config.get_reports_dir()
+    candidates = sorted(
+        reports_dir.glob("audio_quality_data_*.json"),
+        key=lambda path: path.stat().st_mtime
+    )
+    return candidates[-1] if candidates else None
+
+def by_last_run(outcomes: Iterable[str], data_file: Optional[Path] = None) -> Selector:
+    """
+    按上次检查的结果选择
+
+    Args:
+        outcomes: 质量 (high, medium, low) 或状态 (missing, failed, invalid)
+        data_file: 检查数据文件（默认为最近一次）
+    """
+    outcomes = set(outcomes)
+    data_file = data_file or latest_check_data()
+    if data_file is None:
+        raise FileNotFoundError("未找到上次检查的数据，请先运行一次检查")
+
+    with open(data_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    names = {
+        result['filename'] for result in data.get('results', [])
+        if result.get('quality') in outcomes or result.get('status') in outcomes
+    }
+    print(f"📋 从 {data_file.name} 选出 {len(names)} 个音频")
+    return lambda item: get_audio_filename_from_path(item['audio_path']) in names
+
+def add_selector_arguments(parser):
+    """为命令行解析器添加选择器参数"""
+    parser.add_argument("--grade", type=int, help="只检查指定年级，如 6")
+    parser.add_argument("--term", choices=["upper", "lower"], help="与 --grade 配合，只检查上/下册")
+    parser.add_argument("--modules", help="模块编号范围，如 '3' 或 '1-10'")
+    parser.add_argument("--files", nargs="+", help="只检查指定的音频文件名")
+    parser.add_argument("--types", nargs="+", choices=["word", "phrase", "pattern"], help="只检查指定类型")
+    parser.add_argument("--from-last", nargs="+", metavar="OUTCOME",
+                        help="只检查上次结果为指定质量/状态的音频 (high, medium, low, missing, failed, invalid)")
+
+def selectors_from_args(args) -> Tuple[List[Selector], str]:
+    """
+    根据命令行参数构造选择器
+
+    Returns:
+        (选择器列表, 用于报告的检查范围描述)
+    """
+    selectors = []
+    labels = [args.pattern]
+
+    if args.grade:
+        selectors.append(by_grade(args.grade, args.term))
+        labels.append(f"grade{args.grade}" + (f"-{args.term}" if args.term else ""))
+    if args.modules:
+        start, end = parse_module_range(args.modules)
+        selectors.append(by_module_range(start, end))
+        labels.append(f"mod{start:02d}-{end:02d}")
+    if args.files:
+        selectors.append(by_audio_files(args.files))
+        labels.append(f"{len(args.files)}files")
+    if args.types:
+        selectors.append(by_types(args.types))
+        labels.append("-".join(args.types))
+    if args.from_last:
+        selectors.append(by_last_run(args.from_last))
+        labels.append("last-" + "-".join(args.from_last))
+
+    return selectors, "+".join(labels)
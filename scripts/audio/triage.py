@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+音频信号级快速分诊
+在送入Whisper之前用NumPy计算响度、削波、首尾静音、有声比例以及
+实际时长与按音节数预测时长的差距，明显合格或明显损坏的音频直接给出结论，
+只有不确定的音频才需要ASR转录
+"""
+
+import re
+from pathlib import Path
+from typing import List, Optional, Tuple
+from dataclasses import dataclass, field
+
+from .pcm_store import load_samples, STORE_SAMPLE_RATE
+
+# 分析帧长（秒）
+FRAME_SECONDS = 0.02
+
+# 有声帧判定：低于峰值帧 35dB 或低于 -50dBFS 视为静音
+VOICED_RANGE_DB = 35.0
+VOICED_FLOOR_DB = -50.0
+
+# 削波判定阈值（满幅的比例）
+CLIP_LEVEL = 0.999
+
+# 时长预测：TTS语速约每音节0.22秒，另加句首句尾停顿
+SECONDS_PER_SYLLABLE = 0.22
+BASE_SECONDS = 0.35
+
+@dataclass
+class TriageResult:
+    """分诊结果"""
+    verdict: str  # pass, fail, ambiguous
+    duration: float = 0.0
+    expected_duration: float = 0.0
+    duration_ratio: float = 0.0
+    rms_db: float = -120.0
+    peak_db: float = -120.0
+    clipping_ratio: float = 0.0
+    leading_silence: float = 0.0
+    trailing_silence: float = 0.0
+    speech_ratio: float = 0.0
+    issues: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        """转换为可序列化的字典"""
+        return {
+            'verdict': self.verdict,
+            'duration': round(self.duration, 3),
+            'expected_duration': round(self.expected_duration, 3),
+            'duration_ratio': round(self.duration_ratio, 3),
+            'rms_db': round(self.rms_db, 1),
+            'peak_db': round(self.peak_db, 1),
+            'clipping_ratio': round(self.clipping_ratio, 4),
+            'leading_silence': round(self.leading_silence, 3),
+            'trailing_silence': round(self.trailing_silence, 3),
+            'speech_ratio': round(self.speech_ratio, 3),
+            'issues': self.issues
+        }
+
+def count_syllables(text: str) -> int:
+    """
+    估算英文文本的音节数
+
+    按元音组计数并去掉词尾不发音的 e；数字按每位两个音节估算。
+    """
+    total = 0
+    for word in re.findall(r"[a-z]+|\d+", text.lower()):
+        if word.isdigit():
+            total += 2 * len(word)
+            continue
+
+        groups = len(re.findall(r"[aeiouy]+", word))
+        if word.endswith("e") and not word.endswith(("le", "ee")) and groups > 1:
+            groups -= 1
+        total += max(1, groups)
+
+    return max(1, total)
+
+def predict_duration(text: str) -> float:
+    """按音节数预测TTS音频时长（秒）"""
+    return BASE_SECONDS + count_syllables(text) * SECONDS_PER_SYLLABLE
+
+def load_pcm(filepath: Path) -> Tuple["np.ndarray", int]:
+    """
+    解码音频为单声道 float32 PCM（已入PCM特征库的文件直接读取）
+
+    Returns:
+        (采样数组, 采样率)
+    """
+    stored = load_samples(filepath)
+    if stored is not None:
+        return stored, STORE_SAMPLE_RATE
+
+    import numpy as np
+    from pydub import AudioSegment
+
+    audio = AudioSegment.from_file(str(filepath)).set_channels(1)
+    samples = np.array(audio.get_array_of_samples(), dtype=np.float32)
+    samples /= float(1 << (8 * audio.sample_width - 1))
+    return samples, audio.frame_rate
+
+def analyze_signal(samples: "np.ndarray", sample_rate: int, text: str) -> TriageResult:
+    """
+    分析信号并给出分诊结论
+
+    Args:
+        samples: 单声道 float32 采样（范围 -1~1）
+        sample_rate: 采样率
+        text: 期望朗读的文本
+
+    Returns:
+        分诊结果
+    """
+    import numpy as np
+
+    result = TriageResult(verdict="ambiguous")
+    result.duration = len(samples) / sample_rate if sample_rate else 0.0
+    result.expected_duration = predict_duration(text)
+    result.duration_ratio = result.duration / result.expected_duration
+
+    frame_length = max(1, int(sample_rate * FRAME_SECONDS))
+    frame_count = len(samples) // frame_length
+    if frame_count == 0:
+        result.verdict = "fail"
+        result.issues.append("音频时长过短")
+        return result
+
+    frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+    frame_db = 20 * np.log10(np.sqrt(np.mean(frames ** 2, axis=1)) + 1e-10)
+
+    peak = float(np.max(np.abs(samples)))
+    result.peak_db = 20 * np.log10(peak + 1e-10)
+    result.rms_db = float(20 * np.log10(np.sqrt(np.mean(samples ** 2)) + 1e-10))
+    result.clipping_ratio = float(np.mean(np.abs(samples) >= CLIP_LEVEL))
+
+    voiced = frame_db > max(float(frame_db.max()) - VOICED_RANGE_DB, VOICED_FLOOR_DB)
+    voiced_indexes = np.flatnonzero(voiced)
+    result.speech_ratio = float(voiced.mean())
+    if voiced_indexes.size:
+        result.leading_silence = voiced_indexes[0] * FRAME_SECONDS
+        result.trailing_silence = (frame_count - 1 - voiced_indexes[-1]) * FRAME_SECONDS
+    else:
+        result.leading_silence = result.trailing_silence = result.duration
+
+    # 明显损坏
+    if result.peak_db < -45:
+        result.issues.append("音频无声音（静音）")
+    if result.clipping_ratio > 0.01:
+        result.issues.append("音频严重削波")
+    if result.speech_ratio < 0.15:
+        result.issues.append("有声部分过少")
+    if result.duration_ratio < 0.4:
+        result.issues.append("音频时长明显短于文本")
+    elif result.duration_ratio > 3.0:
+        result.issues.append("音频时长明显长于文本")
+
+    if result.issues:
+        result.verdict = "fail"
+        return result
+
+    # 明显合格
+    if (0.7 <= result.duration_ratio <= 1.5
+            and result.speech_ratio >= 0.4
+            and result.leading_silence < 0.5
+            and result.trailing_silence < 0.8
+            and -20 <= result.peak_db
+            and result.rms_db > -35
+            and result.clipping_ratio == 0):
+        result.verdict = "pass"
+
+    return result
+
+def triage_audio(filepath: Path, text: str) -> Optional[TriageResult]:
+    """
+    对音频文件分诊
+
+    Returns:
+        分诊结果；缺少 numpy/pydub 或解码失败时返回None（应交给ASR）
+    """
+    try:
+        samples, sample_rate = load_pcm(filepath)
+    except Exception:
+        return None
+    return analyze_signal(samples, sample_rate, text)
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+内容寻址的TTS音频缓存
+以 (标准化文本, 引擎, 模型, 语音, 后处理参数) 的哈希为键存储合成结果，
+再把缓存对象复制到 public/audio/tts 下的目标文件
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from ..utils.config import config
+
+# 缓存格式版本，键的组成方式变化时递增
+CACHE_VERSION = 1
+
+# 可能写入音频目录的全部引擎
+ALL_ENGINES = ("coqui", "say", "gtts")
+
+# 闭环修复时可选的合成变体：原文本；补全句末标点（短文本单独合成时语调更完整）
+SYNTHESIS_VARIANTS = ("plain", "sentence")
+
+# 独立批量脚本（generate_missing_audio.py、force_regenerate_low_quality_audio.py）
+# 使用的Coqui模型；这些脚本合成后还会做淡入淡出和响度标准化
+STANDALONE_COQUI_MODEL = "tts_models/en/ljspeech/vits"
+
+def normalize_tts_text(text: str) -> str:
+    """标准化合成文本（去除首尾空白、合并连续空白）"""
+    return " ".join(text.split())
+
+def synthesis_params(engine: str, **overrides) -> Dict:
+    """
+    获取影响合成结果的参数
+
+    Args:
+        engine: 引擎名称 (coqui, say, gtts)
+        overrides: 覆盖或追加的参数（如其他模型、后处理设置）
+
+    Returns:
+        参数字典
+    """
+    params = {"sample_rate": config.tts.sample_rate}
+
+    if engine == "coqui":
+        params["model"] = config.tts.coqui_model
+    elif engine == "say":
+        params["voice"] = config.tts.say_voice
+    elif engine == "gtts":
+        params["lang"] = config.tts.gtts_lang
+
+    params.update(overrides)
+    return params
+
+def atomic_copy(source: Path, target: Path):
+    """
+    复制文件到目标位置
+
+    先写同目录下的临时文件再重命名，目标文件要么是旧内容要么是完整的新内容，
+    多个进程同时写入同一目标也是安全的。
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        shutil.copyfile(source, temp_name)
+        os.replace(temp_name, target)
+    finally:
+        if os.path.exists(temp_name):
+            os.unlink(temp_name)
+
+def post_process_params() -> Dict:
+    """音频后处理参数（参与缓存键计算）"""
+    return {
+        "normalize": config.tts.normalize_audio,
+        "fade_ms": config.tts.fade_ms,
+        "loudness_target": config.tts.loudness_target,
+        "true_peak_limit": config.tts.true_peak_limit,
+        "bitrate": config.tts.mp3_bitrate
+    }
+
+def synthesis_key(text: str, engine: str, model: Optional[str] = None, variant: str = "plain",
+                  post_processed: bool = False, batched: bool = False) -> str:
+    """
+    所有生成路径共用的缓存键
+
+    Args:
+        text: 合成文本
+        engine: 引擎名称
+        model: 不同于配置的模型（None 表示使用配置中的模型）
+        variant: 合成变体，见 SYNTHESIS_VARIANTS（plain 与普通生成共用键）
+        post_processed: 合成后是否经过淡入淡出和响度标准化
+        batched: 是否由多段短文本拼接合成后切分得到
+    """
+    overrides = {}
+    if model is not None:
+        overrides["model"] = model
+    if variant != "plain":
+        overrides["variant"] = variant
+    if post_processed:
+        overrides.update(post_process_params())
+    if batched:
+        overrides["batched"] = True
+    return TTSCache.make_key(text, engine, synthesis_params(engine, **overrides))
+
+def accepted_keys(text: str, engines: Iterable[str] = ALL_ENGINES) -> Dict[str, str]:
+    """
+    文本在任一生成路径下可能得到的缓存键（按优先级）
+
+    包含 manage.py 生成、闭环修复的变体、Coqui批量合成以及独立批量脚本的产出，
+    由其中任何一个路径生成的文件都不会被其他路径视为参数已变化。
+
+    Returns:
+        {标签: 键}，如 {"coqui": ..., "coqui+sentence": ..., "coqui+standalone": ...}
+    """
+    keys = {}
+    engines = list(engines)
+    for engine in engines:
+        for variant in SYNTHESIS_VARIANTS:
+            label = engine if variant == "plain" else f"{engine}+{variant}"
+            keys[label] = synthesis_key(text, engine, variant=variant)
+    if "coqui" in engines:
+        keys["coqui+batched"] = synthesis_key(text, "coqui", batched=True)
+        keys["coqui+standalone"] = synthesis_key(
+            text, "coqui", model=STANDALONE_COQUI_MODEL, post_processed=True
+        )
+    return keys
+
+class TTSCache:
+    """
+    TTS内容寻址缓存
+
+    目录结构:
+        objects/<前两位>/<键>.mp3   合成结果，每个键只存一份
+        index.json                  目标文件名 -> 最近一次写入的键
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = cache_dir or config.get_cache_dir() / "tts"
+        self.objects_dir = self.cache_dir / "objects"
+        self.index_file = self.cache_dir / "index.json"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+
+        self.index: Dict[str, str] = self._load_index()
+        self._dirty = False
+
+    def _load_index(self) -> Dict[str, str]:
+        """加载文件名索引"""
+        if not self.index_file.exists():
+            return {}
+
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != CACHE_VERSION:
+                return {}
+            return data.get("files", {})
+        except Exception as e:
+            print(f"⚠️ 读取TTS缓存索引失败: {e}")
+            return {}
+
+    @staticmethod
+    def make_key(text: str, engine: str, params: Dict) -> str:
+        """计算缓存键"""
+        payload = json.dumps({
+            "version": CACHE_VERSION,
+            "text": normalize_tts_text(text),
+            "engine": engine,
+            "params": params
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def object_path(self, key: str) -> Path:
+        """缓存对象路径"""
+        return self.objects_dir / key[:2] / f"{key}.mp3"
+
+    def get(self, key: str) -> Optional[Path]:
+        """获取缓存对象，不存在时返回None"""
+        path = self.object_path(key)
+        return path if path.exists() else None
+
+    def put(self, key: str, source: Path) -> Path:
+        """
+        把合成结果存入缓存
+
+        先写临时文件再重命名，多个进程同时写入同一个键也是安全的。
+        """
+        target = self.object_path(key)
+        if not target.exists():
+            atomic_copy(source, target)
+        return target
+
+    def materialize(self, key: str, target: Path) -> bool:
+        """把缓存对象复制到目标文件（原子替换）"""
+        source = self.get(key)
+        if source is None:
+            return False
+
+        atomic_copy(source, target)
+        return True
+
+    def evict(self, key: str):
+        """删除缓存对象（校验未通过的合成结果不再被复用）"""
+        path = self.object_path(key)
+        if path.exists():
+            path.unlink()
+
+    def record(self, filename: str, key: str):
+        """记录目标文件当前对应的键"""
+        if self.index.get(filename) != key:
+            self.index[filename] = key
+            self._dirty = True
+
+    def status(self, filepath: Path, keys: Iterable[str]) -> str:
+        """
+        判断目标文件状态
+
+        Returns:
+            missing: 文件不存在
+            current: 文件由其中一个键生成
+            stale:   文件由其他参数生成，需要重新合成
+            untracked: 文件存在但没有缓存记录（历史文件，视为有效）
+        """
+        if not filepath.exists():
+            return "missing"
+
+        recorded = self.index.get(filepath.name)
+        if recorded is None:
+            return "untracked"
+
+        return "current" if recorded in set(keys) else "stale"
+
+    def save(self):
+        """保存文件名索引"""
+        if not self._dirty:
+            return
+
+        temp_file = self.index_file.with_suffix(".tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({"version": CACHE_VERSION, "files": self.index}, f,
+                      indent=2, ensure_ascii=False, sort_keys=True)
+        os.replace(temp_file, self.index_file)
+        self._dirty = False
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+常驻TTS合成服务
+模型只加载一次，通过 stdin/stdout 的 JSON Lines 协议提供合成服务
+
+协议（每行一个JSON对象）:
+    请求: {"id": 1, "text": "Hello", "out_path": "/tmp/hello.wav"}
+    响应: {"id": 1, "ok": true, "elapsed": 0.42}
+          {"id": 1, "ok": false, "error": "..."}
+
+启动后服务先输出一行 {"ready": true, "model": "..."}，
+之后按请求顺序逐行响应。stdin 关闭时服务退出。
+"""
+
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+import subprocess
+from pathlib import Path
+from typing import Dict, Optional
+
+# 添加项目根目录到Python路径
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from scripts.utils.config import config
+
+# 等待模型加载就绪的时限（秒）
+STARTUP_TIMEOUT = 300
+
+# 单次合成请求的时限（秒）
+REQUEST_TIMEOUT = 30
+
+def serve(model_name: str):
+    """运行合成服务主循环"""
+    # stdout 只用于协议，日志输出全部转到 stderr
+    protocol = sys.stdout
+    sys.stdout = sys.stderr
+
+    from scripts.audio.generate import get_coqui_tts, _coqui_tts_kwargs
+
+    def respond(message: Dict):
+        protocol.write(json.dumps(message, ensure_ascii=False) + "\n")
+        protocol.flush()
+
+    try:
+        tts = get_coqui_tts(model_name)
+    except Exception as e:
+        respond({"ready": False, "model": model_name, "error": str(e)})
+        return
+
+    respond({"ready": True, "model": model_name})
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+
+            start = time.time()
+            wav = tts.tts(text=request["text"], **_coqui_tts_kwargs(tts))
+            tts.synthesizer.save_wav(wav, request["out_path"])
+
+            respond({"id": request_id, "ok": True, "elapsed": round(time.time() - start, 3)})
+        except Exception as e:
+            respond({"id": request_id, "ok": False, "error": str(e)})
+
+class TTSServerClient:
+    """
+    TTS合成服务客户端
+
+    首次请求时启动服务子进程，之后所有请求复用同一个已加载的模型。
+    服务超时未响应时被终止；启动失败后不再重试（避免每一项都重新加载模型）。
+    可作为上下文管理器使用，退出时关闭服务。
+    """
+
+    def __init__(self, model_name: Optional[str] = None):
+        self.model_name = model_name or config.tts.coqui_model
+        self.process: Optional[subprocess.Popen] = None
+        self.start_failed = False
+        self._lines: Optional[queue.Queue] = None
+        self._next_id = 0
+
+    def start(self) -> bool:
+        """启动服务并等待模型就绪"""
+        if self.process and self.process.poll() is None:
+            return True
+        if self.start_failed:
+            return False
+
+        print(f"🚀 启动TTS服务: {self.model_name}")
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "scripts.audio.tts_server", "--model", self.model_name],
+            cwd=str(config.project_root),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1
+        )
+
+        # 后台线程逐行读取 stdout，主线程带时限地等待消息
+        self._lines = queue.Queue()
+        threading.Thread(
+            target=self._pump, args=(self.process.stdout, self._lines), daemon=True
+        ).start()
+
+        message = self._read_message(STARTUP_TIMEOUT)
+        if not message or not message.get("ready"):
+            error = message.get("error") if message else "服务未响应"
+            print(f"❌ TTS服务启动失败: {error}")
+            self.start_failed = True
+            self.close(kill=True)
+            return False
+
+        print("✅ TTS服务已就绪")
+        return True
+
+    def synthesize(self, text: str, out_path: Path) -> bool:
+        """
+        合成音频到指定WAV文件
+
+        Args:
+            text: 要合成的文本
+            out_path: 输出WAV路径
+
+        Returns:
+            是否成功
+        """
+        if not self.start():
+            return False
+
+        self._next_id += 1
+        request = {"id": self._next_id, "text": text, "out_path": str(Path(out_path).resolve())}
+
+        try:
+            self.process.stdin.write(json.dumps(request, ensure_ascii=False) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            print(f"❌ TTS服务连接中断: {e}")
+            self.close()
+            return False
+
+        message = self._read_message(REQUEST_TIMEOUT)
+        if not message:
+            print(f"❌ TTS服务无响应（{REQUEST_TIMEOUT}s 超时或已退出）")
+            self.close(kill=True)
+            return False
+
+        if not message.get("ok"):
+            print(f"❌ TTS服务合成失败: {message.get('error')}")
+            return False
+
+        return True
+
+    @staticmethod
+    def _pump(stream, lines: queue.Queue):
+        """把服务输出的每一行放入队列，服务退出时放入 None"""
+        for line in stream:
+            lines.put(line)
+        lines.put(None)
+
+    def _read_message(self, timeout: float) -> Optional[Dict]:
+        """读取一行协议消息（超时或服务已退出时返回None）"""
+        try:
+            line = self._lines.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if not line:
+            return None
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError:
+            return None
+
+    def close(self, kill: bool = False):
+        """关闭服务（kill 为真时直接终止，用于服务无响应的情况）"""
+        if not self.process:
+            return
+
+        try:
+            if kill:
+                self.process.kill()
+            elif self.process.stdin:
+                self.process.stdin.close()
+            self.process.wait(timeout=10)
+        except Exception:
+            self.process.kill()
+        finally:
+            self.process = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="常驻TTS合成服务 (stdin/stdout JSON Lines)")
+    parser.add_argument("--model", default=None, help="Coqui模型名称")
+
+    args = parser.parse_args()
+
+    serve(args.model or config.tts.coqui_model)
+
+if __name__ == "__main__":
+    main()
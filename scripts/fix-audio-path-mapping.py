@@ -7,9 +7,16 @@
 import json
 import os
 import re
+import sys
 from pathlib import Path
 from typing import Dict, List
 
+# 添加项目根目录到Python路径
+sys.path.append(str(Path(__file__).parent.parent))
+
+from scripts.utils.content_index import read_module
+from scripts.utils.audio_refs import extract_audio_references, resolve_pointer
+
 def text_to_filename(text: str) -> str:
     """
     将英文文本转换为音频文件名（与 generate_audio.py 保持一致）
@@ -56,85 +63,38 @@ def check_module_file(module_file: Path) -> List[Dict]:
     issues = []
 
     try:
-        with open(module_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = read_module(module_file)
 
-        # 检查 words 部分
-        for i, word in enumerate(data.get('words', [])):
-            if 'audio' in word and 'en' in word:
-                expected_filename = text_to_filename(word['en'])
-                current_path = word['audio']
-                current_filename = Path(current_path).name
-
-                if current_filename != expected_filename:
-                    issues.append({
-                        'type': 'word',
-                        'index': i,
-                        'id': word.get('id', ''),
-                        'en': word['en'],
-                        'current_path': current_path,
-                        'expected_path': f"/audio/tts/{expected_filename}",
-                        'module': module_file.name
-                    })
-
-        # 检查 phrases 部分
-        for i, phrase in enumerate(data.get('phrases', [])):
-            if 'audio' in phrase and 'en' in phrase:
-                expected_filename = text_to_filename(phrase['en'])
-                current_path = phrase['audio']
-                current_filename = Path(current_path).name
-
-                if current_filename != expected_filename:
-                    issues.append({
-                        'type': 'phrase',
-                        'index': i,
-                        'id': phrase.get('id', ''),
-                        'en': phrase['en'],
-                        'current_path': current_path,
-                        'expected_path': f"/audio/tts/{expected_filename}",
-                        'module': module_file.name
-                    })
-
-        # 检查 patterns 部分（生成音频文件名）
-        for i, pattern in enumerate(data.get('patterns', [])):
-            if 'q' in pattern:
-                expected_filename = text_to_filename(pattern['q'])
+        for ref in extract_audio_references(data, module_file.name):
+            if ref.kind == 'pattern':
                 # patterns 通常没有预定义的 audio 字段，但我们记录应该生成的文件名
                 issues.append({
                     'type': 'pattern_info',
-                    'index': i,
-                    'q': pattern['q'],
-                    'expected_filename': expected_filename,
+                    'pointer': ref.pointer,
+                    'q': ref.text,
+                    'expected_filename': text_to_filename(ref.text),
                     'module': module_file.name
                 })
-
-        # 检查 quests 部分中的音频
-        for qi, quest in enumerate(data.get('quests', [])):
-            for si, step in enumerate(quest.get('steps', [])):
-                if 'audio' in step and 'text' in step:
-                    # 对于 quests，音频内容可能来自 text 或 answer 字段
-                    audio_text = step.get('text', '')
-                    if step.get('type') == 'fillblank' and 'answer' in step:
-                        if isinstance(step['answer'], list) and step['answer']:
-                            audio_text = step['answer'][0]
-                        else:
-                            audio_text = step.get('text', '')
-
-                    if audio_text:
-                        expected_filename = text_to_filename(audio_text)
-                        current_path = step['audio']
-                        current_filename = Path(current_path).name
-
-                        if current_filename != expected_filename:
-                            issues.append({
-                                'type': 'quest_step',
-                                'quest_index': qi,
-                                'step_index': si,
-                                'text': audio_text,
-                                'current_path': current_path,
-                                'expected_path': f"/audio/tts/{expected_filename}",
-                                'module': module_file.name
-                            })
+                continue
+
+            # 只检查 audio 字段；步骤的朗读文本随类型而定（填空取答案，排序题取正确句子）
+            if not ref.explicit or ref.kind not in ('word', 'phrase', 'step') or not ref.text:
+                continue
+
+            expected_filename = text_to_filename(ref.text)
+            if ref.filename != expected_filename:
+                issue = {
+                    'type': 'quest_step' if ref.kind == 'step' else ref.kind,
+                    'pointer': ref.pointer,
+                    'current_path': resolve_pointer(data, ref.pointer)['audio'],
+                    'expected_path': f"/audio/tts/{expected_filename}",
+                    'module': module_file.name
+                }
+                if ref.kind == 'step':
+                    issue['text'] = ref.text
+                else:
+                    issue.update(id=ref.id, en=ref.text)
+                issues.append(issue)
 
     except Exception as e:
         print(f"❌ 处理文件 {module_file} 时出错: {e}")
@@ -151,33 +111,11 @@ def fix_module_file(module_file: Path, issues: List[Dict]) -> bool:
 
         modified = False
 
-        # 修复 words
-        for issue in issues:
-            if issue['type'] == 'word':
-                for word in data.get('words', []):
-                    if word.get('id') == issue['id']:
-                        word['audio'] = issue['expected_path']
-                        modified = True
-                        break
-
-        # 修复 phrases
-        for issue in issues:
-            if issue['type'] == 'phrase':
-                for phrase in data.get('phrases', []):
-                    if phrase.get('id') == issue['id']:
-                        phrase['audio'] = issue['expected_path']
-                        modified = True
-                        break
-
-        # 修复 quest steps
+        # 按JSON指针定位 words、phrases 和 quest steps
         for issue in issues:
-            if issue['type'] == 'quest_step':
-                quest = data.get('quests', [])[issue['quest_index']]
-                if quest:
-                    step = quest.get('steps', [])[issue['step_index']]
-                    if step:
-                        step['audio'] = issue['expected_path']
-                        modified = True
+            if issue['type'] in ('word', 'phrase', 'quest_step'):
+                resolve_pointer(data, issue['pointer'])['audio'] = issue['expected_path']
+                modified = True
 
         if modified:
             with open(module_file, 'w', encoding='utf-8') as f:
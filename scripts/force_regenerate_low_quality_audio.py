@@ -15,16 +15,20 @@ try:
     import sys
     sys.path.append(str(Path(__file__).parent.parent))
     from generate_missing_audio import CoquiAudioGenerator
+    from scripts.audio.job_journal import JobJournal
 except ImportError:
     print("❌ 无法导入音频生成器，请确保 generate_missing_audio.py 存在")
     exit(1)
 
 class ForceAudioRegenerator:
-    def __init__(self):
+    def __init__(self, resume: bool = False):
         self.project_root = Path(__file__).parent.parent
         self.audio_dir = self.project_root / "public" / "audio" / "tts"
         self.audio_generator = CoquiAudioGenerator()
 
+        # 任务日志：中断后以 --resume 重新运行时跳过已重新生成的文件
+        self.resume = resume
+
         # 低质量文件列表（从检查报告中提取）
         self.low_quality_files = [
             {
@@ -137,19 +141,10 @@ class ForceAudioRegenerator:
         text = file_info['text']
         filepath = self.audio_dir / filename
 
-        # 删除现有文件（如果存在）
-        if filepath.exists():
-            try:
-                filepath.unlink()
-                print(f"   🗑️ 删除原文件: {filename}")
-            except Exception as e:
-                print(f"   ❌ 删除文件失败: {filename} - {e}")
-                return False
-
-        # 重新生成音频文件
+        # 重新生成音频文件（新文件生成完成后才原子替换原文件，失败时原文件保留）
         try:
             print(f"   🎵 重新生成: {text}")
-            self.audio_generator.generate_coqui_tts(filename, text)
+            self.audio_generator.generate_coqui_tts(filename, text, force=True)
 
             # 验证文件是否生成成功
             if filepath.exists():
@@ -179,26 +174,44 @@ class ForceAudioRegenerator:
         print(f"📊 待处理文件: {self.stats['total_files']} 个")
         print("=" * 60)
 
-        # 1. 备份原始文件
-        self.backup_original_files()
-        print()
+        journal = JobJournal("force-regenerate-low-quality", resume=self.resume)
+        journal.plan(file_info['filename'] for file_info in self.low_quality_files)
+
+        # 1. 备份原始文件（续跑时已重新生成的文件不再覆盖备份）
+        if not self.resume:
+            self.backup_original_files()
+            print()
 
         # 2. 强制重新生成
         print("🔧 开始强制重新生成...")
-        for i, file_info in enumerate(self.low_quality_files):
-            print(f"[{i+1}/{self.stats['total_files']}] 处理: {file_info['module']} - {file_info['filename']}")
-            print(f"   📝 原文: '{file_info['text']}'")
-            print(f"   📊 原相似度: {file_info['original_similarity']:.1f}%")
-
-            success = self.force_regenerate_audio(file_info)
-
-            if success:
-                self.stats["success_count"] += 1
-            else:
-                self.stats["failed_count"] += 1
+        try:
+            for i, file_info in enumerate(self.low_quality_files):
+                filename = file_info['filename']
+                print(f"[{i+1}/{self.stats['total_files']}] 处理: {file_info['module']} - {filename}")
+                print(f"   📝 原文: '{file_info['text']}'")
+                print(f"   📊 原相似度: {file_info['original_similarity']:.1f}%")
+
+                if journal.is_committed(filename) and (self.audio_dir / filename).exists():
+                    print(f"   ⏭️ 上次运行已完成: {filename}")
+                    self.stats["success_count"] += 1
+                    print()
+                    continue
+
+                journal.start([filename])
+                success = self.force_regenerate_audio(file_info)
+
+                if success:
+                    journal.commit(filename)
+                    self.stats["success_count"] += 1
+                else:
+                    journal.fail(filename)
+                    self.stats["failed_count"] += 1
 
-            print()  # 空行分隔
-            time.sleep(0.5)  # 避免系统过载
+                print()  # 空行分隔
+                time.sleep(0.5)  # 避免系统过载
+        finally:
+            journal.close()
+            self.audio_generator.cleanup()
 
         # 3. 生成报告
         self.generate_regeneration_report()
@@ -257,7 +270,13 @@ class ForceAudioRegenerator:
 
 def main():
     """主函数"""
-    regenerator = ForceAudioRegenerator()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="强制重新生成低质量音频文件")
+    parser.add_argument("--resume", action="store_true", help="按任务日志续跑上次中断的重新生成")
+    args = parser.parse_args()
+
+    regenerator = ForceAudioRegenerator(resume=args.resume)
     regenerator.run_regeneration()
 
 if __name__ == "__main__":
@@ -12,8 +12,16 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from scripts.utils.config import config
-from scripts.audio.check_quality import AudioQualityChecker
+from scripts.audio.check_quality import run_check
+from scripts.audio.selectors import add_selector_arguments, selectors_from_args
 from scripts.audio.generate import TTSGenerator
+from scripts.audio.repair import run_repair, add_repair_arguments
+from scripts.audio.build_manifest import BuildManifest, print_build_report
+from scripts.audio.pcm_store import build_store
+from scripts.audio.loudness import run_loudness
+from scripts.utils.search_index import run_query
+from scripts.audio.audio_gc import run_gc, restore as restore_audio
+from scripts.utils.module_schema import run_validation, watch_validation
 
 def print_banner():
     """打印欢迎横幅"""
@@ -40,6 +48,16 @@ def print_help():
    python scripts/manage.py check grade6-*.json
    python scripts/manage.py check "module-01-*.json" --model small
    python scripts/manage.py check "*.json" --quiet
+   python scripts/manage.py check "*.json" --workers 4
+   python scripts/manage.py check "*.json" --batch-size 16
+   python scripts/manage.py check "*.json" --no-triage
+   python scripts/manage.py check "*.json" --cascade tiny,base,small
+   python scripts/manage.py check --grade 6
+   python scripts/manage.py check --grade 6 --term lower --types phrase pattern
+   python scripts/manage.py check "module-*.json" --modules 1-10
+   python scripts/manage.py check --files coin.mp3 tidy.mp3
+   python scripts/manage.py check --from-last low failed
+   python scripts/manage.py check "*.json" --resume
 
 2. 音频生成:
    python scripts/manage.py generate <pattern> [选项]
@@ -48,8 +66,70 @@ def print_help():
    python scripts/manage.py generate grade6-*.json
    python scripts/manage.py generate "module-01-*.json" --engine coqui
    python scripts/manage.py generate "*.json" --missing-only
+   python scripts/manage.py generate "*.json" --workers 8
+   python scripts/manage.py generate "*.json" --batch-size 16
+   python scripts/manage.py generate "*.json" --force --resume
 
-3. 配置管理:
+3. 闭环修复（生成→校验→重新生成）:
+   python scripts/manage.py repair [pattern] [选项]
+
+   示例:
+   python scripts/manage.py repair --grade 6
+   python scripts/manage.py repair --from-last low failed --max-attempts 4
+   python scripts/manage.py repair "*.json" --tts-workers 2 --asr-workers 2 --min-quality high
+
+4. 增量构建:
+   python scripts/manage.py build [pattern] [选项]
+
+   示例:
+   python scripts/manage.py build
+   python scripts/manage.py build --generate --workers 8
+   python scripts/manage.py build --generate --loudness
+
+5. PCM特征库（解码一次，检查/分诊直接读取）:
+   python scripts/manage.py pcm [选项]
+
+   示例:
+   python scripts/manage.py pcm --workers 8
+   python scripts/manage.py pcm --mel
+   python scripts/manage.py pcm --mel 128
+
+6. 响度标准化（EBU R128，只重新编码超出容差的音频）:
+   python scripts/manage.py loudness [选项]
+
+   示例:
+   python scripts/manage.py loudness --workers 8
+   python scripts/manage.py loudness --dry-run
+
+7. 内容查询（倒排索引）:
+   python scripts/manage.py query <text|audio|zh|glosses> [内容] [选项]
+
+   示例:
+   python scripts/manage.py query text "went to the zoo"
+   python scripts/manage.py query text "doctor" --exact
+   python scripts/manage.py query audio coin.mp3
+   python scripts/manage.py query zh 医生
+   python scripts/manage.py query glosses
+
+8. 孤立音频回收（引用计数，可恢复）:
+   python scripts/manage.py gc [选项]
+
+   示例:
+   python scripts/manage.py gc --dry-run
+   python scripts/manage.py gc
+   python scripts/manage.py gc --restore
+   python scripts/manage.py gc --restore 20250101-120000-000000
+
+9. 模块JSON校验（全部年级，问题以JSON指针定位）:
+   python scripts/manage.py validate [pattern] [选项]
+
+   示例:
+   python scripts/manage.py validate
+   python scripts/manage.py validate grade3-*.json --workers 8
+   python scripts/manage.py validate --changed
+   python scripts/manage.py validate --watch --errors-only
+
+10. 配置管理:
    python scripts/manage.py config [action]
 
    示例:
@@ -88,35 +168,15 @@ def handle_check_command(args):
     """处理检查命令"""
     print("🔍 开始音频质量检查...")
 
-    # 创建检查器
-    checker = AudioQualityChecker()
-
-    # 加载Whisper模型
-    if not checker.load_whisper_model():
-        print("❌ 无法加载Whisper模型，程序退出")
+    try:
+        selectors, scope = selectors_from_args(args)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"❌ {e}")
         return False
 
     try:
-        # 执行检查
-        results = checker.check_pattern(args.pattern)
-
-        if not results:
-            print("❌ 没有找到需要检查的内容")
-            return False
-
-        # 生成报告
-        print(f"\n📊 生成检查报告...")
-        report = checker.generate_report(results, args.pattern)
-
-        # 打印报告摘要
-        if not args.quiet:
-            print("\n" + report)
-
-        # 保存报告
-        checker.save_report(report, results, args.pattern)
-
-        print(f"✅ 检查完成！共检查了 {len(results)} 个音频项")
-        return True
+        _, checked = run_check(args.pattern, selectors, scope, args.quiet, args.resume)
+        return checked > 0
 
     except Exception as e:
         print(f"❌ 检查过程中发生错误: {e}")
@@ -135,7 +195,9 @@ def handle_generate_command(args):
             results = generator.generate_missing_audio(args.pattern)
         else:
             # 生成所有音频
-            results = generator.generate_from_pattern(args.pattern, args.force)
+            results = generator.generate_from_pattern(
+                args.pattern, args.force, args.workers, args.batch_size, args.resume
+            )
 
         if not results:
             print("❌ 没有找到需要生成的内容")
@@ -162,6 +224,117 @@ def handle_generate_command(args):
         print(f"❌ 生成过程中发生错误: {e}")
         return False
 
+def handle_repair_command(args):
+    """处理闭环修复命令"""
+    print("🔁 开始闭环修复...")
+
+    try:
+        selectors, scope = selectors_from_args(args)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"❌ {e}")
+        return False
+
+    try:
+        ledger = run_repair(args.pattern, selectors, scope, args.max_attempts, args.min_quality,
+                            args.tts_workers, args.asr_workers)
+        return bool(ledger) and all(entry.outcome == "accepted" for entry in ledger)
+
+    except Exception as e:
+        print(f"❌ 修复过程中发生错误: {e}")
+        return False
+
+def handle_build_command(args):
+    """处理增量构建命令"""
+    print("🏗️  开始增量构建...")
+
+    manifest = BuildManifest()
+    report = manifest.scan(args.pattern)
+    manifest.save()
+
+    print_build_report(report)
+
+    failed = []
+    items = report.pending_items
+    if args.generate and not items:
+        print("✅ 所有音频都是最新的")
+    elif args.generate:
+        print(f"\n🎤 生成 {len(items)} 个缺失或过期的音频...")
+        generator = TTSGenerator()
+        results = generator.generate_for_items(items, False, args.workers, args.batch_size)
+
+        failed = [r for r in results if not r.success]
+        if failed:
+            print(f"\n❌ 失败的文件:")
+            for result in failed:
+                print(f"   {result.filename}: {result.error_message}")
+
+    if args.loudness:
+        print(f"\n🔊 响度标准化...")
+        loudness_report = run_loudness(args.workers)
+        if loudness_report.failed:
+            return False
+
+    return not failed
+
+def handle_loudness_command(args):
+    """处理响度标准化命令"""
+    print("🔊 开始响度标准化...")
+
+    try:
+        report = run_loudness(args.workers, args.dry_run)
+        return not report.failed
+
+    except Exception as e:
+        print(f"❌ 响度标准化过程中发生错误: {e}")
+        return False
+
+def handle_pcm_command(args):
+    """处理PCM特征库命令"""
+    print("🗄️  开始构建PCM特征库...")
+
+    try:
+        stats = build_store(args.workers, args.mel)
+        return stats["failed"] == 0
+
+    except Exception as e:
+        print(f"❌ 构建过程中发生错误: {e}")
+        return False
+
+def handle_query_command(args):
+    """处理内容查询命令"""
+    try:
+        return run_query(args.kind, args.value, args.exact, args.limit)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+
+def handle_gc_command(args):
+    """处理孤立音频回收命令"""
+    try:
+        if args.restore is not None:
+            restore_audio(args.restore or None)
+            return True
+
+        report = run_gc(args.dry_run)
+        return not report.unparsed
+
+    except Exception as e:
+        print(f"❌ 音频回收过程中发生错误: {e}")
+        return False
+
+def handle_validate_command(args):
+    """处理模块校验命令"""
+    try:
+        if args.watch:
+            watch_validation(args.pattern, args.workers, show_warnings=not args.errors_only)
+            return True
+
+        report = run_validation(args.pattern, args.workers, args.changed, not args.errors_only)
+        return report.count("error") == 0
+
+    except KeyboardInterrupt:
+        return True
+
 def handle_config_command(args):
     """处理配置命令"""
     if args.action == "show":
@@ -195,17 +368,73 @@ def main():
 
     # 检查命令
     check_parser = subparsers.add_parser("check", help="音频质量检查")
-    check_parser.add_argument("pattern", help="文件匹配模式")
+    check_parser.add_argument("pattern", nargs="?", default="*.json", help="文件匹配模式 (默认: *.json)")
     check_parser.add_argument("--model", help="Whisper模型 (tiny, base, small, medium, large)")
     check_parser.add_argument("--device", help="设备 (cpu, cuda, auto)")
+    check_parser.add_argument("--workers", type=int, help="并行转录的工作进程数 (默认: 1)")
+    check_parser.add_argument("--batch-size", type=int, help="每次批量解码的片段数 (默认: 1)")
+    check_parser.add_argument("--cascade", help="级联模型，如 'tiny,base,small'（先用小模型，低于高质量阈值再升级）")
+    add_selector_arguments(check_parser)
+    check_parser.add_argument("--resume", action="store_true", help="续跑上次中断的检查（跳过结果流中已完成的项）")
+    check_parser.add_argument("--no-triage", action="store_true", help="跳过信号分诊，全部音频都用Whisper转录")
 
     # 生成命令
     generate_parser = subparsers.add_parser("generate", help="音频生成")
     generate_parser.add_argument("pattern", help="文件匹配模式")
     generate_parser.add_argument("--engine", help="首选TTS引擎 (coqui, say, gtts)")
     generate_parser.add_argument("--missing-only", action="store_true", help="只生成缺失的音频文件")
-    generate_parser.add_argument("--force", action="store_true", help="强制重新生成已存在的文件")
+    generate_parser.add_argument("--force", action="store_true", help="强制重新合成（忽略已存在的文件和缓存）")
     generate_parser.add_argument("--voice", help="say语音（仅macOS say）")
+    generate_parser.add_argument("--workers", type=int, default=1, help="并行工作进程数 (默认: 1)")
+    generate_parser.add_argument("--batch-size", type=int, default=1, help="短文本批量合成的每批项数 (默认: 1，仅Coqui)")
+    generate_parser.add_argument("--resume", action="store_true", help="按任务日志续跑上次中断的生成")
+
+    # 闭环修复命令
+    repair_parser = subparsers.add_parser("repair", help="闭环修复（生成→校验→重新生成）")
+    repair_parser.add_argument("pattern", nargs="?", default="*.json", help="文件匹配模式 (默认: *.json)")
+    add_repair_arguments(repair_parser)
+    add_selector_arguments(repair_parser)
+
+    # 增量构建命令
+    build_parser = subparsers.add_parser("build", help="增量构建（只处理变化的模块）")
+    build_parser.add_argument("pattern", nargs="?", default="*.json", help="文件匹配模式 (默认: *.json)")
+    build_parser.add_argument("--generate", action="store_true", help="生成缺失和过期的音频")
+    build_parser.add_argument("--workers", type=int, default=1, help="并行工作进程数 (默认: 1)")
+    build_parser.add_argument("--batch-size", type=int, default=1, help="短文本批量合成的每批项数 (默认: 1，仅Coqui)")
+    build_parser.add_argument("--loudness", action="store_true", help="构建后做全库响度标准化（只重新编码超出容差的音频）")
+
+    # PCM特征库命令
+    pcm_parser = subparsers.add_parser("pcm", help="构建解码后的PCM特征库")
+    pcm_parser.add_argument("--workers", type=int, default=1, help="并行解码的进程数 (默认: 1)")
+    pcm_parser.add_argument("--mel", type=int, nargs="?", const=80, default=0,
+                            help="同时保存Whisper对数梅尔频谱（默认80维，large-v3 为128）")
+
+    # 响度标准化命令
+    loudness_parser = subparsers.add_parser("loudness", help="全库响度标准化（EBU R128）")
+    loudness_parser.add_argument("--workers", type=int, default=1, help="并行测量的进程数 (默认: 1)")
+    loudness_parser.add_argument("--dry-run", action="store_true", help="只测量并报告，不修改音频")
+
+    # 内容查询命令
+    query_parser = subparsers.add_parser("query", help="查询词汇、句型、中文和音频引用")
+    query_parser.add_argument("kind", choices=["text", "audio", "zh", "glosses"],
+                              help="text: 英文单词/短语, audio: 音频文件, zh: 中文文本, glosses: 释义冲突")
+    query_parser.add_argument("value", nargs="?", help="查询内容")
+    query_parser.add_argument("--exact", action="store_true", help="text 查询只匹配完整文本")
+    query_parser.add_argument("--limit", type=int, default=50, help="最多显示的结果数 (默认: 50)")
+
+    # 孤立音频回收命令
+    gc_parser = subparsers.add_parser("gc", help="回收未被引用的音频文件")
+    gc_parser.add_argument("--dry-run", action="store_true", help="只统计并报告，不移动文件")
+    gc_parser.add_argument("--restore", nargs="?", const="", metavar="BATCH",
+                           help="恢复回收批次（默认最近一批）")
+
+    # 模块校验命令
+    validate_parser = subparsers.add_parser("validate", help="校验模块JSON结构")
+    validate_parser.add_argument("pattern", nargs="?", default="*.json", help="文件匹配模式 (默认: *.json)")
+    validate_parser.add_argument("--workers", type=int, default=1, help="并行校验的进程数 (默认: 1)")
+    validate_parser.add_argument("--changed", action="store_true", help="只重新校验上次校验后变化的文件")
+    validate_parser.add_argument("--watch", action="store_true", help="持续监视内容目录，保存后立即重新校验")
+    validate_parser.add_argument("--errors-only", action="store_true", help="不显示警告")
 
     # 配置命令
     config_parser = subparsers.add_parser("config", help="配置管理")
@@ -239,6 +468,17 @@ def main():
             config.asr.whisper_model = args.model
         if args.device:
             config.asr.device = args.device
+        if args.workers:
+            config.asr.workers = args.workers
+        if args.batch_size:
+            config.asr.batch_size = args.batch_size
+        if args.no_triage:
+            config.asr.triage = False
+        if args.cascade:
+            config.asr.cascade_models = args.cascade
+    elif args.command == "repair":
+        if args.model:
+            config.asr.whisper_model = args.model
     elif args.command == "generate":
         if args.engine:
             config.tts.preferred_engine = args.engine
@@ -257,6 +497,20 @@ def main():
             success = handle_check_command(args)
         elif args.command == "generate":
             success = handle_generate_command(args)
+        elif args.command == "repair":
+            success = handle_repair_command(args)
+        elif args.command == "build":
+            success = handle_build_command(args)
+        elif args.command == "loudness":
+            success = handle_loudness_command(args)
+        elif args.command == "pcm":
+            success = handle_pcm_command(args)
+        elif args.command == "query":
+            success = handle_query_command(args)
+        elif args.command == "gc":
+            success = handle_gc_command(args)
+        elif args.command == "validate":
+            success = handle_validate_command(args)
         elif args.command == "config":
             handle_config_command(args)
             success = True
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+模块JSON的音频引用提取
+一次遍历模块JSON，产出每一处音频引用及其JSON指针、源文本和类别：
+单词、短语、句型、任务步骤（含英翻中、排序题）、练习、配对题词语、填空答案，
+以及任何其他位置上的 audio 字段。所有生成和检查工具共用这一份提取结果
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set
+from dataclasses import dataclass
+
+from .common import text_to_filename, get_audio_filename_from_path, normalize_text
+
+# 数组字段名 -> 数组元素的类别
+CONTAINER_KINDS = {
+    "words": "word",
+    "phrases": "phrase",
+    "patterns": "pattern",
+    "steps": "step",
+    "practice": "practice",
+    "pairs": "pair",
+    "options": "pair",
+}
+
+@dataclass
+class AudioReference:
+    """一处音频引用"""
+    file: str  # 模块文件名
+    pointer: str  # 引用所在对象的JSON指针，如 /quests/2/steps/5
+    kind: str  # word, phrase, pattern, step, practice, pair, answer, other
+    text: str  # 音频应朗读的英文
+    filename: str  # 音频文件名
+    explicit: bool  # True: 来自 audio 字段；False: 由文本推导出的文件名
+    id: str = ""
+    zh: str = ""
+    step_type: str = ""
+    # audio 字段指向的文件不是 text 的朗读（如多个排序题共用的中文指令音频），
+    # text 不能用来合成该文件
+    conflict: bool = False
+
+    @property
+    def audio_path(self) -> str:
+        return f"/audio/tts/{self.filename}"
+
+    def location(self) -> str:
+        """可读的位置，如 grade1-lower-mod-01-professions.json#/words/0"""
+        return f"{self.file}#{self.pointer}"
+
+def web_audio_filename(text: str) -> str:
+    """
+    网页组件按词语推导的音频文件名（与 WordMatchingStep.getAudioPath 一致）
+
+    小写、空白换为连字符、去掉字母数字和连字符以外的字符、合并连字符。
+    """
+    word_id = re.sub(r'\s+', '-', text.lower())
+    word_id = re.sub(r'[^a-z0-9-]', '', word_id)
+    word_id = re.sub(r'-+', '-', word_id).strip('-')
+    return f"{word_id}.mp3" if word_id else ""
+
+def pattern_card_filename(text: str) -> str:
+    """
+    句型卡片按英文推导的音频文件名（与 PatternCard 一致）
+
+    小写、去掉字母数字和空白以外的字符（连字符也会被去掉）、空白换为连字符。
+    """
+    name = re.sub(r'\s+', '-', re.sub(r'[^a-z0-9\s]', '', text.lower())).strip()
+    return f"{name}.mp3" if name else ""
+
+def step_source_text(step: Dict) -> str:
+    """任务步骤/练习的音频应朗读的英文"""
+    step_type = step.get('type')
+    if step_type == 'fillblank':
+        answer = step.get('answer')
+        if isinstance(answer, list) and answer:
+            return str(answer[0])
+        if isinstance(answer, str) and answer:
+            return answer
+    elif step_type == 'entozh' and isinstance(step.get('english'), str):
+        return step['english']
+    elif step_type == 'sentencesorting' and isinstance(step.get('correct'), list):
+        return " ".join(str(word) for word in step['correct'])
+    elif step_type == 'zhtoen' and isinstance(step.get('correctEnglish'), list):
+        return " ".join(str(word) for word in step['correctEnglish'])
+
+    text = step.get('text')
+    return text if isinstance(text, str) else ""
+
+def _escape(key: str) -> str:
+    """JSON指针中的键转义（RFC 6901）"""
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+def resolve_pointer(data: Any, pointer: str) -> Any:
+    """按JSON指针取值（指针无效时抛出 KeyError/IndexError）"""
+    node = data
+    for part in pointer.split('/')[1:]:
+        part = part.replace('~1', '/').replace('~0', '~')
+        node = node[int(part)] if isinstance(node, list) else node[part]
+    return node
+
+def _audio_field(node: Dict) -> str:
+    value = node.get('audio')
+    return value.strip() if isinstance(value, str) else ""
+
+class AudioReferenceVisitor:
+    """
+    音频引用访问器
+
+    深度优先遍历一次模块JSON，数组元素按所在数组的字段名（CONTAINER_KINDS）
+    分派到 visit_<类别>；未被这些方法处理的 audio 字段记为 other。
+    子类可以覆盖 visit_* 方法扩展新的位置。
+    """
+
+    def __init__(self, filename: str = ""):
+        self.filename = filename
+        self.references: List[AudioReference] = []
+
+    def add(self, pointer: str, kind: str, text: str, filename: str, explicit: bool, **extra):
+        if filename:
+            self.references.append(AudioReference(
+                file=self.filename, pointer=pointer, kind=kind, text=text,
+                filename=filename, explicit=explicit, **extra
+            ))
+
+    def walk(self, node: Any, pointer: str = "", kind: Optional[str] = None):
+        if isinstance(node, dict):
+            handled = self.visit(kind, node, pointer) if kind else False
+            audio = _audio_field(node)
+            if audio and not handled:
+                self.add(pointer, "other", step_source_text(node), get_audio_filename_from_path(audio), True)
+
+            for key, value in node.items():
+                if isinstance(value, list):
+                    self.walk(value, f"{pointer}/{_escape(key)}", CONTAINER_KINDS.get(key))
+                elif isinstance(value, dict):
+                    self.walk(value, f"{pointer}/{_escape(key)}")
+        elif isinstance(node, list):
+            for i, value in enumerate(node):
+                self.walk(value, f"{pointer}/{i}", kind)
+
+    def visit(self, kind: str, node: Dict, pointer: str) -> bool:
+        """
+        分派到 visit_<类别>
+
+        Returns:
+            节点的 audio 字段是否已被处理
+        """
+        method = getattr(self, f"visit_{kind}", None)
+        return bool(method and method(node, pointer))
+
+    def _visit_entry(self, kind: str, node: Dict, pointer: str) -> bool:
+        """单词/短语：有 audio 字段时取其文件名，否则由英文推导"""
+        en = node.get('en')
+        if not isinstance(en, str) or not en.strip():
+            return False
+
+        audio = _audio_field(node)
+        self.add(pointer, kind, en.strip(),
+                 get_audio_filename_from_path(audio) if audio else text_to_filename(en),
+                 bool(audio), id=node.get('id', ''), zh=node.get('zh', '') or '')
+        return True
+
+    def visit_word(self, node: Dict, pointer: str) -> bool:
+        return self._visit_entry("word", node, pointer)
+
+    def visit_phrase(self, node: Dict, pointer: str) -> bool:
+        return self._visit_entry("phrase", node, pointer)
+
+    def visit_pattern(self, node: Dict, pointer: str) -> bool:
+        """句型通常没有 audio 字段，文件名由英文推导"""
+        q = node.get('q')
+        if not isinstance(q, str) or not q.strip():
+            return False
+
+        audio = _audio_field(node)
+        index = pointer.rsplit('/', 1)[-1]
+        self.add(pointer, "pattern", q.strip(),
+                 get_audio_filename_from_path(audio) if audio else text_to_filename(q),
+                 bool(audio), id=f"pattern-{index}", zh=node.get('a', '') or '')
+        return True
+
+    def visit_step(self, node: Dict, pointer: str, kind: str = "step") -> bool:
+        """任务步骤：audio 字段，以及填空题的答案"""
+        step_type = node.get('type', '')
+        answer = node.get('answer')
+        answers = answer if isinstance(answer, list) else [answer] if isinstance(answer, str) else []
+        for i, value in enumerate(answers):
+            if isinstance(value, str) and value.strip():
+                answer_pointer = f"{pointer}/answer/{i}" if isinstance(answer, list) else f"{pointer}/answer"
+                self.add(answer_pointer, "answer", value.strip(), web_audio_filename(value), False,
+                         step_type=step_type)
+
+        audio = _audio_field(node)
+        if not audio:
+            return False
+
+        zh = node.get('chinese') or "".join(node.get('correctChinese') or [])
+        text = step_source_text(node)
+        filename = get_audio_filename_from_path(audio)
+        self.add(pointer, kind, text, filename, True,
+                 zh=zh if isinstance(zh, str) else "", step_type=step_type,
+                 conflict=filename != text_to_filename(text))
+        return True
+
+    def visit_practice(self, node: Dict, pointer: str) -> bool:
+        return self.visit_step(node, pointer, kind="practice")
+
+    def visit_pair(self, node: Dict, pointer: str) -> bool:
+        """配对题词语：网页组件按词语推导文件名播放"""
+        en = node.get('en')
+        if not isinstance(en, str) or not en.strip():
+            return False
+
+        audio = _audio_field(node)
+        self.add(pointer, "pair", en.strip(),
+                 get_audio_filename_from_path(audio) if audio else web_audio_filename(en),
+                 bool(audio), zh=node.get('zh', '') or '')
+        return True
+
+def extract_audio_references(content: Dict, filename: Optional[str] = None) -> List[AudioReference]:
+    """
+    提取模块中的全部音频引用（按文档顺序）
+
+    Args:
+        content: 模块JSON内容
+        filename: 模块文件名（默认取 content['_filename']）
+    """
+    visitor = AudioReferenceVisitor(filename if filename is not None else content.get('_filename', ''))
+    visitor.walk({key: value for key, value in content.items() if key != '_filename'})
+    return visitor.references
+
+def conflicting_filenames(references: Iterable[AudioReference]) -> Set[str]:
+    """
+    不能按引用文本合成的音频文件名
+
+    包括标记为 conflict 的引用，以及被多处引用但各处文本不同的文件。
+    """
+    texts: Dict[str, Set[str]] = {}
+    conflicts = set()
+    for ref in references:
+        if ref.conflict:
+            conflicts.add(ref.filename)
+        texts.setdefault(ref.filename, set()).add(normalize_text(ref.text))
+    return conflicts | {filename for filename, variants in texts.items() if len(variants) > 1}
+
+def module_audio_files(content: Dict, kinds: Optional[set] = None) -> set:
+    """模块引用的音频文件名集合（可按类别过滤）"""
+    return {
+        ref.filename for ref in extract_audio_references(content)
+        if kinds is None or ref.kind in kinds
+    }
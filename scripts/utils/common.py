@@ -6,7 +6,6 @@
 
 import os
 import re
-import json
 import time
 import hashlib
 from pathlib import Path
@@ -15,6 +14,9 @@ from dataclasses import dataclass
 from datetime import datetime
 
 from .config import config
+from .mp3_info import scan_mp3
+from .scoring import score_transcript
+from .content_index import get_content_index
 
 def text_to_filename(text: str, max_length: int = 100) -> str:
     """
@@ -55,114 +57,131 @@ def text_to_filename(text: str, max_length: int = 100) -> str:
 
 def calculate_similarity(text1: str, text2: str) -> float:
     """
-    计算两个文本的相似度
+    计算两个文本的相似度（基于WER/CER，见 scoring.score_transcripts；
+    需要对多对文本评分时直接调用 score_transcripts 批量计算）
 
     Args:
-        text1: 第一个文本
-        text2: 第二个文本
+        text1: 原文
+        text2: 转录文本
 
     Returns:
         相似度分数 (0-1)
     """
-    import difflib
-
-    # 标准化文本
-    normalize = lambda s: re.sub(r'[^\w\s]', '', s.lower().strip())
-    norm1 = normalize(text1)
-    norm2 = normalize(text2)
-
-    # 计算相似度
-    similarity = difflib.SequenceMatcher(None, norm1, norm2).ratio()
-    return similarity
+    return score_transcript(text1, text2).similarity
 
 def extract_text_from_json(content: Dict) -> List[Dict]:
     """
-    从JSON内容中提取需要音频的文本
+    从JSON内容中提取需要生成音频的文本（短语、句型、单词）
 
     Args:
         content: JSON内容
 
     Returns:
-        文本项列表
+        文本项列表（按短语、句型、单词排列）
     """
-    items = []
+    # audio_refs 依赖本模块的 text_to_filename，在此延迟导入
+    from .audio_refs import extract_audio_references
+
+    references = extract_audio_references(content)
     module_id = content.get('moduleId', '')
     module_title = content.get('title', '')
 
-    # 提取短语
-    for phrase in content.get('phrases', []):
-        if 'en' in phrase and phrase['en'].strip():
+    items = []
+    for kind in ('phrase', 'pattern', 'word'):
+        for ref in references:
+            if ref.kind != kind:
+                continue
             items.append({
                 'module_id': module_id,
                 'module_title': module_title,
-                'type': 'phrase',
-                'id': phrase.get('id', ''),
-                'text': phrase['en'].strip(),
-                'zh': phrase.get('zh', ''),
-                'audio_path': phrase.get('audio', ''),
+                'type': kind,
+                'id': ref.id,
+                'text': ref.text,
+                'zh': ref.zh,
+                'audio_path': ref.audio_path if ref.explicit or kind == 'pattern' else '',
+                'pointer': ref.pointer,
                 'file': content.get('_filename', '')
             })
 
-    # 提取句子
-    for i, pattern in enumerate(content.get('patterns', [])):
-        if 'q' in pattern and pattern['q'].strip():
-            expected_filename = text_to_filename(pattern['q'])
-            audio_path = f"/audio/tts/{expected_filename}"
+    return items
 
-            items.append({
-                'module_id': module_id,
-                'module_title': module_title,
-                'type': 'pattern',
-                'id': f"pattern-{i}",
-                'text': pattern['q'].strip(),
-                'zh': pattern.get('a', ''),
-                'audio_path': audio_path,
-                'file': content.get('_filename', '')
-            })
+def normalize_text(text: str) -> str:
+    """标准化文本用于比较（小写、去标点、合并空白）"""
+    return " ".join(re.sub(r'[^\w\s]', '', text.lower()).split())
 
-    # 提取单词
-    for word in content.get('words', []):
-        if 'en' in word and word['en'].strip():
-            items.append({
-                'module_id': module_id,
-                'module_title': module_title,
-                'type': 'word',
-                'id': word.get('id', ''),
-                'text': word['en'].strip(),
-                'zh': word.get('zh', ''),
-                'audio_path': word.get('audio', ''),
-                'file': content.get('_filename', '')
+def item_key(item: Dict) -> str:
+    """文本项的唯一标识：模块文件:类型:ID"""
+    return f"{item.get('file', '')}:{item['type']}:{item['id']}"
+
+def build_audio_work_list(items: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    构建去重后的全局音频工作列表
+
+    同一目标文件名只保留一项；文件名不同但合成文本完全相同的项
+    合并为一个工作项，其余文件名记录在 aliases 中，保证每段文本只合成一次。
+
+    Args:
+        items: extract_text_from_json 返回的文本项（可来自多个模块）
+
+    Returns:
+        (工作列表, 冲突列表)
+        工作项在原文本项基础上增加 filename、aliases、occurrences 字段；
+        冲突项为 {'filename', 'texts', 'occurrences'}，表示同一文件名对应了不同文本
+        （例如 text_to_filename 截断导致），冲突中后出现的文本不会被调度。
+    """
+    by_filename: Dict[str, Dict] = {}
+    conflicts: Dict[str, Dict] = {}
+
+    for item in items:
+        filename = get_item_audio_filename(item)
+        occurrence = item_key(item)
+        entry = by_filename.get(filename)
+
+        if entry is None:
+            by_filename[filename] = dict(
+                item,
+                filename=filename,
+                aliases=[],
+                occurrences=[occurrence]
+            )
+        elif normalize_text(entry['text']) != normalize_text(item['text']):
+            conflict = conflicts.setdefault(filename, {
+                'filename': filename,
+                'texts': [entry['text']],
+                'occurrences': list(entry['occurrences'])
             })
+            if item['text'] not in conflict['texts']:
+                conflict['texts'].append(item['text'])
+            conflict['occurrences'].append(occurrence)
+        else:
+            entry['occurrences'].append(occurrence)
+
+    # 合成文本相同的不同文件名只调度一次
+    work_list = []
+    by_utterance: Dict[str, Dict] = {}
+    for entry in by_filename.values():
+        utterance = " ".join(entry['text'].split())
+        primary = by_utterance.get(utterance)
+        if primary is None:
+            by_utterance[utterance] = entry
+            work_list.append(entry)
+        else:
+            primary['aliases'].append(entry['filename'])
+            primary['occurrences'].extend(entry['occurrences'])
 
-    return items
+    return work_list, list(conflicts.values())
 
 def load_json_files(pattern: str) -> List[Dict]:
     """
-    加载匹配模式的JSON文件
+    加载匹配模式的JSON文件（来自持久化内容索引，只有变化的文件会重新解析）
 
     Args:
         pattern: 文件匹配模式
 
     Returns:
-        JSON内容列表
+        JSON内容列表（按文件名排序）
     """
-    content_dir = config.get_content_dir()
-    json_files = list(content_dir.glob(pattern))
-
-    # 排除备份文件
-    json_files = [f for f in json_files if not f.name.endswith('.backup')]
-
-    contents = []
-    for json_file in json_files:
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                content = json.load(f)
-                content['_filename'] = json_file.name
-                contents.append(content)
-        except Exception as e:
-            print(f"❌ 读取文件失败 {json_file.name}: {e}")
-
-    return contents
+    return get_content_index().contents(pattern)
 
 def get_audio_filename_from_path(audio_path: str) -> str:
     """
@@ -181,6 +200,20 @@ def get_audio_filename_from_path(audio_path: str) -> str:
     else:
         return Path(audio_path).name
 
+def get_item_audio_filename(item: Dict) -> str:
+    """
+    获取文本项对应的音频文件名
+
+    Args:
+        item: extract_text_from_json 返回的文本项
+
+    Returns:
+        音频文件名（有 audio 字段时取其文件名，否则由文本生成）
+    """
+    if item.get('audio_path'):
+        return item['audio_path'].replace('/audio/tts/', '')
+    return text_to_filename(item['text'])
+
 def format_duration(seconds: float) -> str:
     """
     格式化时长
@@ -286,7 +319,22 @@ def get_audio_file_info(filepath: Path) -> AudioInfo:
             error_message="空文件"
         )
 
-    # 尝试用pydub分析
+    # MP3只解析帧头，不解码音频
+    if filepath.suffix.lower() == '.mp3':
+        mp3_info = scan_mp3(filepath)
+        return AudioInfo(
+            filename=filename,
+            filepath=filepath,
+            size=size,
+            duration=mp3_info.duration,
+            sample_rate=mp3_info.sample_rate,
+            channels=mp3_info.channels,
+            format='MP3',
+            is_valid=mp3_info.is_valid,
+            error_message=mp3_info.error_message
+        )
+
+    # 其他格式尝试用pydub分析
     try:
         from pydub import AudioSegment
         audio = AudioSegment.from_file(str(filepath))
@@ -327,13 +375,19 @@ def ensure_directory(directory: Path):
     """确保目录存在"""
     directory.mkdir(parents=True, exist_ok=True)
 
-def load_whisper_model():
-    """加载Whisper模型"""
+def load_whisper_model(model_name: Optional[str] = None):
+    """
+    加载Whisper模型
+
+    Args:
+        model_name: 模型名称（默认取 config.asr.whisper_model）
+    """
+    model_name = model_name or config.asr.whisper_model
     try:
         import whisper
         import torch
 
-        print(f"🤖 加载 Whisper 模型: {config.asr.whisper_model}")
+        print(f"🤖 加载 Whisper 模型: {model_name}")
 
         # 确定设备
         if config.asr.device == "auto":
@@ -341,7 +395,7 @@ def load_whisper_model():
         else:
             device = config.asr.device
 
-        model = whisper.load_model(config.asr.whisper_model, device=device)
+        model = whisper.load_model(model_name, device=device)
         print(f"✅ Whisper 模型已加载 (设备: {device})")
 
         return model
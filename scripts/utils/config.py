@@ -6,7 +6,7 @@
 
 import os
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 import json
 
@@ -19,6 +19,13 @@ class TTSConfig:
     gtts_lang: str = "en"
     output_dir: str = "public/audio/tts"
     sample_rate: int = 22050
+    # 后处理参数
+    normalize_audio: bool = True  # 按EBU R128响度标准化
+    fade_ms: int = 100
+    loudness_target: float = -18.0  # 目标积分响度 (LUFS)
+    loudness_tolerance: float = 1.0  # 允许的偏差 (LU)，偏差更小的音频不重新编码
+    true_peak_limit: float = -2.0  # 真峰值上限 (dBTP)
+    mp3_bitrate: str = "128k"
 
 @dataclass
 class ASRConfig:
@@ -27,6 +34,15 @@ class ASRConfig:
     device: str = "auto"  # auto, cpu, cuda
     similarity_threshold_high: float = 0.9
     similarity_threshold_medium: float = 0.7
+    workers: int = 1  # 并行转录的工作进程数
+    batch_size: int = 1  # 每次批量解码的片段数
+    triage: bool = True  # 转录前先做信号级分诊，明显合格/损坏的音频不再转录
+    cascade_models: str = ""  # 级联模型，如 "tiny,base,small"；为空时只用 whisper_model
+
+    def model_ladder(self) -> List[str]:
+        """转录使用的模型序列（从小到大）"""
+        models = [name.strip() for name in self.cascade_models.split(",") if name.strip()]
+        return models or [self.whisper_model]
 
 @dataclass
 class PathConfig:
@@ -35,6 +51,7 @@ class PathConfig:
     content_dir: str = "src/content"
     audio_dir: str = "public/audio/tts"
     reports_dir: str = "reports"
+    cache_dir: str = ".cache"
 
     def __post_init__(self):
         if self.project_root is None:
@@ -100,13 +117,23 @@ class Config:
                 'say_voice': self.tts.say_voice,
                 'gtts_lang': self.tts.gtts_lang,
                 'output_dir': self.tts.output_dir,
-                'sample_rate': self.tts.sample_rate
+                'sample_rate': self.tts.sample_rate,
+                'normalize_audio': self.tts.normalize_audio,
+                'fade_ms': self.tts.fade_ms,
+                'loudness_target': self.tts.loudness_target,
+                'loudness_tolerance': self.tts.loudness_tolerance,
+                'true_peak_limit': self.tts.true_peak_limit,
+                'mp3_bitrate': self.tts.mp3_bitrate
             },
             'asr': {
                 'whisper_model': self.asr.whisper_model,
                 'device': self.asr.device,
                 'similarity_threshold_high': self.asr.similarity_threshold_high,
-                'similarity_threshold_medium': self.asr.similarity_threshold_medium
+                'similarity_threshold_medium': self.asr.similarity_threshold_medium,
+                'workers': self.asr.workers,
+                'batch_size': self.asr.batch_size,
+                'triage': self.asr.triage,
+                'cascade_models': self.asr.cascade_models
             }
         }
 
@@ -129,6 +156,10 @@ class Config:
         """获取报告目录"""
         return self.paths.project_root / self.paths.reports_dir
 
+    def get_cache_dir(self) -> Path:
+        """获取缓存目录"""
+        return self.paths.project_root / self.paths.cache_dir
+
     def print_config(self):
         """打印当前配置"""
         print("📋 当前配置:")
@@ -139,10 +170,18 @@ class Config:
         print(f"   say语音: {self.tts.say_voice}")
         print(f"   gTTS语言: {self.tts.gtts_lang}")
         print(f"   输出目录: {self.tts.output_dir}")
+        print(f"   后处理: 标准化={self.tts.normalize_audio}, 淡入淡出={self.tts.fade_ms}ms, "
+              f"目标响度={self.tts.loudness_target}LUFS±{self.tts.loudness_tolerance}, "
+              f"真峰值上限={self.tts.true_peak_limit}dBTP, 码率={self.tts.mp3_bitrate}")
         print()
         print("🎵 ASR配置:")
         print(f"   Whisper模型: {self.asr.whisper_model}")
+        if self.asr.cascade_models:
+            print(f"   级联模型: {' → '.join(self.asr.model_ladder())}")
         print(f"   设备: {self.asr.device}")
+        print(f"   工作进程: {self.asr.workers}")
+        print(f"   批量解码: {self.asr.batch_size}")
+        print(f"   信号分诊: {self.asr.triage}")
         print(f"   高质量阈值: {self.asr.similarity_threshold_high}")
         print(f"   中等质量阈值: {self.asr.similarity_threshold_medium}")
         print("=" * 50)
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+持久化的模块内容索引
+把 src/content 下全部模块JSON解析一次，连同从中提取的单词/短语/句型/任务/步骤记录
+保存为 .cache/content_index.pickle 快照。之后每次启动只 stat 各文件，
+mtime 变化且内容哈希变化的文件才重新解析
+"""
+
+import os
+import json
+import pickle
+import fnmatch
+import hashlib
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from dataclasses import dataclass, field
+
+from .config import config
+
+# 快照格式版本，记录结构变化时递增
+CONTENT_INDEX_VERSION = 1
+
+@dataclass
+class WordRecord:
+    """单词"""
+    file: str
+    module_id: str
+    pointer: str  # JSON指针，如 /words/3
+    id: str
+    en: str
+    zh: str
+    audio: str
+
+@dataclass
+class PhraseRecord:
+    """短语"""
+    file: str
+    module_id: str
+    pointer: str
+    id: str
+    en: str
+    zh: str
+    audio: str
+    icon: str
+
+@dataclass
+class PatternRecord:
+    """句型（q 为英文，a 为中文）"""
+    file: str
+    module_id: str
+    pointer: str
+    index: int
+    q: str
+    a: str
+
+@dataclass
+class QuestRecord:
+    """任务"""
+    file: str
+    module_id: str
+    pointer: str
+    id: str
+    title: str
+    reward: Dict
+    step_count: int
+
+@dataclass
+class StepRecord:
+    """
+    任务步骤
+
+    english/chinese 为步骤涉及的完整英文/中文句子（排序题取正确顺序拼接），
+    其余字段随步骤类型不同，保留在 data 中。
+    """
+    file: str
+    module_id: str
+    pointer: str  # 如 /quests/2/steps/5
+    quest_id: str
+    index: int
+    type: str
+    text: str
+    audio: str
+    english: str
+    chinese: str
+    data: Dict
+
+@dataclass
+class ModuleRecord:
+    """单个模块文件的解析结果"""
+    file: str
+    mtime: float
+    size: int
+    sha256: str
+    content: Dict
+    words: List[WordRecord] = field(default_factory=list)
+    phrases: List[PhraseRecord] = field(default_factory=list)
+    patterns: List[PatternRecord] = field(default_factory=list)
+    quests: List[QuestRecord] = field(default_factory=list)
+    steps: List[StepRecord] = field(default_factory=list)
+
+    @property
+    def module_id(self) -> str:
+        return self.content.get('moduleId', '')
+
+    @property
+    def title(self) -> str:
+        return self.content.get('title', '')
+
+def _text(value) -> str:
+    """字段值转换为文本（词数组按空格拼接）"""
+    if isinstance(value, list):
+        return " ".join(str(part) for part in value)
+    return value if isinstance(value, str) else ""
+
+def _step_sentences(step: Dict) -> tuple:
+    """步骤的 (英文, 中文) 完整句子"""
+    step_type = step.get('type')
+    if step_type == 'entozh':
+        return _text(step.get('english')), "".join(step.get('correctChinese') or [])
+    if step_type == 'zhtoen':
+        return _text(step.get('correctEnglish')), _text(step.get('chinese'))
+    if step_type == 'sentencesorting':
+        return _text(step.get('correct')), ""
+    return "", ""
+
+def parse_module(filename: str, content: Dict, mtime: float = 0.0, size: int = 0,
+                 sha256: str = "") -> ModuleRecord:
+    """从模块JSON内容构建模块记录"""
+    module_id = content.get('moduleId', '')
+    record = ModuleRecord(file=filename, mtime=mtime, size=size, sha256=sha256, content=content)
+
+    for i, word in enumerate(content.get('words') or []):
+        record.words.append(WordRecord(
+            file=filename, module_id=module_id, pointer=f"/words/{i}",
+            id=word.get('id', ''), en=_text(word.get('en')).strip(), zh=_text(word.get('zh')),
+            audio=_text(word.get('audio'))
+        ))
+
+    for i, phrase in enumerate(content.get('phrases') or []):
+        record.phrases.append(PhraseRecord(
+            file=filename, module_id=module_id, pointer=f"/phrases/{i}",
+            id=phrase.get('id', ''), en=_text(phrase.get('en')).strip(), zh=_text(phrase.get('zh')),
+            audio=_text(phrase.get('audio')), icon=_text(phrase.get('icon'))
+        ))
+
+    for i, pattern in enumerate(content.get('patterns') or []):
+        record.patterns.append(PatternRecord(
+            file=filename, module_id=module_id, pointer=f"/patterns/{i}",
+            index=i, q=_text(pattern.get('q')).strip(), a=_text(pattern.get('a'))
+        ))
+
+    for i, quest in enumerate(content.get('quests') or []):
+        steps = quest.get('steps') or []
+        quest_id = quest.get('id', '')
+        record.quests.append(QuestRecord(
+            file=filename, module_id=module_id, pointer=f"/quests/{i}",
+            id=quest_id, title=quest.get('title', ''), reward=quest.get('reward') or {},
+            step_count=len(steps)
+        ))
+
+        for j, step in enumerate(steps):
+            english, chinese = _step_sentences(step)
+            record.steps.append(StepRecord(
+                file=filename, module_id=module_id, pointer=f"/quests/{i}/steps/{j}",
+                quest_id=quest_id, index=j, type=step.get('type', ''), text=_text(step.get('text')),
+                audio=_text(step.get('audio')), english=english, chinese=chinese, data=step
+            ))
+
+    return record
+
+def file_sha256(filepath: Path) -> str:
+    """计算文件内容哈希"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ContentIndex:
+    """
+    模块内容索引
+
+    快照结构: {"version": 1, "modules": {文件名: ModuleRecord}}
+    只索引内容目录下的 *.json（备份文件不以 .json 结尾，自然被排除）。
+    """
+
+    def __init__(self, snapshot_file: Optional[Path] = None, content_dir: Optional[Path] = None):
+        self.snapshot_file = snapshot_file or config.get_cache_dir() / "content_index.pickle"
+        self.content_dir = content_dir or config.get_content_dir()
+        self.modules: Dict[str, ModuleRecord] = self._load()
+        self._dirty = False
+
+    def _load(self) -> Dict[str, ModuleRecord]:
+        """加载快照（版本不一致或损坏时视为空索引）"""
+        if not self.snapshot_file.exists():
+            return {}
+
+        try:
+            with open(self.snapshot_file, 'rb') as f:
+                data = pickle.load(f)
+            if data.get("version") != CONTENT_INDEX_VERSION:
+                return {}
+            return data.get("modules", {})
+        except Exception as e:
+            print(f"⚠️ 读取内容索引失败，将重新构建: {e}")
+            return {}
+
+    def refresh(self) -> Dict[str, int]:
+        """
+        与内容目录同步
+
+        Returns:
+            统计 {"modules": 模块数, "reloaded": 重新解析数, "removed": 移除数}
+        """
+        stats = {"modules": 0, "reloaded": 0, "removed": 0}
+        present = set()
+
+        for json_file in sorted(self.content_dir.glob("*.json")):
+            present.add(json_file.name)
+            stats["modules"] += 1
+            try:
+                if self._refresh_file(json_file):
+                    stats["reloaded"] += 1
+            except Exception as e:
+                print(f"❌ 读取文件失败 {json_file.name}: {e}")
+
+        for name in list(self.modules):
+            if name not in present:
+                del self.modules[name]
+                stats["removed"] += 1
+                self._dirty = True
+
+        return stats
+
+    def _refresh_file(self, json_file: Path) -> bool:
+        """
+        同步单个模块文件（解析失败时移除旧记录并抛出异常）
+
+        Returns:
+            是否重新解析了文件
+        """
+        stat = json_file.stat()
+        record = self.modules.get(json_file.name)
+
+        # mtime 和大小未变时直接复用记录
+        if record and record.mtime == stat.st_mtime and record.size == stat.st_size:
+            return False
+
+        sha256 = file_sha256(json_file)
+        if record and record.sha256 == sha256:
+            record.mtime, record.size = stat.st_mtime, stat.st_size
+            self._dirty = True
+            return False
+
+        self.modules.pop(json_file.name, None)
+        self._dirty = True
+        with open(json_file, 'r', encoding='utf-8') as f:
+            content = json.load(f)
+        if not isinstance(content, dict):
+            raise ValueError("模块文件不是JSON对象")
+
+        self.modules[json_file.name] = parse_module(
+            json_file.name, content, stat.st_mtime, stat.st_size, sha256
+        )
+        return True
+
+    def module(self, filename: str) -> ModuleRecord:
+        """
+        获取单个模块（只同步这一个文件）
+
+        Raises:
+            FileNotFoundError: 文件不存在
+            ValueError: 文件不是有效的模块JSON
+        """
+        json_file = self.content_dir / filename
+        if not json_file.exists():
+            self.modules.pop(filename, None)
+            raise FileNotFoundError(f"模块文件不存在: {json_file}")
+
+        self._refresh_file(json_file)
+        return self.modules[filename]
+
+    def save(self):
+        """原子保存快照"""
+        if not self._dirty:
+            return
+
+        self.snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.snapshot_file.with_suffix(".tmp")
+        with open(temp_file, 'wb') as f:
+            pickle.dump({"version": CONTENT_INDEX_VERSION, "modules": self.modules}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, self.snapshot_file)
+        self._dirty = False
+
+    def select(self, pattern: str = "*.json") -> List[ModuleRecord]:
+        """文件名匹配模式的模块（按文件名排序）"""
+        return [self.modules[name] for name in sorted(self.modules) if fnmatch.fnmatch(name, pattern)]
+
+    def contents(self, pattern: str = "*.json") -> List[Dict]:
+        """
+        匹配模式的模块JSON内容（带 _filename 字段，与 load_json_files 的返回值一致）
+
+        返回浅拷贝；调用方不应修改嵌套结构，需要修改时请重新读取文件。
+        """
+        return [dict(module.content, _filename=module.file) for module in self.select(pattern)]
+
+    def words(self, pattern: str = "*.json") -> Iterator[WordRecord]:
+        for module in self.select(pattern):
+            yield from module.words
+
+    def phrases(self, pattern: str = "*.json") -> Iterator[PhraseRecord]:
+        for module in self.select(pattern):
+            yield from module.phrases
+
+    def patterns(self, pattern: str = "*.json") -> Iterator[PatternRecord]:
+        for module in self.select(pattern):
+            yield from module.patterns
+
+    def quests(self, pattern: str = "*.json") -> Iterator[QuestRecord]:
+        for module in self.select(pattern):
+            yield from module.quests
+
+    def steps(self, pattern: str = "*.json", step_type: Optional[str] = None) -> Iterator[StepRecord]:
+        for module in self.select(pattern):
+            for step in module.steps:
+                if step_type is None or step.type == step_type:
+                    yield step
+
+# 进程内共享的索引
+_shared_index: Optional[ContentIndex] = None
+
+def get_content_index() -> ContentIndex:
+    """
+    获取进程内共享的内容索引
+
+    每次调用都与内容目录同步（未变化的文件只需一次 stat），
+    同一进程中先修改再读取模块文件也能得到最新内容。
+    """
+    global _shared_index
+
+    if _shared_index is None or _shared_index.content_dir != config.get_content_dir():
+        _shared_index = ContentIndex()
+    _shared_index.refresh()
+    try:
+        _shared_index.save()
+    except OSError as e:
+        print(f"⚠️ 保存内容索引失败: {e}")
+    return _shared_index
+
+def read_module(json_file: Path) -> Dict:
+    """
+    读取单个模块JSON
+
+    文件位于内容目录中时取自共享内容索引（首次调用时同步整个目录，之后只 stat 该文件），
+    其他路径直接读取文件。返回的内容与索引共享，调用方不应修改。
+    """
+    json_file = Path(json_file)
+    if json_file.suffix == ".json" and json_file.parent.resolve() == config.get_content_dir().resolve():
+        index = _shared_index if _shared_index is not None else get_content_index()
+        return index.module(json_file.name).content
+
+    with open(json_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+"""
+模块JSON的结构校验
+模块结构（含 wordmatching、sentencesorting、fillblank、multiplechoice、zhtoen、entozh
+全部步骤类型）以声明式 schema 描述，每个进程只编译一次为嵌套的检查函数。
+全部模块并行校验，问题以JSON指针定位；增量模式按 .cache/validation.json
+中记录的 mtime/大小只重新校验变化的文件
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ProcessPoolExecutor
+
+from .config import config
+
+# schema 版本，规则变化时递增（旧的校验结果作废）
+SCHEMA_VERSION = 1
+
+# ---------------------------------------------------------------------------
+# schema
+#
+# 支持的关键字:
+#   type          值类型（或类型元组）: object, array, string, integer
+#   required      必要字段（缺少为错误）
+#   recommended   建议字段（缺少为警告）
+#   properties    字段 -> 子 schema
+#   items         数组元素的 schema
+#   pattern       字符串须完整匹配的正则
+#   format        audio_path: 须为 /audio/tts/*.mp3（不符合为警告）
+#   minLength     字符串最短长度（去除首尾空白后）
+#   minItems      数组最少元素数
+#   countRange    (最少, 最多) 建议的元素数（超出为警告，None 表示不限）
+#   uniqueBy      数组元素中该字段的值不能重复
+#   sameItems     (字段a, 字段b) 两个数组须包含相同的词语（顺序不限）
+#   containsIds   数组元素的 id 中须分别包含这些子串（如必要的练习类型）
+#   discriminator {"property": 字段, "mapping": {值: schema}}，按字段值选择 schema，未知值为警告
+# ---------------------------------------------------------------------------
+
+TEXT = {"type": "string", "minLength": 1}
+TEXT_LIST = {"type": "array", "minItems": 1, "items": TEXT}
+AUDIO = {"type": "string", "format": "audio_path"}
+
+ENTRY = {
+    "type": "object",
+    "required": ["id", "en", "zh", "audio"],
+    "properties": {"id": TEXT, "en": TEXT, "zh": TEXT, "audio": AUDIO, "icon": {"type": "string"}},
+}
+
+PAIR = {
+    "type": "object",
+    "required": ["en", "zh"],
+    "properties": {"en": TEXT, "zh": TEXT},
+}
+
+ANSWER = {"type": ("string", "array"), "minLength": 1, "minItems": 1, "items": TEXT}
+
+STEP_COMMON = {"type": {"type": "string"}, "text": {"type": "string"}, "audio": AUDIO}
+
+STEP_SCHEMAS = {
+    "wordmatching": {
+        "required": ["pairs", "options"],
+        "properties": {
+            "pairs": {"type": "array", "minItems": 1, "items": PAIR},
+            "options": {"type": "array", "minItems": 1, "items": PAIR},
+        },
+    },
+    "sentencesorting": {
+        "required": ["scrambled", "correct"],
+        "properties": {"scrambled": TEXT_LIST, "correct": TEXT_LIST},
+        "sameItems": ("scrambled", "correct"),
+    },
+    "fillblank": {
+        "required": ["answer"],
+        "properties": {"answer": ANSWER},
+    },
+    "multiplechoice": {
+        "required": ["options", "correct"],
+        "properties": {"options": {"type": "array", "minItems": 2}},
+    },
+    "zhtoen": {
+        "required": ["chinese", "scrambledEnglish", "correctEnglish"],
+        "properties": {"chinese": TEXT, "scrambledEnglish": TEXT_LIST, "correctEnglish": TEXT_LIST},
+        "sameItems": ("scrambledEnglish", "correctEnglish"),
+    },
+    "entozh": {
+        "required": ["english", "scrambledChinese", "correctChinese"],
+        "properties": {"english": TEXT, "scrambledChinese": TEXT_LIST, "correctChinese": TEXT_LIST},
+        "sameItems": ("scrambledChinese", "correctChinese"),
+    },
+}
+
+STEP = {
+    "type": "object",
+    "required": ["type"],
+    "discriminator": {
+        "property": "type",
+        "mapping": {
+            name: dict(schema, type="object", properties=dict(STEP_COMMON, **schema["properties"]))
+            for name, schema in STEP_SCHEMAS.items()
+        },
+    },
+}
+
+QUEST = {
+    "type": "object",
+    "required": ["id", "title", "steps"],
+    "properties": {
+        "id": TEXT,
+        "title": TEXT,
+        "steps": {"type": "array", "minItems": 1, "items": STEP},
+        "reward": {
+            "type": "object",
+            "recommended": ["xp"],
+            "properties": {"xp": {"type": "integer"}, "badge": {"type": "string"}},
+        },
+    },
+}
+
+PRACTICE = {
+    "type": "object",
+    "required": ["type"],
+    "properties": {"type": TEXT, "answer": ANSWER},
+}
+
+MODULE_SCHEMA = {
+    "type": "object",
+    "required": ["moduleId", "title", "durationMinutes", "words", "phrases", "patterns",
+                 "quests", "practice", "funFacts"],
+    "properties": {
+        "moduleId": {"type": "string", "pattern": r"grade[1-6]-(lower|upper)-mod-\d{2}"},
+        "title": TEXT,
+        "durationMinutes": {"type": "integer"},
+        "words": {"type": "array", "countRange": (6, 12), "uniqueBy": "id", "items": ENTRY},
+        "phrases": {"type": "array", "countRange": (4, 8), "uniqueBy": "id", "items": ENTRY},
+        "patterns": {
+            "type": "array",
+            "countRange": (2, 4),
+            "items": {"type": "object", "required": ["q", "a"], "properties": {"q": TEXT, "a": TEXT}},
+        },
+        "quests": {
+            "type": "array",
+            "uniqueBy": "id",
+            "containsIds": ["vocabulary-matching", "sentence-sorting", "zh-to-en", "en-to-zh"],
+            "items": QUEST,
+        },
+        "practice": {"type": "array", "items": PRACTICE},
+        "funFacts": {"type": "array", "countRange": (2, None), "items": {"type": "string"}},
+    },
+}
+
+# ---------------------------------------------------------------------------
+# 编译
+# ---------------------------------------------------------------------------
+
+@dataclass
+class ValidationIssue:
+    """一处校验问题"""
+    pointer: str  # JSON指针，如 /quests/2/steps/5/correct
+    message: str
+    level: str = "error"  # error 或 warning
+
+Checker = Callable[[Any, str, List[ValidationIssue]], None]
+
+_TYPE_TESTS = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+}
+
+_TYPE_NAMES = {"object": "对象", "array": "数组", "string": "字符串", "integer": "整数"}
+
+def _escape(key: str) -> str:
+    """JSON指针中的键转义（RFC 6901）"""
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+def _compile_type(types) -> Tuple[Callable[[Any], bool], str]:
+    if isinstance(types, str):
+        types = (types,)
+    tests = [_TYPE_TESTS[name] for name in types]
+    name = "或".join(_TYPE_NAMES[name] for name in types)
+    if len(tests) == 1:
+        return tests[0], name
+    return (lambda value: any(test(value) for test in tests)), name
+
+def compile_schema(schema: Dict) -> Checker:
+    """
+    把 schema 编译为检查函数 check(值, JSON指针, 问题列表)
+
+    关键字在编译时解析一次，检查时只执行与该 schema 相关的判断。
+    """
+    checks: List[Checker] = []
+
+    for name in schema.get("required", ()):
+        def check_required(value, pointer, issues, name=name):
+            if isinstance(value, dict) and name not in value:
+                issues.append(ValidationIssue(f"{pointer}/{_escape(name)}", "缺少必要字段"))
+        checks.append(check_required)
+
+    for name in schema.get("recommended", ()):
+        def check_recommended(value, pointer, issues, name=name):
+            if isinstance(value, dict) and name not in value:
+                issues.append(ValidationIssue(f"{pointer}/{_escape(name)}", "缺少建议字段", "warning"))
+        checks.append(check_recommended)
+
+    properties = {name: compile_schema(sub) for name, sub in schema.get("properties", {}).items()}
+    if properties:
+        def check_properties(value, pointer, issues):
+            if isinstance(value, dict):
+                for name, check in properties.items():
+                    if name in value:
+                        check(value[name], f"{pointer}/{_escape(name)}", issues)
+        checks.append(check_properties)
+
+    if "pattern" in schema:
+        regex = re.compile(schema["pattern"])
+
+        def check_pattern(value, pointer, issues):
+            if isinstance(value, str) and not regex.fullmatch(value):
+                issues.append(ValidationIssue(pointer, f"格式错误: {value}"))
+        checks.append(check_pattern)
+
+    if schema.get("format") == "audio_path":
+        def check_audio_path(value, pointer, issues):
+            if isinstance(value, str) and not (value.startswith('/audio/tts/') and value.endswith('.mp3')):
+                issues.append(ValidationIssue(pointer, f"音频路径格式可能不正确: {value}", "warning"))
+        checks.append(check_audio_path)
+
+    if "minLength" in schema:
+        min_length = schema["minLength"]
+
+        def check_min_length(value, pointer, issues):
+            if isinstance(value, str) and len(value.strip()) < min_length:
+                issues.append(ValidationIssue(pointer, "不能为空"))
+        checks.append(check_min_length)
+
+    if "minItems" in schema:
+        min_items = schema["minItems"]
+
+        def check_min_items(value, pointer, issues):
+            if isinstance(value, list) and len(value) < min_items:
+                issues.append(ValidationIssue(pointer, f"至少需要{min_items}项，当前为{len(value)}项"))
+        checks.append(check_min_items)
+
+    if "countRange" in schema:
+        low, high = schema["countRange"]
+        expected = f"应在{low}-{high}之间" if high is not None else f"至少应为{low}个"
+
+        def check_count_range(value, pointer, issues):
+            if isinstance(value, list) and (len(value) < low or (high is not None and len(value) > high)):
+                issues.append(ValidationIssue(pointer, f"数量{expected}，当前为{len(value)}个", "warning"))
+        checks.append(check_count_range)
+
+    if "uniqueBy" in schema:
+        key = schema["uniqueBy"]
+
+        def check_unique(value, pointer, issues):
+            if not isinstance(value, list):
+                return
+            seen = set()
+            for i, item in enumerate(value):
+                if isinstance(item, dict) and isinstance(item.get(key), str):
+                    if item[key] in seen:
+                        issues.append(ValidationIssue(f"{pointer}/{i}/{_escape(key)}", f"重复的{key}: {item[key]}"))
+                    seen.add(item[key])
+        checks.append(check_unique)
+
+    if "sameItems" in schema:
+        first, second = schema["sameItems"]
+
+        def check_same_items(value, pointer, issues):
+            a, b = value.get(first), value.get(second)
+            if isinstance(a, list) and isinstance(b, list) and sorted(map(str, a)) != sorted(map(str, b)):
+                issues.append(ValidationIssue(f"{pointer}/{_escape(second)}", f"与{first}的词语不一致"))
+        checks.append(check_same_items)
+
+    if "containsIds" in schema:
+        required_ids = schema["containsIds"]
+
+        def check_contains_ids(value, pointer, issues):
+            if not isinstance(value, list):
+                return
+            ids = [item.get('id', '') for item in value if isinstance(item, dict) and isinstance(item.get('id'), str)]
+            for required_id in required_ids:
+                if not any(required_id in item_id for item_id in ids):
+                    issues.append(ValidationIssue(pointer, f"缺少必要的练习类型: {required_id}"))
+        checks.append(check_contains_ids)
+
+    if "discriminator" in schema:
+        discriminator = schema["discriminator"]["property"]
+        mapping = {name: compile_schema(sub) for name, sub in schema["discriminator"]["mapping"].items()}
+
+        def check_discriminator(value, pointer, issues):
+            if not isinstance(value, dict) or discriminator not in value:
+                return
+            check = mapping.get(value[discriminator])
+            if check is None:
+                issues.append(ValidationIssue(f"{pointer}/{_escape(discriminator)}",
+                                              f"未知类型: {value[discriminator]}", "warning"))
+            else:
+                check(value, pointer, issues)
+        checks.append(check_discriminator)
+
+    item_check = compile_schema(schema["items"]) if "items" in schema else None
+
+    type_test, type_name = _compile_type(schema["type"]) if "type" in schema else (None, "")
+
+    def check(value, pointer, issues):
+        if type_test is not None and not type_test(value):
+            issues.append(ValidationIssue(pointer, f"必须是{type_name}"))
+            return
+        for sub_check in checks:
+            sub_check(value, pointer, issues)
+        if item_check is not None and isinstance(value, list):
+            for i, item in enumerate(value):
+                item_check(item, f"{pointer}/{i}", issues)
+
+    return check
+
+# 每个进程编译一次
+_module_checker: Optional[Checker] = None
+
+def validate_module(data: Any) -> List[ValidationIssue]:
+    """校验模块JSON内容"""
+    global _module_checker
+
+    if _module_checker is None:
+        _module_checker = compile_schema(MODULE_SCHEMA)
+    issues: List[ValidationIssue] = []
+    _module_checker(data, "", issues)
+    return issues
+
+def validate_file(filepath: str) -> Dict:
+    """
+    校验单个模块文件（可在工作进程中执行）
+
+    Returns:
+        {"sha256": 内容哈希, "issues": [问题字典]}
+    """
+    try:
+        raw = Path(filepath).read_bytes()
+    except OSError as e:
+        return {"sha256": "", "issues": [asdict(ValidationIssue("", f"文件读取错误: {e}"))]}
+
+    try:
+        data = json.loads(raw.decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        issues = [ValidationIssue("", f"JSON格式错误: {e}")]
+    else:
+        issues = validate_module(data)
+    return {"sha256": hashlib.sha256(raw).hexdigest(), "issues": [asdict(issue) for issue in issues]}
+
+# ---------------------------------------------------------------------------
+# 增量校验
+# ---------------------------------------------------------------------------
+
+class ValidationCache:
+    """
+    校验结果缓存
+
+    缓存文件结构（默认 .cache/validation.json）:
+        {"version": 1, "files": {文件名: {"sha256", "size", "mtime", "issues"}}}
+    """
+
+    def __init__(self, cache_file: Optional[Path] = None):
+        self.cache_file = cache_file or config.get_cache_dir() / "validation.json"
+        self.files: Dict[str, Dict] = self._load().get("files", {})
+
+    def _load(self) -> Dict:
+        """加载缓存"""
+        if not self.cache_file.exists():
+            return {}
+
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if data.get("version") == SCHEMA_VERSION else {}
+        except Exception as e:
+            print(f"⚠️ 读取校验缓存失败: {e}")
+            return {}
+
+    def get(self, filepath: Path) -> Optional[List[Dict]]:
+        """大小和mtime未变时返回缓存的问题列表，否则返回None"""
+        stat = filepath.stat()
+        record = self.files.get(filepath.name)
+        if record and record["size"] == stat.st_size and record["mtime"] == stat.st_mtime:
+            return record["issues"]
+        return None
+
+    def put(self, filepath: Path, sha256: str, issues: List[Dict]):
+        stat = filepath.stat()
+        self.files[filepath.name] = {
+            "sha256": sha256, "size": stat.st_size, "mtime": stat.st_mtime, "issues": issues
+        }
+
+    def prune(self, names):
+        names = set(names)
+        self.files = {name: record for name, record in self.files.items() if name in names}
+
+    def save(self):
+        """原子保存缓存"""
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.cache_file.with_suffix(".tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({"version": SCHEMA_VERSION, "files": self.files}, f, ensure_ascii=False)
+        os.replace(temp_file, self.cache_file)
+
+@dataclass
+class ValidationReport:
+    """全部模块的校验结果"""
+    files: int = 0
+    validated: List[str] = field(default_factory=list)  # 本次重新校验的文件
+    cached: int = 0  # 未变化、沿用缓存结果的文件数
+    issues: Dict[str, List[ValidationIssue]] = field(default_factory=dict)  # 文件名 -> 问题
+
+    def count(self, level: str) -> int:
+        return sum(1 for issues in self.issues.values() for issue in issues if issue.level == level)
+
+def validate_files(files: List[Path], workers: int = 1, incremental: bool = False,
+                   cache: Optional[ValidationCache] = None) -> ValidationReport:
+    """
+    校验模块文件
+
+    Args:
+        files: 模块文件
+        workers: 并行校验的进程数
+        incremental: 只重新校验 mtime/大小变化的文件，其余沿用缓存结果
+        cache: 校验缓存（默认为 .cache/validation.json）
+
+    Returns:
+        校验结果
+    """
+    cache = cache or ValidationCache()
+    report = ValidationReport(files=len(files))
+
+    results: Dict[Path, List[Dict]] = {}
+    to_validate = []
+    for filepath in files:
+        cached = cache.get(filepath) if incremental else None
+        if cached is None:
+            to_validate.append(filepath)
+        else:
+            results[filepath] = cached
+    report.cached = len(results)
+
+    if to_validate:
+        paths = [str(filepath) for filepath in to_validate]
+        if workers > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+                validated = list(executor.map(validate_file, paths, chunksize=8))
+        else:
+            validated = [validate_file(path) for path in paths]
+
+        for filepath, result in zip(to_validate, validated):
+            results[filepath] = result["issues"]
+            report.validated.append(filepath.name)
+            if result["sha256"]:
+                cache.put(filepath, result["sha256"], result["issues"])
+
+    for filepath in files:
+        if results[filepath]:
+            report.issues[filepath.name] = [ValidationIssue(**issue) for issue in results[filepath]]
+
+    # 只在全量校验时清理缓存，按模式增量校验部分文件不影响其他文件的记录
+    if not incremental:
+        cache.prune(filepath.name for filepath in config.get_content_dir().glob("*.json"))
+    if report.validated or not incremental:
+        cache.save()
+    return report
+
+def print_validation_report(report: ValidationReport, show_warnings: bool = True, limit: int = 20):
+    """打印校验结果"""
+    for filename, issues in sorted(report.issues.items()):
+        shown = [issue for issue in issues if show_warnings or issue.level == "error"]
+        if not shown:
+            continue
+        print(f"\n📄 {filename}:")
+        for issue in shown[:limit]:
+            icon = "❌" if issue.level == "error" else "⚠️"
+            print(f"   {icon} #{issue.pointer or '/'}: {issue.message}")
+        if len(shown) > limit:
+            print(f"   ... 以及其他 {len(shown) - limit} 处")
+
+    errors, warnings = report.count("error"), report.count("warning")
+    failed = sum(1 for issues in report.issues.values() if any(issue.level == "error" for issue in issues))
+    print(f"\n📊 校验 {report.files} 个模块（重新校验 {len(report.validated)}，沿用缓存 {report.cached}）:")
+    print(f"   错误: {errors}（{failed} 个模块），警告: {warnings}")
+
+def run_validation(pattern: str = "*.json", workers: int = 1, incremental: bool = False,
+                   show_warnings: bool = True) -> ValidationReport:
+    """校验内容目录中匹配模式的模块"""
+    files = sorted(config.get_content_dir().glob(pattern))
+    start_time = time.time()
+    report = validate_files(files, workers, incremental)
+    print_validation_report(report, show_warnings)
+    print(f"⏱️  耗时: {time.time() - start_time:.2f}s")
+    return report
+
+def watch_validation(pattern: str = "*.json", workers: int = 1, interval: float = 1.0,
+                     show_warnings: bool = True):
+    """持续监视内容目录，文件保存后只重新校验变化的模块（Ctrl+C 退出）"""
+    cache = ValidationCache()
+    report = validate_files(sorted(config.get_content_dir().glob(pattern)), workers, True, cache)
+    print_validation_report(report, show_warnings)
+    print(f"\n👀 监视 {config.get_content_dir()} 中的 {pattern}...")
+
+    while True:
+        time.sleep(interval)
+        files = sorted(config.get_content_dir().glob(pattern))
+        report = validate_files(files, workers, True, cache)
+        if not report.validated:
+            continue
+
+        changed = ValidationReport(
+            files=len(report.validated), validated=report.validated,
+            issues={name: report.issues[name] for name in report.validated if name in report.issues}
+        )
+        print(f"\n🔄 {time.strftime('%H:%M:%S')} {', '.join(report.validated)}")
+        print_validation_report(changed, show_warnings)
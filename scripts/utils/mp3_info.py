@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+MP3 帧头解析模块
+不解码音频，直接读取 ID3 标签、Xing/Info/VBRI 头和帧同步字，
+获取时长、码率、声道模式以及截断/损坏状态
+"""
+
+import mmap
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+
+# MPEG 版本: 头部版本位 -> 名称（1 为保留值）
+_VERSIONS = {0: "2.5", 2: "2", 3: "1"}
+
+# 层: 头部层位 -> 层号（0 为保留值）
+_LAYERS = {1: 3, 2: 2, 3: 1}
+
+# 码率表 (kbps)，按 (是否MPEG1, 层) 索引
+_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+# 采样率表 (Hz)
+_SAMPLE_RATES = {
+    "1": (44100, 48000, 32000),
+    "2": (22050, 24000, 16000),
+    "2.5": (11025, 12000, 8000),
+}
+
+_CHANNEL_MODES = ("stereo", "joint_stereo", "dual_channel", "mono")
+
+@dataclass
+class MP3Info:
+    """MP3帧扫描结果"""
+    filename: str
+    size: int
+    is_valid: bool = False
+    duration: Optional[float] = None
+    bitrate: Optional[int] = None  # 平均码率 kbps
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    channel_mode: Optional[str] = None
+    mpeg_version: Optional[str] = None
+    layer: Optional[int] = None
+    frame_count: int = 0
+    vbr_header: Optional[str] = None  # Xing, Info, VBRI
+    id3_size: int = 0
+    truncated: bool = False
+    corrupted: bool = False
+    error_message: Optional[str] = None
+
+@dataclass
+class _FrameHeader:
+    version: str
+    layer: int
+    bitrate: int
+    sample_rate: int
+    channel_mode: str
+    length: int
+    samples: int
+
+def _parse_header(data, offset: int) -> Optional[_FrameHeader]:
+    """解析 offset 处的帧头，无效时返回None"""
+    if offset + 4 > len(data):
+        return None
+
+    b0, b1, b2, b3 = data[offset], data[offset + 1], data[offset + 2], data[offset + 3]
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version = _VERSIONS.get((b1 >> 3) & 0x03)
+    layer = _LAYERS.get((b1 >> 1) & 0x03)
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x03
+    if version is None or layer is None or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    is_mpeg1 = version == "1"
+    bitrate = _BITRATES[(is_mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][sample_rate_index]
+    padding = (b2 >> 1) & 0x01
+
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 2 or is_mpeg1:
+        samples = 1152
+        length = 144 * bitrate // sample_rate + padding
+    else:
+        samples = 576
+        length = 72 * bitrate // sample_rate + padding
+
+    return _FrameHeader(
+        version=version,
+        layer=layer,
+        bitrate=bitrate,
+        sample_rate=sample_rate,
+        channel_mode=_CHANNEL_MODES[b3 >> 6],
+        length=length,
+        samples=samples
+    )
+
+def _id3v2_size(data) -> int:
+    """ID3v2 标签总长度（含头部和可选的尾部）"""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+def _find_first_frame(data, start: int, end: int) -> Tuple[int, Optional[_FrameHeader]]:
+    """
+    查找第一个有效帧
+
+    为避免把音频数据中的 0xFF 误判为同步字，要求紧随其后的位置也是有效帧头
+    （文件只有一帧时除外）。
+    """
+    offset = data.find(b"\xff", start, end)
+    while offset != -1 and offset + 4 <= end:
+        header = _parse_header(data, offset)
+        if header:
+            following = offset + header.length
+            if following >= end or _parse_header(data, following):
+                return offset, header
+        offset = data.find(b"\xff", offset + 1, end)
+    return -1, None
+
+def _read_vbr_header(data, offset: int, header: _FrameHeader) -> Tuple[Optional[str], Optional[int]]:
+    """
+    读取首帧中的 Xing/Info 或 VBRI 头
+
+    Returns:
+        (头类型, 头中记录的帧数)
+    """
+    mono = header.channel_mode == "mono"
+    if header.version == "1":
+        side_info = 17 if mono else 32
+    else:
+        side_info = 9 if mono else 17
+
+    xing = offset + 4 + side_info
+    tag = bytes(data[xing:xing + 4])
+    if tag in (b"Xing", b"Info"):
+        flags = int.from_bytes(data[xing + 4:xing + 8], "big")
+        frames = int.from_bytes(data[xing + 8:xing + 12], "big") if flags & 0x01 else None
+        return tag.decode(), frames
+
+    vbri = offset + 4 + 32
+    if bytes(data[vbri:vbri + 4]) == b"VBRI":
+        return "VBRI", int.from_bytes(data[vbri + 14:vbri + 18], "big")
+
+    return None, None
+
+def scan_mp3(filepath: Path) -> MP3Info:
+    """
+    扫描MP3文件的帧结构
+
+    Args:
+        filepath: MP3文件路径
+
+    Returns:
+        扫描结果；is_valid 为 False 时 error_message 说明原因
+    """
+    filepath = Path(filepath)
+    info = MP3Info(filename=filepath.name, size=0)
+
+    try:
+        info.size = filepath.stat().st_size
+        if info.size == 0:
+            info.error_message = "空文件"
+            return info
+
+        with open(filepath, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                _scan_frames(data, info)
+    except Exception as e:
+        info.error_message = f"读取文件失败: {e}"
+
+    return info
+
+def _scan_frames(data, info: MP3Info):
+    """遍历帧头填充扫描结果"""
+    end = len(data)
+    info.id3_size = _id3v2_size(data)
+    if end >= 128 and data[end - 128:end - 125] == b"TAG":
+        end -= 128
+
+    offset, header = _find_first_frame(data, min(info.id3_size, end), end)
+    if header is None:
+        info.error_message = "未找到有效的MP3帧"
+        return
+
+    info.mpeg_version = header.version
+    info.layer = header.layer
+    info.sample_rate = header.sample_rate
+    info.channel_mode = header.channel_mode
+    info.channels = 1 if header.channel_mode == "mono" else 2
+
+    vbr_header, header_frames = _read_vbr_header(data, offset, header)
+    info.vbr_header = vbr_header
+
+    frames = 0
+    samples = 0
+    audio_bytes = 0
+
+    # Xing/Info/VBRI 所在的帧不含音频
+    if vbr_header:
+        offset += header.length
+
+    while offset < end:
+        frame = _parse_header(data, offset)
+        if frame is None:
+            # 剩余字节不足一个帧头，视为尾部填充
+            if end - offset < 4:
+                break
+            resync, frame = _find_first_frame(data, offset + 1, end)
+            if frame is None:
+                break
+            info.corrupted = True
+            offset = resync
+
+        if offset + frame.length > end:
+            info.truncated = True
+            break
+
+        frames += 1
+        samples += frame.samples
+        audio_bytes += frame.length
+        offset += frame.length
+
+    if header_frames and frames < header_frames:
+        info.truncated = True
+
+    info.frame_count = frames
+    if frames == 0:
+        info.error_message = "没有音频帧"
+        return
+
+    info.duration = samples / info.sample_rate
+    info.bitrate = round(audio_bytes * 8 / info.duration / 1000)
+
+    if info.corrupted:
+        info.error_message = "帧同步丢失（数据损坏）"
+    elif info.truncated:
+        info.error_message = "文件被截断"
+    else:
+        info.is_valid = True
+
+def scan_mp3_files(filepaths: Iterable[Path], workers: Optional[int] = None) -> Dict[Path, MP3Info]:
+    """
+    使用进程池扫描多个MP3文件
+
+    Args:
+        filepaths: 文件路径
+        workers: 工作进程数（默认为CPU核数）
+
+    Returns:
+        路径 -> 扫描结果
+    """
+    filepaths = list(filepaths)
+    if workers == 1 or len(filepaths) < 64:
+        return {path: scan_mp3(path) for path in filepaths}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(scan_mp3, filepaths, chunksize=64)
+        return dict(zip(filepaths, results))
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+追加写入的JSONL结果流
+长时间运行的检查每完成一项就写入一行，中断后可以跳过已完成的项继续运行，
+报告则通过重新读取结果流生成
+"""
+
+import os
+import json
+from pathlib import Path
+from typing import Dict, Iterator, Set
+
+class JsonlSink:
+    """
+    JSONL结果流
+
+    每条记录必须带有 key 字段（文本项的唯一标识），用于续跑时跳过已完成的项。
+    """
+
+    def __init__(self, path: Path, resume: bool = False):
+        """
+        Args:
+            path: 结果流文件路径
+            resume: 是否保留已有记录继续写入（否则清空重新开始）
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        if not resume and self.path.exists():
+            self.path.unlink()
+
+        self._trim_partial_line()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _trim_partial_line(self):
+        """截掉上次中断时写了一半的最后一行"""
+        if not self.path.exists():
+            return
+
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def write(self, record: Dict):
+        """写入一条记录并立即落盘"""
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def completed_keys(self) -> Set[str]:
+        """已写入记录的 key 集合"""
+        return {record['key'] for record in self.read()}
+
+    def read(self) -> Iterator[Dict]:
+        """按写入顺序逐条读取记录"""
+        self._file.flush()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def close(self):
+        """关闭结果流"""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
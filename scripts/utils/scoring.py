@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+转录文本评分
+对整批 (原文, 转录) 文本对同时计算词级和字符级编辑距离（WER/CER）。
+比较前统一展开缩写、把数字/金额/序数转换为英文单词，
+避免 "It's $13.25" 与 "it is thirteen dollars and twenty-five cents" 被判为不同
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+
+# 相似度中词错误率的权重（其余为字符错误率）；单词级错误更能反映发音错误，
+# 字符级错误让短文本（单词、短语）的评分不至于只有 0 和 1
+WER_WEIGHT = 0.5
+
+# 批量动态规划每块的文本对数量
+DP_CHUNK_SIZE = 256
+
+_CONTRACTIONS = {
+    "won't": "will not",
+    "can't": "can not",
+    "cannot": "can not",
+    "shan't": "shall not",
+    "ain't": "is not",
+    "let's": "let us",
+    "i'm": "i am",
+}
+
+_CONTRACTION_SUFFIXES = [
+    ("n't", " not"),
+    ("'re", " are"),
+    ("'ve", " have"),
+    ("'ll", " will"),
+    ("'d", " would"),
+]
+
+# 's 只在代词/疑问词后展开为 is（其余为所有格，如 Tom's）
+_IS_CONTRACTIONS = {
+    "it's", "he's", "she's", "that's", "there's", "here's", "what's", "where's",
+    "who's", "how's", "when's", "why's"
+}
+
+_ONES = [
+    "zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine",
+    "ten", "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen",
+    "seventeen", "eighteen", "nineteen"
+]
+_TENS = ["", "", "twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety"]
+
+_ORDINAL_WORDS = {
+    "one": "first", "two": "second", "three": "third", "five": "fifth",
+    "eight": "eighth", "nine": "ninth", "twelve": "twelfth"
+}
+
+_CURRENCY = re.compile(r"\$(\d[\d,]*)(?:\.(\d{1,2}))?")
+_TIME = re.compile(r"\b(\d{1,2}):(\d{2})\b")
+_ORDINAL = re.compile(r"\b(\d+)(st|nd|rd|th)\b")
+_PERCENT = re.compile(r"(\d+(?:\.\d+)?)%")
+_NUMBER = re.compile(r"\b\d[\d,]*(?:\.\d+)?\b")
+
+@dataclass
+class TranscriptScore:
+    """一对文本的评分"""
+    wer: float  # 词错误率（可大于1）
+    cer: float  # 字符错误率（可大于1）
+    similarity: float  # 综合相似度 (0-1)
+    word_errors: int
+    char_errors: int
+    reference_words: int
+    reference_chars: int
+
+def number_to_words(number: int) -> str:
+    """把非负整数转换为英文单词，如 125 -> one hundred twenty five"""
+    if number < 20:
+        return _ONES[number]
+    if number < 100:
+        tens, ones = divmod(number, 10)
+        return _TENS[tens] + (f" {_ONES[ones]}" if ones else "")
+    if number < 1000:
+        hundreds, rest = divmod(number, 100)
+        return f"{_ONES[hundreds]} hundred" + (f" {number_to_words(rest)}" if rest else "")
+
+    for scale, name in ((10 ** 9, "billion"), (10 ** 6, "million"), (1000, "thousand")):
+        if number >= scale:
+            major, rest = divmod(number, scale)
+            return f"{number_to_words(major)} {name}" + (f" {number_to_words(rest)}" if rest else "")
+    return str(number)
+
+def ordinal_to_words(number: int) -> str:
+    """把序数转换为英文单词，如 25 -> twenty fifth"""
+    words = number_to_words(number).split()
+    last = words[-1]
+    if last in _ORDINAL_WORDS:
+        words[-1] = _ORDINAL_WORDS[last]
+    elif last.endswith("y"):
+        words[-1] = last[:-1] + "ieth"
+    else:
+        words[-1] = last + "th"
+    return " ".join(words)
+
+def _decimal_to_words(text: str) -> str:
+    """数字字符串（可含千位逗号和小数）转换为英文单词"""
+    whole, _, fraction = text.replace(",", "").partition(".")
+    words = number_to_words(int(whole))
+    if fraction:
+        words += " point " + " ".join(_ONES[int(digit)] for digit in fraction)
+    return words
+
+def _currency_to_words(match: re.Match) -> str:
+    dollars = int(match.group(1).replace(",", ""))
+    cents = int((match.group(2) or "0").ljust(2, "0"))
+    words = f"{number_to_words(dollars)} dollar" + ("" if dollars == 1 else "s")
+    if cents:
+        words += f" and {number_to_words(cents)} cent" + ("" if cents == 1 else "s")
+    return f" {words} "
+
+def _time_to_words(match: re.Match) -> str:
+    hours, minutes = int(match.group(1)), int(match.group(2))
+    if minutes == 0:
+        return f" {number_to_words(hours)} o'clock "
+    if minutes < 10:
+        return f" {number_to_words(hours)} oh {number_to_words(minutes)} "
+    return f" {number_to_words(hours)} {number_to_words(minutes)} "
+
+def _expand_contraction(word: str) -> str:
+    if word in _CONTRACTIONS:
+        return _CONTRACTIONS[word]
+    if word in _IS_CONTRACTIONS:
+        return word[:-2] + " is"
+    for suffix, expansion in _CONTRACTION_SUFFIXES:
+        if word.endswith(suffix) and len(word) > len(suffix):
+            return word[:-len(suffix)] + expansion
+    return word
+
+def normalize_for_scoring(text: str) -> List[str]:
+    """
+    标准化文本并切分为单词
+
+    小写、统一撇号、展开缩写、数字/金额/时间/序数/百分数转换为单词、
+    连字符视为空格、去除其余标点。
+    """
+    text = text.lower().replace("’", "'").replace("‘", "'")
+
+    text = _CURRENCY.sub(_currency_to_words, text)
+    text = _TIME.sub(_time_to_words, text)
+    text = _ORDINAL.sub(lambda m: f" {ordinal_to_words(int(m.group(1)))} ", text)
+    text = _PERCENT.sub(lambda m: f" {_decimal_to_words(m.group(1))} percent ", text)
+    text = _NUMBER.sub(lambda m: f" {_decimal_to_words(m.group(0))} ", text)
+
+    text = re.sub(r"[-–—/]", " ", text)
+    words = []
+    for word in text.split():
+        word = word.strip("'\".,!?;:()[]{}")
+        if not word:
+            continue
+        for part in _expand_contraction(word).split():
+            part = re.sub(r"[^\w]", "", part)
+            if part:
+                words.append(part)
+    return words
+
+def _python_distances(pairs: Sequence[Tuple[Sequence, Sequence]]) -> List[int]:
+    """逐对计算编辑距离（NumPy不可用时的回退实现）"""
+    distances = []
+    for ref, hyp in pairs:
+        row = list(range(len(hyp) + 1))
+        for i, token in enumerate(ref, 1):
+            previous, row[0] = row[0], i
+            for j, other in enumerate(hyp, 1):
+                previous, row[j] = row[j], min(
+                    row[j] + 1,  # 删除
+                    row[j - 1] + 1,  # 插入
+                    previous + (token != other)  # 替换
+                )
+        distances.append(row[-1])
+    return distances
+
+def _numpy_distances(pairs: Sequence[Tuple[Sequence, Sequence]]) -> List[int]:
+    """
+    整批计算编辑距离
+
+    文本对按长度排序后分块，每块按块内最长长度补齐为矩阵，逐行推进动态规划，
+    每一行对整块同时计算：删除/替换项直接向量化，行内的插入依赖
+    row[j] = min(row[j-1] + 1, cand[j]) 等价于 min_k(cand[k] - k) + j，用累积最小值一次求出。
+    """
+    import numpy as np
+
+    vocabulary: Dict = {}
+    encoded = [
+        ([vocabulary.setdefault(t, len(vocabulary)) for t in ref],
+         [vocabulary.setdefault(t, len(vocabulary)) for t in hyp])
+        for ref, hyp in pairs
+    ]
+
+    # 长度相近的文本对放在同一块，减少补齐浪费
+    order = sorted(range(len(encoded)), key=lambda index: (len(encoded[index][0]), len(encoded[index][1])))
+    distances = [0] * len(encoded)
+    for start in range(0, len(order), DP_CHUNK_SIZE):
+        chunk = order[start:start + DP_CHUNK_SIZE]
+        for index, distance in zip(chunk, _numpy_chunk_distances([encoded[index] for index in chunk])):
+            distances[index] = distance
+    return distances
+
+def _numpy_chunk_distances(encoded: List[Tuple[List[int], List[int]]]) -> List[int]:
+    """计算一块已编码序列对的编辑距离"""
+    import numpy as np
+
+    count = len(encoded)
+    ref_lengths = np.array([len(ref) for ref, _ in encoded])
+    hyp_lengths = np.array([len(hyp) for _, hyp in encoded])
+    max_ref, max_hyp = int(ref_lengths.max()), int(hyp_lengths.max())
+
+    # 按行优先顺序一次性填入补齐矩阵；补齐值互不相等，补齐位置不会产生匹配
+    # （也不影响有效前缀的距离）
+    refs = np.full((count, max(max_ref, 1)), -1, dtype=np.int32)
+    hyps = np.full((count, max(max_hyp, 1)), -2, dtype=np.int32)
+    refs[np.arange(refs.shape[1]) < ref_lengths[:, None]] = [t for ref, _ in encoded for t in ref]
+    hyps[np.arange(hyps.shape[1]) < hyp_lengths[:, None]] = [t for _, hyp in encoded for t in hyp]
+
+    columns = np.arange(max_hyp + 1, dtype=np.int32)
+    row = np.tile(columns, (count, 1))
+    distances = row[np.arange(count), hyp_lengths].copy()
+    candidates = np.empty_like(row)
+
+    for i in range(1, max_ref + 1):
+        mismatch = refs[:, i - 1:i] != hyps[:, :max_hyp]
+        candidates[:, 0] = i
+        np.minimum(row[:, 1:] + 1, row[:, :-1] + mismatch, out=candidates[:, 1:])
+        candidates -= columns
+        row = np.minimum.accumulate(candidates, axis=1)
+        row += columns
+
+        finished = ref_lengths == i
+        distances[finished] = row[finished, hyp_lengths[finished]]
+
+    return distances.tolist()
+
+def edit_distances(pairs: Sequence[Tuple[Sequence, Sequence]]) -> List[int]:
+    """
+    计算一批序列对的编辑距离（插入、删除、替换代价均为1）
+
+    Args:
+        pairs: (参考序列, 假设序列) 列表，序列元素可以是单词或字符
+
+    Returns:
+        与 pairs 顺序一致的编辑距离
+    """
+    if not pairs:
+        return []
+    try:
+        return _numpy_distances(pairs)
+    except ImportError:
+        return _python_distances(pairs)
+
+def score_transcripts(pairs: Sequence[Tuple[str, str]],
+                      wer_weight: Optional[float] = None) -> List[TranscriptScore]:
+    """
+    批量评分
+
+    Args:
+        pairs: (原文, 转录文本) 列表
+        wer_weight: 相似度中WER的权重（默认为 WER_WEIGHT）
+
+    Returns:
+        与 pairs 顺序一致的评分
+    """
+    wer_weight = WER_WEIGHT if wer_weight is None else wer_weight
+
+    words = [(normalize_for_scoring(ref), normalize_for_scoring(hyp)) for ref, hyp in pairs]
+    chars = [(" ".join(ref), " ".join(hyp)) for ref, hyp in words]
+
+    word_errors = edit_distances(words)
+    char_errors = edit_distances(chars)
+
+    scores = []
+    for (ref_words, _), (ref_chars, _), word_error, char_error in zip(words, chars, word_errors, char_errors):
+        wer = word_error / max(len(ref_words), 1)
+        cer = char_error / max(len(ref_chars), 1)
+        scores.append(TranscriptScore(
+            wer=wer,
+            cer=cer,
+            similarity=max(0.0, 1.0 - (wer_weight * wer + (1 - wer_weight) * cer)),
+            word_errors=word_error,
+            char_errors=char_error,
+            reference_words=len(ref_words),
+            reference_chars=len(ref_chars)
+        ))
+    return scores
+
+def score_transcript(expected: str, transcript: str) -> TranscriptScore:
+    """评分单对文本"""
+    return score_transcripts([(expected, transcript)])[0]
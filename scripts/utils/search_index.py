@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+词汇、句型和音频引用的倒排索引
+在内容索引之上预先建立：英文单词 -> 出现位置、完整英文文本 -> 出现位置、
+音频文件名 -> 引用位置、中文文本 -> 出现位置，以及同一英文对应多个中文释义的冲突表。
+索引以内容索引中各模块的哈希为签名缓存在 .cache/search_index.pickle，内容不变时直接加载
+"""
+
+import os
+import re
+import pickle
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from dataclasses import dataclass, field
+
+from .config import config
+from .common import normalize_text, get_audio_filename_from_path
+from .content_index import ContentIndex, ModuleRecord, get_content_index
+from .audio_refs import extract_audio_references
+
+# 索引格式版本，结构变化时递增
+SEARCH_INDEX_VERSION = 2
+
+@dataclass
+class Occurrence:
+    """一处出现位置"""
+    file: str
+    pointer: str  # JSON指针
+    kind: str  # word, phrase, pattern, pair, step:<类型>, practice:<类型>, answer, other
+    en: str = ""
+    zh: str = ""
+    audio: str = ""  # 引用的音频文件名（无引用时为空）
+
+    def location(self) -> str:
+        """可读的位置，如 grade1-lower-mod-01-professions.json#/words/0"""
+        return f"{self.file}#{self.pointer}"
+
+def normalize_zh(text: str) -> str:
+    """标准化中文文本（去除空白和标点）"""
+    return re.sub(r'[\s\W_]+', '', text)
+
+def _contains(tokens: List[str], phrase: List[str]) -> bool:
+    """tokens 中是否连续出现 phrase"""
+    size = len(phrase)
+    return any(tokens[i:i + size] == phrase for i in range(len(tokens) - size + 1))
+
+def _module_occurrences(module: ModuleRecord) -> List[Occurrence]:
+    """模块中全部带英文、中文或音频的位置"""
+    found = []
+    # 音频文件名统一取自音频引用提取（按JSON指针对应到各位置）
+    audio = {ref.pointer: ref for ref in extract_audio_references(module.content, module.file)}
+
+    def filename(pointer: str) -> str:
+        ref = audio.pop(pointer, None)
+        return ref.filename if ref else ""
+
+    for word in module.words:
+        found.append(Occurrence(word.file, word.pointer, "word", word.en, word.zh, filename(word.pointer)))
+
+    for phrase in module.phrases:
+        found.append(Occurrence(phrase.file, phrase.pointer, "phrase", phrase.en, phrase.zh,
+                                filename(phrase.pointer)))
+
+    for pattern in module.patterns:
+        found.append(Occurrence(pattern.file, pattern.pointer, "pattern", pattern.q, pattern.a,
+                                filename(pattern.pointer)))
+
+    for step in module.steps:
+        found.append(Occurrence(step.file, step.pointer, f"step:{step.type}", step.english, step.chinese,
+                                filename(step.pointer)))
+        for key in ("pairs", "options"):
+            for i, pair in enumerate(step.data.get(key) or []):
+                if isinstance(pair, dict):
+                    pointer = f"{step.pointer}/{key}/{i}"
+                    found.append(Occurrence(step.file, pointer, "pair", str(pair.get('en', '')),
+                                            str(pair.get('zh', '')), filename(pointer)))
+
+    for i, practice in enumerate(module.content.get('practice') or []):
+        if not isinstance(practice, dict):
+            continue
+        en = practice.get('en') or practice.get('text') or ""
+        if isinstance(en, list):
+            en = en[0] if en else ""
+        pointer = f"/practice/{i}"
+        found.append(Occurrence(module.file, pointer, f"practice:{practice.get('type', '')}",
+                                str(en), str(practice.get('cn', '')), filename(pointer)))
+
+    # 其余引用：填空答案和其他位置的 audio 字段
+    for ref in audio.values():
+        found.append(Occurrence(ref.file, ref.pointer, ref.kind, ref.text, ref.zh, ref.filename))
+
+    return found
+
+@dataclass
+class SearchIndex:
+    """
+    倒排索引
+
+    occurrences 为全部出现位置，其余映射保存其下标：
+        tokens:  英文单词 -> 含该词的位置
+        texts:   标准化后的完整英文 -> 位置
+        audio:   音频文件名 -> 引用该文件的位置
+        zh:      标准化后的中文 -> 位置
+        glosses: 单词/短语/配对的英文 -> {中文: 位置}（只用于释义一致性检查）
+    """
+    signature: str = ""
+    occurrences: List[Occurrence] = field(default_factory=list)
+    token_lists: List[List[str]] = field(default_factory=list)
+    tokens: Dict[str, List[int]] = field(default_factory=dict)
+    texts: Dict[str, List[int]] = field(default_factory=dict)
+    audio: Dict[str, List[int]] = field(default_factory=dict)
+    zh: Dict[str, List[int]] = field(default_factory=dict)
+    glosses: Dict[str, Dict[str, List[int]]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, content_index: ContentIndex, signature: str = "") -> "SearchIndex":
+        """从内容索引构建"""
+        index = cls(signature=signature)
+        for module in content_index.select():
+            for occurrence in _module_occurrences(module):
+                index._add(occurrence)
+        return index
+
+    def _add(self, occurrence: Occurrence):
+        position = len(self.occurrences)
+        self.occurrences.append(occurrence)
+
+        tokens = normalize_text(occurrence.en).split() if occurrence.en else []
+        self.token_lists.append(tokens)
+        for token in set(tokens):
+            self.tokens.setdefault(token, []).append(position)
+        if tokens:
+            self.texts.setdefault(" ".join(tokens), []).append(position)
+
+        if occurrence.audio:
+            self.audio.setdefault(occurrence.audio, []).append(position)
+
+        zh = normalize_zh(occurrence.zh) if occurrence.zh else ""
+        if zh:
+            self.zh.setdefault(zh, []).append(position)
+            if tokens and occurrence.kind in ("word", "phrase", "pair"):
+                self.glosses.setdefault(" ".join(tokens), {}).setdefault(zh, []).append(position)
+
+    def _resolve(self, positions: List[int]) -> List[Occurrence]:
+        return [self.occurrences[position] for position in positions]
+
+    def find_text(self, query: str, exact: bool = False) -> List[Occurrence]:
+        """
+        查找英文文本
+
+        Args:
+            query: 单词或短语，如 "went to the zoo"
+            exact: 只返回完整文本与之相同的位置（否则返回连续包含该短语的位置）
+        """
+        phrase = normalize_text(query).split()
+        if not phrase:
+            return []
+        if exact:
+            return self._resolve(self.texts.get(" ".join(phrase), []))
+        if len(phrase) == 1:
+            return self._resolve(self.tokens.get(phrase[0], []))
+
+        # 从最短的倒排表开始求交集，再核对词序
+        postings = sorted((self.tokens.get(token, []) for token in set(phrase)), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+        return self._resolve(sorted(p for p in candidates if _contains(self.token_lists[p], phrase)))
+
+    def find_audio(self, filename: str) -> List[Occurrence]:
+        """查找引用某个音频文件的位置（可传入文件名或 /audio/tts/ 路径）"""
+        return self._resolve(self.audio.get(get_audio_filename_from_path(filename), []))
+
+    def find_zh(self, text: str) -> List[Occurrence]:
+        """查找中文文本（忽略空白和标点）"""
+        return self._resolve(self.zh.get(normalize_zh(text), []))
+
+    def gloss_conflicts(self) -> Dict[str, Dict[str, List[Occurrence]]]:
+        """同一英文单词/短语对应多个不同中文释义的情况：{英文: {中文: 位置列表}}"""
+        return {
+            en: {zh: self._resolve(positions) for zh, positions in by_zh.items()}
+            for en, by_zh in sorted(self.glosses.items()) if len(by_zh) > 1
+        }
+
+    def audio_files(self) -> Set[str]:
+        """被引用的全部音频文件名"""
+        return set(self.audio)
+
+def content_signature(content_index: ContentIndex) -> str:
+    """内容索引的签名（各模块文件名和哈希）"""
+    digest = hashlib.sha256()
+    for module in content_index.select():
+        digest.update(f"{module.file}:{module.sha256}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+def load_search_index(index_file: Optional[Path] = None) -> SearchIndex:
+    """
+    获取与当前内容一致的倒排索引
+
+    内容未变化时直接加载缓存，否则重新构建并保存。
+    """
+    index_file = index_file or config.get_cache_dir() / "search_index.pickle"
+    content_index = get_content_index()
+    signature = content_signature(content_index)
+
+    if index_file.exists():
+        try:
+            with open(index_file, 'rb') as f:
+                data = pickle.load(f)
+            if data.get("version") == SEARCH_INDEX_VERSION and data["index"].signature == signature:
+                return data["index"]
+        except Exception as e:
+            print(f"⚠️ 读取倒排索引失败，将重新构建: {e}")
+
+    index = SearchIndex.build(content_index, signature)
+    try:
+        index_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = index_file.with_suffix(".tmp")
+        with open(temp_file, 'wb') as f:
+            pickle.dump({"version": SEARCH_INDEX_VERSION, "index": index}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, index_file)
+    except OSError as e:
+        print(f"⚠️ 保存倒排索引失败: {e}")
+    return index
+
+def print_occurrences(occurrences: List[Occurrence], limit: int = 50):
+    """打印出现位置"""
+    for occurrence in occurrences[:limit]:
+        detail = " / ".join(part for part in (occurrence.en, occurrence.zh) if part)
+        audio = f"  🎵 {occurrence.audio}" if occurrence.audio else ""
+        print(f"   {occurrence.location()}  [{occurrence.kind}]  {detail}{audio}")
+    if len(occurrences) > limit:
+        print(f"   ... 以及其他 {len(occurrences) - limit} 处")
+
+def run_query(kind: str, value: Optional[str] = None, exact: bool = False, limit: int = 50) -> bool:
+    """
+    执行查询并打印结果
+
+    Args:
+        kind: text（英文单词/短语）、audio（音频文件）、zh（中文文本）、glosses（释义冲突）
+        value: 查询内容（glosses 不需要）
+        exact: text 查询只匹配完整文本
+        limit: 每项最多打印的位置数
+
+    Returns:
+        是否找到结果
+    """
+    index = load_search_index()
+
+    if kind == "glosses":
+        conflicts = index.gloss_conflicts()
+        print(f"🔀 {len(conflicts)} 个英文单词/短语有多个中文释义:")
+        for en, by_zh in list(conflicts.items())[:limit]:
+            print(f"\n   {en}")
+            for zh, occurrences in by_zh.items():
+                modules = sorted({occurrence.file for occurrence in occurrences})
+                print(f"     {zh}: {len(occurrences)} 处 ({', '.join(modules[:3])}"
+                      f"{' ...' if len(modules) > 3 else ''})")
+        return bool(conflicts)
+
+    if not value:
+        raise ValueError(f"查询 {kind} 需要提供查询内容")
+
+    if kind == "text":
+        occurrences = index.find_text(value, exact)
+    elif kind == "audio":
+        occurrences = index.find_audio(value)
+    elif kind == "zh":
+        occurrences = index.find_zh(value)
+    else:
+        raise ValueError(f"未知的查询类型: {kind}")
+
+    modules = {occurrence.file for occurrence in occurrences}
+    print(f"🔎 '{value}': {len(occurrences)} 处，{len(modules)} 个模块")
+    print_occurrences(occurrences, limit)
+    return bool(occurrences)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Whisper转录结果缓存
+以 (音频内容哈希, Whisper模型) 为键把转录文本保存在SQLite中，
+音频未变化时直接复用上次的转录结果
+"""
+
+import time
+import sqlite3
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .config import config
+
+def audio_sha256(filepath: Path) -> str:
+    """计算音频文件内容哈希"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class TranscriptCache:
+    """
+    转录结果缓存
+
+    每个进程各自打开连接；SQLite 使用 WAL 模式，多个工作进程可以同时读写。
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = db_path or config.get_cache_dir() / "transcripts.sqlite3"
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS transcripts (
+                audio_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                text TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (audio_hash, model)
+            )
+        """)
+        self.conn.commit()
+
+        # 进程内的哈希缓存：(路径, 大小, mtime) -> 哈希
+        self._hashes: Dict[Tuple[str, int, float], str] = {}
+
+    def file_hash(self, filepath: Path) -> str:
+        """获取文件哈希（同一进程内文件未变化时不重复计算）"""
+        stat = filepath.stat()
+        key = (str(filepath), stat.st_size, stat.st_mtime)
+        if key not in self._hashes:
+            self._hashes[key] = audio_sha256(filepath)
+        return self._hashes[key]
+
+    def get(self, filepath: Path, model: str) -> Optional[str]:
+        """获取缓存的转录文本，未命中时返回None"""
+        try:
+            row = self.conn.execute(
+                "SELECT text FROM transcripts WHERE audio_hash = ? AND model = ?",
+                (self.file_hash(filepath), model)
+            ).fetchone()
+        except (OSError, sqlite3.Error):
+            return None
+        return row[0] if row else None
+
+    def put(self, filepath: Path, model: str, text: str):
+        """保存转录文本（空结果不缓存，下次会重新转录）"""
+        if not text:
+            return
+
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO transcripts (audio_hash, model, text, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (self.file_hash(filepath), model, text, time.time())
+            )
+            self.conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️ 写入转录缓存失败 {filepath.name}: {e}")
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
@@ -14,6 +14,13 @@ from pydub import AudioSegment
 import subprocess
 import tempfile
 
+from scripts.utils.content_index import read_module
+from scripts.utils.audio_refs import extract_audio_references
+from scripts.audio.audio_gc import analyze as analyze_audio_references
+
+# 音频引用类别 -> 报告中的类型
+REFERENCE_TYPES = {'word': 'word', 'phrase': 'phrase', 'step': 'quest'}
+
 class AudioTester:
     def __init__(self, project_root):
         self.project_root = Path(project_root)
@@ -65,66 +72,24 @@ class AudioTester:
             return
 
         # 扫描所有模块文件
-        module_files = list(self.content_dir.glob("module-*.json"))
-        module_files += list(self.content_dir.glob("grade5-lower-module-*.json"))
-        module_files += list(self.content_dir.glob("grade6-lower-module-*.json"))
+        module_files = sorted(self.content_dir.glob("*.json"))
 
         for module_file in module_files:
             print(f"  📖 处理: {module_file.name}")
 
             try:
-                with open(module_file, 'r', encoding='utf-8') as f:
-                    module_data = json.load(f)
-
-                # 收集单词音频
-                for word in module_data.get('words', []):
-                    if 'audio' in word and 'en' in word:
-                        audio_path = word['audio']
-                        expected_filename = Path(audio_path).name
-                        self.audio_references[expected_filename] = {
-                            'text': word['en'],
-                            'chinese': word.get('zh', ''),
-                            'type': 'word',
+                module_data = read_module(module_file)
+
+                # 收集单词、短语和任务步骤的 audio 字段
+                for ref in extract_audio_references(module_data, module_file.name):
+                    if ref.explicit and ref.kind in REFERENCE_TYPES:
+                        self.audio_references[ref.filename] = {
+                            'text': ref.text,
+                            'chinese': ref.zh,
+                            'type': REFERENCE_TYPES[ref.kind],
                             'module': module_file.name
                         }
 
-                # 收集短语音频
-                for phrase in module_data.get('phrases', []):
-                    if 'audio' in phrase and 'en' in phrase:
-                        audio_path = phrase['audio']
-                        expected_filename = Path(audio_path).name
-                        self.audio_references[expected_filename] = {
-                            'text': phrase['en'],
-                            'chinese': phrase.get('zh', ''),
-                            'type': 'phrase',
-                            'module': module_file.name
-                        }
-
-                # 收集任务音频
-                for quest in module_data.get('quests', []):
-                    for step in quest.get('steps', []):
-                        if 'audio' in step:
-                            audio_path = step['audio']
-                            expected_filename = Path(audio_path).name
-
-                            # 获取文本内容
-                            if step.get('type') == 'fillblank' and 'answer' in step:
-                                if isinstance(step['answer'], list) and step['answer']:
-                                    text = step['answer'][0]
-                                else:
-                                    text = step.get('text', '')
-                            elif 'text' in step:
-                                text = step['text']
-                            else:
-                                text = ''
-
-                            self.audio_references[expected_filename] = {
-                                'text': text,
-                                'chinese': '',
-                                'type': 'quest',
-                                'module': module_file.name
-                            }
-
             except Exception as e:
                 print(f"❌ 处理 {module_file.name} 时出错: {e}")
 
@@ -149,11 +114,8 @@ class AudioTester:
                     'module': ref['module']
                 })
 
-        # 检查存在的文件是否有引用
-        existing_files = set(f.name for f in self.tts_dir.glob("*.mp3"))
-        referenced_files = set(self.audio_references.keys())
-
-        orphaned_files = list(existing_files - referenced_files)
+        # 检查存在的文件是否有引用（按全部模块和组件源码的引用计数）
+        orphaned_files = analyze_audio_references(self.tts_dir).orphans
 
         print(f"\n❌ 缺失的音频文件 ({len(missing_files)} 个):")
         for missing in missing_files:
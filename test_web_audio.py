@@ -12,6 +12,9 @@ from pydub import AudioSegment
 import subprocess
 import tempfile
 
+from scripts.utils.content_index import read_module
+from scripts.utils.audio_refs import extract_audio_references
+
 class WebAudioTester:
     def __init__(self, project_root):
         self.project_root = Path(project_root)
@@ -114,42 +117,11 @@ class WebAudioTester:
 
         for module_file in module_files:
             try:
-                with open(module_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-                # 扫描单词
-                for word in data.get('words', []):
-                    if 'en' in word:
-                        filename = self.word_to_filename(word['en'])
-                        if filename:
-                            self.web_audio_references.add(filename)
-
-                # 扫描短语
-                for phrase in data.get('phrases', []):
-                    if 'en' in phrase:
-                        filename = self.word_to_filename(phrase['en'])
-                        if filename:
-                            self.web_audio_references.add(filename)
-
-                # 扫描答案数组（用于填空题）
-                for quest in data.get('quests', []):
-                    for step in quest.get('steps', []):
-                        if 'answer' in step:
-                            if isinstance(step['answer'], list):
-                                for answer in step['answer']:
-                                    filename = self.word_to_filename(answer)
-                                    if filename:
-                                        self.web_audio_references.add(filename)
-                            elif isinstance(step['answer'], str):
-                                filename = self.word_to_filename(step['answer'])
-                                if filename:
-                                    self.web_audio_references.add(filename)
-
-                        # 扫描文本内容
-                        if 'text' in step:
-                            filename = self.word_to_filename(step['text'])
-                            if filename:
-                                self.web_audio_references.add(filename)
+                data = read_module(module_file)
+
+                # 单词、短语、句型、任务步骤、配对词语和填空答案引用的音频
+                for ref in extract_audio_references(data, module_file.name):
+                    self.web_audio_references.add(ref.filename)
 
             except Exception as e:
                 print(f"⚠️  处理 {module_file} 时出错: {e}")